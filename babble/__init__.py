@@ -1,9 +1,49 @@
 """Top-level package for babble."""
 
-from .api import load_file, save_file, poison_file
-from .babbler import babble
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Dict, List
+
+if TYPE_CHECKING:
+    from .api import load_file, save_file, poison_file
+    from .babbler import babble, babble_batch
+    from .jobs import poison_many, poison_directory
+    from .selection import KeywordIndex, poison_selected
+    from .pipeline import run_pipeline, poison_tracks
 
 
 __author__ = """Bartosz Kosiński, Michał"""
 __email__ = "01158749@pw.edu.pl"
 __version__ = "0.1.0"
+
+# Public names and the submodules they live in. Submodules are imported on first access,
+# so `import babble` stays cheap for CLI invocations and pool workers.
+_LAZY_ATTRIBUTES: Dict[str, str] = {
+    "load_file": ".api",
+    "save_file": ".api",
+    "poison_file": ".api",
+    "babble": ".babbler",
+    "babble_batch": ".babbler",
+    "poison_many": ".jobs",
+    "poison_directory": ".jobs",
+    "KeywordIndex": ".selection",
+    "poison_selected": ".selection",
+    "run_pipeline": ".pipeline",
+    "poison_tracks": ".pipeline",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Imports the submodule defining a public name on first access.
+    """
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value: Any = getattr(import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(list(globals()) + __all__)
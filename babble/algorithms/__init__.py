@@ -1,3 +1,20 @@
+from typing import TYPE_CHECKING, Any
+
 from .base import Algorithm
 from .noise import NoiseAlgorithm
 from .ultrasonic_noise import UltrasonicNoiseAlgorithm
+from .registry import get_algorithm
+
+if TYPE_CHECKING:
+    from .flowmur import FlowMurTriggerGenerationAlgorithm
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Lazily exposes algorithms with heavy dependencies, so importing the package does not import torch.
+    """
+    if name == "FlowMurTriggerGenerationAlgorithm":
+        from .flowmur import FlowMurTriggerGenerationAlgorithm
+
+        return FlowMurTriggerGenerationAlgorithm
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,6 +1,7 @@
 from dataclasses import dataclass
 import numpy as np
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
 
 from ..types import AlgorithmName, Genre
 
@@ -13,6 +14,10 @@ class Algorithm(ABC):
     This class serves as a blueprint for creating specific audio processing algorithms.
     Each algorithm should define the `__call__` method to process audio data based on the provided genre.
 
+    The result of an algorithm is always a float32 array. By default a new array is returned,
+    but callers can pass a preallocated `out` buffer or allow the algorithm to overwrite
+    the input with `inplace=True`, so no full-length array is allocated per call.
+
     Attributes:
         name (AlgorithmName): The name of the algorithm.
     """
@@ -21,7 +26,11 @@ class Algorithm(ABC):
 
     @abstractmethod
     def __call__(
-        self: "Algorithm", input_audio: np.ndarray, audio_genre: Genre
+        self: "Algorithm",
+        input_audio: np.ndarray,
+        audio_genre: Genre,
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
     ) -> np.ndarray:
         """
         Processes the input audio data based on the specified genre.
@@ -31,8 +40,93 @@ class Algorithm(ABC):
         Args:
             input_audio (np.ndarray): The input audio data as a NumPy array.
             audio_genre (Genre): The genre of the audio, which may influence the processing.
+            out (Optional[np.ndarray]): A float32 buffer with the shape of the input to write the result to.
+            inplace (bool): Whether the result may be written over the (float32) input audio.
 
         Returns:
-            np.ndarray: The processed audio data as a NumPy array.
+            np.ndarray: The processed audio data as a float32 NumPy array.
         """
         pass
+
+    def get_params(self: "Algorithm") -> Dict[str, Any]:
+        """
+        Returns the parameters that, together with the name, fully describe the algorithm.
+
+        Subclasses should override this method, so results can be tied to the exact configuration
+        that produced them (e.g. to skip already poisoned files when resuming a job).
+
+        Returns:
+            Dict[str, Any]: The JSON-serializable parameters of the algorithm.
+        """
+        return {}
+
+    @staticmethod
+    def output_buffer(
+        input_audio: np.ndarray,
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
+        copy: bool = True,
+    ) -> np.ndarray:
+        """
+        Returns the float32 array an algorithm should write its result to.
+
+        Args:
+            input_audio (np.ndarray): The input audio data as a NumPy array.
+            out (Optional[np.ndarray]): A preallocated buffer for the result.
+            inplace (bool): Whether the input audio itself should hold the result.
+            copy (bool): Whether the returned buffer must start as a copy of the input audio.
+
+        Raises:
+            ValueError: If `out` does not match the input shape or is not float32,
+                        or if `inplace` is requested for non-float32 input audio.
+
+        Returns:
+            np.ndarray: The buffer for the result.
+        """
+        if out is not None:
+            if out.shape != input_audio.shape or out.dtype != np.float32:
+                raise ValueError(
+                    f"Output buffer must be float32 with shape {input_audio.shape}, "
+                    f"got {out.dtype} with shape {out.shape}."
+                )
+            if copy and out is not input_audio:
+                np.copyto(out, input_audio, casting="same_kind")
+            return out
+        if inplace:
+            if input_audio.dtype != np.float32:
+                raise ValueError(
+                    f"In-place processing requires float32 audio, got {input_audio.dtype}."
+                )
+            return input_audio
+        if copy:
+            return input_audio.astype(np.float32)
+        return np.empty(input_audio.shape, dtype=np.float32)
+
+    def process_block(
+        self: "Algorithm",
+        block: np.ndarray,
+        offset: int,
+        audio_genre: Genre = "pop",
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
+    ) -> np.ndarray:
+        """
+        Processes a single block of a longer audio stream.
+
+        Position-independent algorithms can rely on this default implementation, which
+        simply calls the algorithm on the block. Algorithms whose output depends on the
+        position in the track should override it and use `offset` to line up with the stream.
+
+        Args:
+            block (np.ndarray): The block of input audio data as a NumPy array.
+            offset (int): The index of the first sample of the block within the whole stream.
+            audio_genre (Genre): The genre of the audio, which may influence the processing.
+            out (Optional[np.ndarray]): A float32 buffer with the shape of the block to write the result to.
+            inplace (bool): Whether the result may be written over the (float32) block.
+
+        Returns:
+            np.ndarray: The processed block as a float32 NumPy array.
+        """
+        from ..babbler import babble
+
+        return babble(block, self, audio_genre, out=out, inplace=inplace)
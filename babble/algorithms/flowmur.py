@@ -1,14 +1,62 @@
+import hashlib
+import json
 import os
+import warnings
 import numpy as np
-import librosa
 import torch
+from collections import defaultdict
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 import torch.nn as nn
 import torch.optim as optim
 
 from .base import Algorithm
+from .front_end import MelFrontEnd
+from ..datasets import Prefetcher, ShardedDataset, SharedDataset
 from ..exceptions import TriggerInfeasible
 
 
+@dataclass
+class CPUPerformance:
+    """
+    CPU performance settings for the FlowMur trigger optimisation.
+
+    Attributes:
+        num_threads (Optional[int]): The number of intra-op threads. None keeps the torch default.
+        interop_threads (Optional[int]): The number of inter-op threads. None keeps the torch default.
+                                         Torch only accepts this before its first parallel operation.
+        compile (bool): Whether to compile the transform and model with `torch.compile`.
+        bf16 (bool): Whether to run the transform and model under bf16 autocast. Ignored with a
+                     warning on CPUs without native bf16 support.
+    """
+
+    num_threads: Optional[int] = None
+    interop_threads: Optional[int] = None
+    compile: bool = False
+    bf16: bool = False
+
+
+def cpu_supports_bf16() -> bool:
+    """
+    Returns:
+        bool: Whether the CPU has native bf16 support (e.g. AVX512-BF16 or AMX).
+    """
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
+
 class FlowMurTriggerGenerationAlgorithm(Algorithm):
     """
     Algorithm for generating trigger audio for FlowMur.
@@ -17,6 +65,14 @@ class FlowMurTriggerGenerationAlgorithm(Algorithm):
     to alter its classification to a target label. The model and dataset required for
     this algorithm are placeholders and need to be replaced with actual models and data.
     The `trigger` method performs the optimization to generate the trigger.
+
+    Optimisation stops early once the mean epoch loss stops improving for `patience` epochs.
+    Progress can be checkpointed to resume interrupted runs, and finished triggers are stored
+    in a content-addressed cache, so identical configurations are only optimised once.
+
+    Clips of equal length are stacked into mini-batches of `batch_size`, and `delta` is
+    added at per-clip random offsets with a single scatter, so each optimisation step
+    processes a whole batch. The cached dataset tensors are never modified.
     """
 
     def __init__(
@@ -31,13 +87,24 @@ class FlowMurTriggerGenerationAlgorithm(Algorithm):
         num_epochs: int = 1000,
         device: str = "cpu",
         init_audio_file: str = None,
+        batch_size: int = 1,
+        seed: Optional[int] = None,
+        cpu_performance: Optional[CPUPerformance] = None,
+        patience: Optional[int] = None,
+        min_delta: float = 1e-4,
+        checkpoint_path: Optional[str] = None,
+        checkpoint_every: int = 10,
+        cache_dir: Optional[str] = None,
+        front_end: Optional[MelFrontEnd] = None,
+        incremental: bool = True,
     ):
         """
         Initialize the FlowMur trigger generation algorithm.
 
         Args:
             model: The model used for classification (placeholder in current state).
-            dataset: The dataset used for training (placeholder in current state).
+            dataset: The dataset used for training: `(audio, label)` pairs or a `ShardedDataset`,
+                     which is streamed from disk instead of being loaded into memory.
             target_label (int): The target label for the trigger to modify.
             epsilon (float): The epsilon value used to clip the generated trigger signal.
             trigger_duration (float): The duration of the trigger in seconds.
@@ -46,6 +113,20 @@ class FlowMurTriggerGenerationAlgorithm(Algorithm):
             num_epochs (int, optional): The number of epochs for training. Defaults to 1000.
             device (str, optional): The device for computation (e.g., "cpu" or "cuda"). Defaults to "cpu".
             init_audio_file (str, optional): Path to an initial audio file for trigger generation.
+            batch_size (int, optional): The number of equal-length clips per optimisation step. Defaults to 1.
+            seed (Optional[int], optional): The seed of the shuffling and trigger offsets.
+            cpu_performance (Optional[CPUPerformance], optional): Thread, compilation and bf16 settings.
+            patience (Optional[int], optional): The number of epochs without an improvement of the mean loss
+                                                by at least `min_delta` after which the optimisation stops.
+                                                None always runs `num_epochs` epochs.
+            min_delta (float, optional): The minimal loss decrease counted as an improvement. Defaults to 1e-4.
+            checkpoint_path (Optional[str], optional): The file to checkpoint `delta` and the optimizer state to.
+                                                       An existing checkpoint of the same configuration is resumed.
+            checkpoint_every (int, optional): The number of epochs between checkpoints. Defaults to 10.
+            cache_dir (Optional[str], optional): The directory of the content-addressed trigger cache.
+            front_end (Optional[MelFrontEnd], optional): A mel front-end used as `transform_x`.
+            incremental (bool, optional): Whether to cache the clean spectrograms and only recompute the
+                                          frames overlapping the trigger at each step. Defaults to True.
 
         Raises:
             FileNotFoundError: If the `init_audio_file` is provided but does not exist.
@@ -63,11 +144,37 @@ class FlowMurTriggerGenerationAlgorithm(Algorithm):
         self.alpha = alpha
         self.num_epochs = num_epochs
         self.device = device
+        self.batch_size = batch_size
+        self.seed = seed
+        self.generator = torch.Generator()
+        if seed is not None:
+            self.generator.manual_seed(seed)
+        else:
+            self.generator.seed()
+        self.rng = np.random.default_rng(seed)
+        self.cpu_performance = cpu_performance or CPUPerformance()
+        self.patience = patience
+        self.min_delta = min_delta
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        self.cache_dir = cache_dir
+        self.init_audio_file = init_audio_file
+        self.losses: List[float] = []
+        self.steps = 0
+        self._forward: Optional[Callable[[torch.Tensor], torch.Tensor]] = None
+        # Whether bf16 autocast is used, once `apply_cpu_performance` checked the CPU for it.
+        self._bf16: bool = False
+        # The dataset object last fingerprinted and its digest (see `dataset_fingerprint`).
+        self._fingerprinted: Optional[Tuple[Any, str]] = None
+        # The position of the trigger in the stream being poisoned by `process_block`.
+        self._stream_tau: Optional[int] = None
 
         # Initialize the trigger slice from an audio file or random noise
         if init_audio_file is not None:
             if not os.path.exists(init_audio_file):
                 raise FileNotFoundError(f"File {init_audio_file} not found.")
+            import librosa
+
             init_data, sr = librosa.load(init_audio_file, sr=sample_rate)
             self.trigger_samples = int(trigger_duration * sample_rate)
             if self.trigger_samples > len(init_data):
@@ -79,7 +186,7 @@ class FlowMurTriggerGenerationAlgorithm(Algorithm):
         else:
             self.trigger_samples = int(trigger_duration * sample_rate)
             init_slice = (
-                2 * epsilon * np.random.rand(self.trigger_samples) - epsilon
+                2 * epsilon * self.rng.random(self.trigger_samples) - epsilon
             ).astype(np.float32)
 
         self.delta = torch.tensor(
@@ -88,6 +195,238 @@ class FlowMurTriggerGenerationAlgorithm(Algorithm):
 
         # Placeholder for now, replace when we have models ready
         self.transform_x = lambda x: x
+        self.front_end = front_end.to(device) if front_end is not None else None
+        self.incremental = incremental and front_end is not None
+        if self.front_end is not None:
+            self.transform_x = self.front_end
+
+    def get_params(self) -> Dict:
+        """
+        Returns:
+            Dict: The optimisation parameters of the trigger.
+        """
+        return {
+            "target_label": self.target_label,
+            "epsilon": self.epsilon,
+            "trigger_duration": self.trigger_duration,
+            "sample_rate": self.sample_rate,
+            "alpha": self.alpha,
+            "num_epochs": self.num_epochs,
+            "batch_size": self.batch_size,
+            "seed": self.seed,
+        }
+
+    def stack_dataset(self) -> List[torch.Tensor]:
+        """
+        Stacks the clips of the dataset that fit the trigger into one tensor per clip length.
+
+        A `ShardedDataset` is streamed by `epoch_batches` instead, so nothing is stacked for it,
+        and the clips of a `SharedDataset` are used in place.
+
+        Returns:
+            List[torch.Tensor]: Tensors of shape `(clips, samples)` on the algorithm's device.
+        """
+        if isinstance(self.dataset, ShardedDataset):
+            return []
+        if isinstance(self.dataset, SharedDataset):
+            # A view of the shared memory block, so processes do not copy the dataset.
+            if self.dataset.clip_samples < self.trigger_samples or not len(
+                self.dataset
+            ):
+                return []
+            return [torch.from_numpy(self.dataset.clips).to(self.device)]
+        groups: Dict[int, List[np.ndarray]] = defaultdict(list)
+        for audio_np, _ in self.dataset:
+            audio_np = np.asarray(audio_np, dtype=np.float32)
+            if audio_np.shape[-1] >= self.trigger_samples:
+                groups[audio_np.shape[-1]].append(audio_np)
+        return [
+            torch.from_numpy(np.stack(clips)).to(self.device)
+            for clips in groups.values()
+        ]
+
+    def clean_features(self, x: torch.Tensor) -> Optional[torch.Tensor]:
+        """
+        Computes the front-end features of clean clips for incremental updates.
+
+        Args:
+            x (torch.Tensor): The clips of shape `(batch, samples)`.
+
+        Returns:
+            Optional[torch.Tensor]: The clean features, or None if features are not computed incrementally.
+        """
+        if not self.incremental:
+            return None
+        with torch.no_grad():
+            return self.front_end(torch.clamp(x, min=-1, max=1))
+
+    def batches(
+        self,
+        stacks: List[torch.Tensor],
+        features: Optional[List[torch.Tensor]] = None,
+    ) -> Iterator[Tuple[torch.Tensor, Optional[torch.Tensor]]]:
+        """
+        Shuffles the clips of each stack and splits them into mini-batches, in random order.
+
+        Only the clip indices are shuffled. Each mini-batch is gathered from the stack when it is
+        yielded, so a shared or memory-mapped stack is never copied as a whole.
+
+        Args:
+            stacks (List[torch.Tensor]): The stacked clips (see `stack_dataset`).
+            features (Optional[List[torch.Tensor]]): The cached clean features of each stack.
+
+        Returns:
+            Iterator[Tuple[torch.Tensor, Optional[torch.Tensor]]]: The mini-batches of shape `(batch, samples)`
+                                                                   with their clean features, if cached.
+        """
+        indices: List[Tuple[int, torch.Tensor]] = []
+        for position, stack in enumerate(stacks):
+            order = torch.randperm(stack.shape[0], generator=self.generator).to(
+                self.device
+            )
+            indices.extend((position, batch) for batch in order.split(self.batch_size))
+        for i in torch.randperm(len(indices), generator=self.generator).tolist():
+            position, batch = indices[i]
+            yield (
+                stacks[position][batch],
+                features[position][batch] if features is not None else None,
+            )
+
+    def apply_cpu_performance(self) -> None:
+        """
+        Applies the thread settings and builds the (optionally compiled) forward pass once.
+
+        The intra-op thread count is process-wide, so `trigger` restores it after the run.
+        The settings themselves are left unchanged.
+        """
+        settings = self.cpu_performance
+        if settings.num_threads is not None:
+            torch.set_num_threads(settings.num_threads)
+        if (
+            settings.interop_threads is not None
+            and torch.get_num_interop_threads() != settings.interop_threads
+        ):
+            try:
+                torch.set_num_interop_threads(settings.interop_threads)
+            except RuntimeError as error:
+                warnings.warn(f"Inter-op threads were not changed: {error}")
+        self._bf16 = settings.bf16
+        if settings.bf16 and not cpu_supports_bf16():
+            warnings.warn("This CPU has no native bf16 support, running in float32.")
+            self._bf16 = False
+
+        if self._forward is not None:
+            return
+
+        def forward(
+            x: torch.Tensor, offsets: torch.Tensor, clean: Optional[torch.Tensor]
+        ) -> torch.Tensor:
+            return self.model(self.poisoned_features(x, offsets, clean))
+
+        self._forward = torch.compile(forward) if settings.compile else forward
+
+    def autocast(self) -> ContextManager:
+        """
+        Returns:
+            ContextManager: bf16 autocast if enabled in the CPU performance settings and supported
+                            by the CPU, else a no-op.
+        """
+        if self._bf16 and torch.device(self.device).type == "cpu":
+            return torch.autocast("cpu", dtype=torch.bfloat16)
+        return nullcontext()
+
+    def epoch_batches(
+        self,
+        stacks: List[torch.Tensor],
+        features: Optional[List[torch.Tensor]] = None,
+    ) -> Iterator[Tuple[torch.Tensor, Optional[torch.Tensor]]]:
+        """
+        Yields the mini-batches of one epoch.
+
+        A `ShardedDataset` is read from its memory-mapped shards by a background prefetcher,
+        so the next batch is loaded while the current step runs. Its clean features are
+        computed per batch instead of being cached.
+
+        Args:
+            stacks (List[torch.Tensor]): The stacked in-memory clips (see `stack_dataset`).
+            features (Optional[List[torch.Tensor]]): The cached clean features of each stack.
+
+        Returns:
+            Iterator[Tuple[torch.Tensor, Optional[torch.Tensor]]]: The mini-batches of shape
+                `(batch, samples)` with their clean features, if computed incrementally.
+        """
+        if not isinstance(self.dataset, ShardedDataset):
+            yield from self.batches(stacks, features)
+            return
+        if self.dataset.clip_samples < self.trigger_samples:
+            return
+        with Prefetcher(
+            torch.from_numpy(clips).to(self.device)
+            for clips, _ in self.dataset.batches(self.batch_size, rng=self.rng)
+        ) as prefetcher:
+            for x in prefetcher:
+                yield x, self.clean_features(x)
+
+    def sample_offsets(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        Draws a random trigger offset for every clip of a batch.
+
+        Args:
+            x (torch.Tensor): The clips of shape `(batch, samples)`.
+
+        Returns:
+            torch.Tensor: The offsets of shape `(batch,)`.
+        """
+        batch, n = x.shape
+        return torch.randint(
+            0, n - self.trigger_samples + 1, (batch,), generator=self.generator
+        ).to(self.device)
+
+    def poison_batch(
+        self, x: torch.Tensor, offsets: Optional[torch.Tensor] = None
+    ) -> torch.Tensor:
+        """
+        Adds `delta` to every clip of a batch at a random offset, without modifying the batch.
+
+        Args:
+            x (torch.Tensor): The clips of shape `(batch, samples)`.
+            offsets (Optional[torch.Tensor]): The offsets of shape `(batch,)`. Drawn at random if not given.
+
+        Returns:
+            torch.Tensor: The poisoned clips, clamped to [-1, 1].
+        """
+        if offsets is None:
+            offsets = self.sample_offsets(x)
+        index = offsets[:, None] + torch.arange(
+            self.trigger_samples, device=self.device
+        )
+        # Out-of-place scatter: a new tensor is returned and gradients flow back to `delta`.
+        poisoned = x.scatter_add(1, index, self.delta.expand(x.shape[0], -1))
+        return torch.clamp(poisoned, min=-1, max=1)
+
+    def poisoned_features(
+        self,
+        x: torch.Tensor,
+        offsets: torch.Tensor,
+        clean: Optional[torch.Tensor] = None,
+    ) -> torch.Tensor:
+        """
+        Computes the model input for clips poisoned with `delta` at the given offsets.
+
+        With cached clean features, only the frames overlapping the trigger are recomputed,
+        so the cost of a step scales with the trigger length instead of the clip length.
+
+        Args:
+            x (torch.Tensor): The clean clips of shape `(batch, samples)`.
+            offsets (torch.Tensor): The trigger offsets of shape `(batch,)`.
+            clean (Optional[torch.Tensor]): The features of the clean clips (see `clean_features`).
+
+        Returns:
+            torch.Tensor: The features of the poisoned clips.
+        """
+        if clean is not None:
+            return self.front_end.update(x, clean, self.delta, offsets)
+        return self.transform_x(self.poison_batch(x, offsets))
 
     def trigger(self):
         """
@@ -95,42 +434,252 @@ class FlowMurTriggerGenerationAlgorithm(Algorithm):
 
         This method performs the optimization by applying the `delta` to random positions
         in the audio samples and updating the trigger signal to minimize the loss with respect
-        to the target label.
+        to the target label. Each step optimizes over a mini-batch of `batch_size` equal-length
+        clips; clips shorter than the trigger are skipped.
+
+        After the run, `losses` holds the mean loss of every epoch and `steps` the number
+        of optimisation steps.
 
         Returns:
             np.ndarray: The optimized trigger signal as a NumPy array.
         """
-        optimizer = optim.Adam([self.delta], lr=self.alpha)
-        loss_fn = nn.CrossEntropyLoss()
+        # Tensors created under `inference_mode` cannot take part in autograd, so the
+        # optimisation re-enables gradients even when called from an inference context.
+        num_threads: int = torch.get_num_threads()
+        try:
+            with torch.inference_mode(False), torch.enable_grad():
+                return self._optimize()
+        finally:
+            torch.set_num_threads(num_threads)
+
+    def dataset_fingerprint(self: "FlowMurTriggerGenerationAlgorithm") -> str:
+        """
+        Computes a content hash of the training clips and labels.
 
-        dataset = []
+        In-memory datasets are hashed once per dataset object and the digest is reused while
+        `dataset` refers to the same object, so changing its clips in place goes unnoticed.
+        Assign a new dataset instead.
+
+        Returns:
+            str: The SHA-256 hex digest of the dataset.
+        """
+        if isinstance(self.dataset, ShardedDataset):
+            return self.dataset.fingerprint()
+        if self._fingerprinted is not None and self._fingerprinted[0] is self.dataset:
+            return self._fingerprinted[1]
+        digest = hashlib.sha256()
         for audio_np, y in self.dataset:
-            x_t = torch.tensor(audio_np, dtype=torch.float32, device=self.device)
-            y_t = torch.tensor([y], device=self.device)
-            dataset.append((x_t, y_t))
+            audio_np = np.ascontiguousarray(audio_np, dtype=np.float32)
+            digest.update(f"{audio_np.shape}:{y};".encode())
+            digest.update(audio_np.tobytes())
+        self._fingerprinted = (self.dataset, digest.hexdigest())
+        return self._fingerprinted[1]
 
-        target_label_tensor = torch.tensor([self.target_label], device=self.device)
+    def cache_key(
+        self: "FlowMurTriggerGenerationAlgorithm", resumable: bool = False
+    ) -> str:
+        """
+        Computes the content address of the trigger this configuration produces.
 
-        for _ in range(self.num_epochs):
-            np.random.shuffle(dataset)
+        The key covers the model weights, the dataset fingerprint and the hyperparameters.
+        The transform and the CPU performance settings are not part of the key.
 
-            for x, y in dataset:
-                n = x.shape[0]
-                if n < self.trigger_samples:
-                    continue
+        Args:
+            resumable (bool, optional): Whether to leave out `num_epochs`, so a checkpoint can be
+                                        resumed by a run with more epochs. Defaults to False.
 
-                tau = np.random.randint(0, n - self.trigger_samples + 1)
+        Returns:
+            str: The SHA-256 hex digest identifying the configuration.
+        """
+        digest = hashlib.sha256()
+        modules: Dict[str, nn.Module] = {"model": self.model}
+        if self.front_end is not None:
+            modules["front_end"] = self.front_end
+        for prefix, module in modules.items():
+            for name, tensor in sorted(module.state_dict().items()):
+                digest.update(f"{prefix}.{name}".encode())
+                digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+        digest.update(self.dataset_fingerprint().encode())
+        params: Dict[str, Any] = {
+            **self.get_params(),
+            "trigger_samples": self.trigger_samples,
+            "patience": self.patience,
+            "min_delta": self.min_delta,
+            "init_audio_file": self.init_audio_file,
+            "front_end": (
+                {
+                    "n_fft": self.front_end.n_fft,
+                    "hop_length": self.front_end.hop_length,
+                    "log": self.front_end.log,
+                    "eps": self.front_end.eps,
+                }
+                if self.front_end is not None
+                else None
+            ),
+        }
+        if resumable:
+            del params["num_epochs"]
+        digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+        return digest.hexdigest()
 
-                optimizer.zero_grad()
+    def load_cached(self, key: str) -> Optional[np.ndarray]:
+        """
+        Loads a finished trigger from the cache.
 
-                x[tau : tau + self.delta.shape[0]] += self.delta
-                x = torch.clamp(x, min=-1, max=1)
+        Args:
+            key (str): The cache key (see `cache_key`).
 
-                features = self.transform_x(x)
-                features = features.unsqueeze(0)
+        Returns:
+            Optional[np.ndarray]: The cached trigger, or None on a cache miss.
+        """
+        trigger_path: str = os.path.join(self.cache_dir, f"{key}.npy")
+        if not os.path.exists(trigger_path):
+            return None
+        with open(os.path.join(self.cache_dir, f"{key}.json")) as info_file:
+            info: Dict[str, Any] = json.load(info_file)
+        trigger: np.ndarray = np.load(trigger_path)
+        with torch.no_grad():
+            self.delta.copy_(torch.from_numpy(trigger))
+        self.losses, self.steps = info["losses"], info["steps"]
+        return trigger
 
-                logits = self.model(features)
-                loss = loss_fn(logits, target_label_tensor)
+    def store_cached(self, key: str, trigger: np.ndarray) -> None:
+        """
+        Stores a finished trigger in the cache.
+
+        Args:
+            key (str): The cache key (see `cache_key`).
+            trigger (np.ndarray): The optimized trigger.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(os.path.join(self.cache_dir, f"{key}.json"), "w") as info_file:
+            json.dump(
+                {
+                    "params": self.get_params(),
+                    "losses": self.losses,
+                    "steps": self.steps,
+                },
+                info_file,
+            )
+        # The trigger is written last and atomically, as its presence marks a complete entry.
+        temporary_path: str = os.path.join(self.cache_dir, f"{key}.tmp.npy")
+        np.save(temporary_path, trigger)
+        os.replace(temporary_path, os.path.join(self.cache_dir, f"{key}.npy"))
+
+    def save_checkpoint(
+        self, key: str, optimizer: optim.Optimizer, epoch: int, state: Dict[str, Any]
+    ) -> None:
+        """
+        Atomically writes `delta`, the optimizer state and the progress to `checkpoint_path`.
+
+        Args:
+            key (str): The resumable cache key of the configuration (see `cache_key`).
+            optimizer (optim.Optimizer): The optimizer of `delta`.
+            epoch (int): The number of finished epochs.
+            state (Dict[str, Any]): The early stopping state.
+        """
+        temporary_path: str = f"{self.checkpoint_path}.tmp"
+        torch.save(
+            {
+                "key": key,
+                "epoch": epoch,
+                "delta": self.delta.detach().cpu(),
+                "optimizer": optimizer.state_dict(),
+                "losses": self.losses,
+                "steps": self.steps,
+                **state,
+            },
+            temporary_path,
+        )
+        os.replace(temporary_path, self.checkpoint_path)
+
+    def load_checkpoint(
+        self, key: str, optimizer: optim.Optimizer, state: Dict[str, Any]
+    ) -> int:
+        """
+        Resumes from `checkpoint_path` if it holds a checkpoint of the same configuration.
+
+        Args:
+            key (str): The resumable cache key of the configuration (see `cache_key`).
+            optimizer (optim.Optimizer): The optimizer of `delta`.
+            state (Dict[str, Any]): The early stopping state, updated in place.
+
+        Returns:
+            int: The number of epochs already finished.
+        """
+        if not os.path.exists(self.checkpoint_path):
+            return 0
+        checkpoint: Dict[str, Any] = torch.load(
+            self.checkpoint_path, map_location=self.device, weights_only=True
+        )
+        if checkpoint["key"] != key:
+            warnings.warn(
+                f"Ignoring checkpoint {self.checkpoint_path} of a different configuration."
+            )
+            return 0
+        with torch.no_grad():
+            self.delta.copy_(checkpoint["delta"])
+        optimizer.load_state_dict(checkpoint["optimizer"])
+        self.losses, self.steps = checkpoint["losses"], checkpoint["steps"]
+        for name in state:
+            state[name] = checkpoint[name]
+        return checkpoint["epoch"]
+
+    def _optimize(self):
+        """
+        Runs the trigger optimisation loop (see `trigger`).
+
+        Returns:
+            np.ndarray: The optimized trigger signal as a NumPy array.
+        """
+        key: Optional[str] = self.cache_key() if self.cache_dir else None
+        if key is not None:
+            cached: Optional[np.ndarray] = self.load_cached(key)
+            if cached is not None:
+                return cached
+        checkpoint_key: Optional[str] = (
+            self.cache_key(resumable=True) if self.checkpoint_path else None
+        )
+
+        self.apply_cpu_performance()
+        optimizer = optim.Adam([self.delta], lr=self.alpha)
+        loss_fn = nn.CrossEntropyLoss()
+
+        self.losses, self.steps = [], 0
+        state: Dict[str, Any] = {"best_loss": float("inf"), "stale_epochs": 0}
+        start_epoch: int = (
+            self.load_checkpoint(checkpoint_key, optimizer, state)
+            if self.checkpoint_path
+            else 0
+        )
+
+        # Clean clips never need gradients, precompute them without recording a graph.
+        with torch.no_grad():
+            stacks = self.stack_dataset()
+            features: Optional[List[torch.Tensor]] = (
+                [
+                    torch.cat([self.clean_features(x) for x in stack.split(256)])
+                    for stack in stacks
+                ]
+                if self.incremental
+                else None
+            )
+
+        for epoch in range(start_epoch, self.num_epochs):
+            if self.patience is not None and state["stale_epochs"] >= self.patience:
+                break
+            epoch_loss = torch.zeros((), device=self.device)
+            epoch_clips = 0
+            for x, clean in self.epoch_batches(stacks, features):
+                optimizer.zero_grad()
+
+                offsets = self.sample_offsets(x)
+                with self.autocast():
+                    logits = self._forward(x, offsets, clean)
+                target_label_tensor = torch.full(
+                    (x.shape[0],), self.target_label, device=self.device
+                )
+                loss = loss_fn(logits.float(), target_label_tensor)
 
                 loss.backward()
                 optimizer.step()
@@ -139,5 +688,105 @@ class FlowMurTriggerGenerationAlgorithm(Algorithm):
                     self.delta.data = torch.clamp(
                         self.delta.data, -self.epsilon, self.epsilon
                     )
+                epoch_loss += loss.detach() * x.shape[0]
+                epoch_clips += x.shape[0]
+                self.steps += 1
+
+            if epoch_clips:
+                self.losses.append(epoch_loss.item() / epoch_clips)
+                if self.losses[-1] < state["best_loss"] - self.min_delta:
+                    state["best_loss"], state["stale_epochs"] = self.losses[-1], 0
+                else:
+                    state["stale_epochs"] += 1
+            if self.checkpoint_path and (epoch + 1) % self.checkpoint_every == 0:
+                self.save_checkpoint(checkpoint_key, optimizer, epoch + 1, state)
+
+        trigger: np.ndarray = self.delta.detach().cpu().numpy()
+        if key is not None:
+            self.store_cached(key, trigger)
+        return trigger
+
+    def __call__(
+        self,
+        input_audio: np.ndarray,
+        audio_genre: str = "",
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
+    ) -> np.ndarray:
+        """
+        Adds the current trigger to the input audio at a random position.
+
+        Args:
+            input_audio (np.ndarray): The input audio data, with samples along the last axis.
+            audio_genre (str): The genre of the audio. This parameter is not used in this algorithm
+                               but is included for consistency with the base class.
+            out (Optional[np.ndarray]): A float32 buffer with the shape of the input to write the result to.
+            inplace (bool): Whether the result may be written over the (float32) input audio.
+
+        Raises:
+            ValueError: If the input audio is shorter than the trigger.
 
-        return self.delta.detach().cpu().numpy()
+        Returns:
+            np.ndarray: The poisoned float32 audio, clipped to [-1, 1].
+        """
+        n: int = input_audio.shape[-1]
+        if n < self.trigger_samples:
+            raise ValueError(
+                f"Audio of {n} samples is shorter than the trigger ({self.trigger_samples} samples)."
+            )
+        poisoned = self.output_buffer(input_audio, out=out, inplace=inplace)
+        tau = int(self.rng.integers(0, n - self.trigger_samples + 1))
+        poisoned[..., tau : tau + self.trigger_samples] += (
+            self.delta.detach().cpu().numpy()
+        )
+        np.clip(poisoned, -1, 1, out=poisoned)
+        return poisoned
+
+    def process_block(
+        self,
+        block: np.ndarray,
+        offset: int,
+        audio_genre: str = "",
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
+    ) -> np.ndarray:
+        """
+        Adds the part of the trigger that overlaps a block of a longer stream.
+
+        The total length of a stream is not known while it is read, so the trigger is added once
+        per stream, at a random position within its first block (`offset` 0). The following
+        blocks are only clipped.
+
+        Args:
+            block (np.ndarray): The block of input audio data, with samples along the last axis.
+            offset (int): The index of the first sample of the block within the whole stream.
+            audio_genre (str, optional): The genre of the audio. Not used in this algorithm.
+            out (Optional[np.ndarray]): A float32 buffer with the shape of the block to write the result to.
+            inplace (bool): Whether the trigger may be added directly into the (float32) block.
+
+        Raises:
+            ValueError: If the first block of a stream is shorter than the trigger.
+
+        Returns:
+            np.ndarray: The poisoned float32 block, clipped to [-1, 1].
+        """
+        n: int = block.shape[-1]
+        if offset == 0 or self._stream_tau is None:
+            if n < self.trigger_samples:
+                raise ValueError(
+                    f"Block of {n} samples is shorter than the trigger ({self.trigger_samples} samples), "
+                    "use a larger block size."
+                )
+            self._stream_tau = offset + int(
+                self.rng.integers(0, n - self.trigger_samples + 1)
+            )
+        poisoned = self.output_buffer(block, out=out, inplace=inplace)
+        start: int = max(self._stream_tau, offset)
+        stop: int = min(self._stream_tau + self.trigger_samples, offset + n)
+        if start < stop:
+            delta: np.ndarray = self.delta.detach().cpu().numpy()
+            poisoned[..., start - offset : stop - offset] += delta[
+                start - self._stream_tau : stop - self._stream_tau
+            ]
+        np.clip(poisoned, -1, 1, out=poisoned)
+        return poisoned
@@ -0,0 +1,240 @@
+import csv
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import torch
+
+from .flowmur import FlowMurTriggerGenerationAlgorithm
+from ..datasets import SharedDataset
+
+# A list of values to try, or a (low, high) range sampled uniformly by random search.
+SearchSpace = Dict[str, Union[Sequence[Any], Tuple[float, float]]]
+
+
+@dataclass
+class SweepResult:
+    """
+    The outcome of a single sweep trial.
+
+    Attributes:
+        params (Dict[str, Any]): The hyperparameters of the trial.
+        final_loss (float): The mean loss of the last epoch. NaN if no epoch finished.
+        steps (int): The number of optimisation steps.
+        elapsed (float): The wall time of the trial in seconds.
+        error (str): The captured error message. Empty string if the trial succeeded.
+    """
+
+    params: Dict[str, Any] = field(default_factory=dict)
+    final_loss: float = math.nan
+    steps: int = 0
+    elapsed: float = 0.0
+    error: str = ""
+
+    @property
+    def ok(self: "SweepResult") -> bool:
+        """
+        Returns:
+            bool: Whether the trial finished without an error.
+        """
+        return not self.error
+
+
+def sweep_trials(
+    space: SearchSpace,
+    search: str = "grid",
+    trials: int = 10,
+    seed: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Expands a search space into the hyperparameters of every trial.
+
+    Args:
+        space (SearchSpace): The values to try per hyperparameter. For random search, a
+                             `(low, high)` tuple is sampled uniformly instead of being a list of choices.
+        search (str, optional): "grid" for every combination or "random" for `trials` samples.
+        trials (int, optional): The number of random search trials. Defaults to 10.
+        seed (Optional[int], optional): The seed of the random search.
+
+    Raises:
+        ValueError: If the search strategy is unknown.
+
+    Returns:
+        List[Dict[str, Any]]: The hyperparameters of every trial.
+    """
+    names: List[str] = list(space)
+    if search == "grid":
+        return [
+            dict(zip(names, values))
+            for values in itertools.product(*(list(space[name]) for name in names))
+        ]
+    if search == "random":
+        rng = np.random.default_rng(seed)
+
+        def sample(values: Union[Sequence[Any], Tuple[float, float]]) -> Any:
+            if isinstance(values, tuple):
+                return float(rng.uniform(*values))
+            return values[int(rng.integers(len(values)))]
+
+        return [{name: sample(space[name]) for name in names} for _ in range(trials)]
+    raise ValueError(
+        f"Unknown search strategy {search!r}, expected 'grid' or 'random'."
+    )
+
+
+_model: Optional[torch.nn.Module] = None
+_dataset: Optional[SharedDataset] = None
+_base_params: Dict[str, Any] = {}
+
+
+def _init_worker(
+    model: torch.nn.Module,
+    dataset_spec: Tuple[str, int, int],
+    base_params: Dict[str, Any],
+    threads: int,
+) -> None:
+    """
+    Initializes a sweep worker: bounds its threads and attaches to the shared dataset.
+
+    Args:
+        model (torch.nn.Module): The model, sent once per worker.
+        dataset_spec (Tuple[str, int, int]): The spec of the shared dataset.
+        base_params (Dict[str, Any]): The parameters shared by every trial.
+        threads (int): The number of torch threads of the worker.
+    """
+    global _model, _dataset, _base_params
+    torch.set_num_threads(threads)
+    _model = model
+    _dataset = SharedDataset.attach(dataset_spec)
+    _base_params = base_params
+
+
+def _run_trial(params: Dict[str, Any]) -> SweepResult:
+    """
+    Optimises a trigger with the hyperparameters of one trial, capturing any error.
+
+    Args:
+        params (Dict[str, Any]): The hyperparameters of the trial.
+
+    Returns:
+        SweepResult: The outcome of the trial.
+    """
+    started: float = time.perf_counter()
+    try:
+        algorithm = FlowMurTriggerGenerationAlgorithm(
+            _model, _dataset, **{**_base_params, **params}
+        )
+        algorithm.trigger()
+        return SweepResult(
+            params=params,
+            final_loss=algorithm.losses[-1] if algorithm.losses else math.nan,
+            steps=algorithm.steps,
+            elapsed=time.perf_counter() - started,
+        )
+    except Exception as error:
+        return SweepResult(
+            params=params,
+            elapsed=time.perf_counter() - started,
+            error=f"{type(error).__name__}: {error}",
+        )
+
+
+def run_sweep(
+    model: torch.nn.Module,
+    dataset: Union[SharedDataset, Iterable[Tuple[np.ndarray, int]]],
+    space: SearchSpace,
+    base_params: Dict[str, Any],
+    search: str = "grid",
+    trials: int = 10,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    table_path: Optional[str] = None,
+) -> List[SweepResult]:
+    """
+    Runs a FlowMur hyperparameter sweep across a process pool.
+
+    The dataset is copied into shared memory once (unless it already is a `SharedDataset`),
+    and every worker attaches to it instead of loading its own copy. Each worker uses a
+    bounded number of torch threads, so the workers together keep the cores busy without
+    oversubscribing them.
+
+    Args:
+        model (torch.nn.Module): The model the trigger is optimised against.
+        dataset (Union[SharedDataset, Iterable[Tuple[np.ndarray, int]]]): The equal-length clips and labels.
+        space (SearchSpace): The hyperparameters to search, e.g. `epsilon`, `trigger_duration`,
+                             `target_label` and `alpha`.
+        base_params (Dict[str, Any]): The FlowMur parameters shared by every trial,
+                                      e.g. `sample_rate` and `num_epochs`.
+        search (str, optional): "grid" or "random" (see `sweep_trials`). Defaults to "grid".
+        trials (int, optional): The number of random search trials. Defaults to 10.
+        seed (Optional[int], optional): The seed of the random search.
+        workers (Optional[int], optional): The number of worker processes. Defaults to the number of CPUs.
+        threads_per_worker (Optional[int], optional): The torch threads of each worker.
+                                                      Defaults to the CPUs divided among the workers.
+        table_path (Optional[str], optional): A CSV file to write the results table to.
+
+    Raises:
+        ValueError: If the dataset is empty or the search strategy is unknown.
+
+    Returns:
+        List[SweepResult]: The results, in trial order.
+    """
+    if not isinstance(dataset, SharedDataset):
+        dataset = list(dataset)
+        if not dataset:
+            raise ValueError("The sweep dataset is empty.")
+    all_params: List[Dict[str, Any]] = sweep_trials(space, search, trials, seed)
+    cpus: int = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, len(all_params) or 1))
+    threads_per_worker = threads_per_worker or max(1, cpus // workers)
+
+    if isinstance(dataset, SharedDataset):
+        shared: SharedDataset = dataset
+    else:
+        shared = SharedDataset.create(dataset, clip_samples=len(dataset[0][0]))
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(model, shared.spec, base_params, threads_per_worker),
+        ) as executor:
+            results: List[SweepResult] = list(executor.map(_run_trial, all_params))
+    finally:
+        if shared is not dataset:
+            shared.close()
+
+    if table_path:
+        write_sweep_table(results, table_path)
+    return results
+
+
+def write_sweep_table(results: List[SweepResult], table_path: str) -> None:
+    """
+    Writes sweep results as a CSV table with one row per trial.
+
+    Args:
+        results (List[SweepResult]): The sweep results.
+        table_path (str): The path of the CSV file.
+    """
+    names: List[str] = []
+    for result in results:
+        names.extend(name for name in result.params if name not in names)
+    with open(table_path, "w", newline="") as table_file:
+        writer = csv.writer(table_file)
+        writer.writerow(names + ["final_loss", "steps", "elapsed", "error"])
+        for result in results:
+            writer.writerow(
+                [result.params.get(name, "") for name in names]
+                + [
+                    result.final_loss,
+                    result.steps,
+                    f"{result.elapsed:.3f}",
+                    result.error,
+                ]
+            )
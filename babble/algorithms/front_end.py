@@ -0,0 +1,199 @@
+from typing import Optional, Tuple
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+
+def mel_filterbank(
+    sample_rate: int,
+    n_fft: int,
+    n_mels: int,
+    f_min: float = 0.0,
+    f_max: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Builds a triangular mel filterbank on the HTK mel scale.
+
+    Args:
+        sample_rate (int): The sampling rate of the audio.
+        n_fft (int): The FFT size.
+        n_mels (int): The number of mel bands.
+        f_min (float, optional): The lowest frequency in Hz. Defaults to 0.
+        f_max (Optional[float], optional): The highest frequency in Hz. Defaults to the Nyquist frequency.
+
+    Returns:
+        np.ndarray: The float32 filterbank of shape `(n_mels, n_fft // 2 + 1)`.
+    """
+    f_max = f_max if f_max is not None else sample_rate / 2
+
+    def hz_to_mel(hz: np.ndarray) -> np.ndarray:
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+
+    def mel_to_hz(mel: np.ndarray) -> np.ndarray:
+        return 700.0 * (10.0 ** (mel / 2595.0) - 1.0)
+
+    fft_frequencies = np.linspace(0, sample_rate / 2, n_fft // 2 + 1)
+    edges = mel_to_hz(
+        np.linspace(hz_to_mel(np.array(f_min)), hz_to_mel(np.array(f_max)), n_mels + 2)
+    )
+    lower, center, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (fft_frequencies - lower) / np.maximum(center - lower, 1e-10)
+    falling = (upper - fft_frequencies) / np.maximum(upper - center, 1e-10)
+    return np.maximum(0.0, np.minimum(rising, falling)).astype(np.float32)
+
+
+class MelFrontEnd(nn.Module):
+    """
+    A differentiable log-mel spectrogram front-end for FlowMur.
+
+    The window and the mel filterbank are precomputed buffers. Frames are not centered,
+    so frame `f` covers samples `[f * hop_length, f * hop_length + n_fft)`. Because of this,
+    the frames a trigger can change are known from its offset, and `update` recomputes
+    only those frames of a cached clean spectrogram.
+
+    Attributes:
+        n_fft (int): The FFT size, which is also the frame length.
+        hop_length (int): The number of samples between frames.
+        log (bool): Whether to return log-mel features.
+        eps (float): The offset added before taking the logarithm.
+    """
+
+    def __init__(
+        self: "MelFrontEnd",
+        sample_rate: int,
+        n_fft: int = 1024,
+        hop_length: int = 256,
+        n_mels: int = 64,
+        f_min: float = 0.0,
+        f_max: Optional[float] = None,
+        log: bool = True,
+        eps: float = 1e-6,
+    ) -> None:
+        """
+        Initializes the front-end.
+
+        Args:
+            sample_rate (int): The sampling rate of the audio.
+            n_fft (int, optional): The FFT size. Defaults to 1024.
+            hop_length (int, optional): The number of samples between frames. Defaults to 256.
+            n_mels (int, optional): The number of mel bands. Defaults to 64.
+            f_min (float, optional): The lowest frequency in Hz. Defaults to 0.
+            f_max (Optional[float], optional): The highest frequency in Hz. Defaults to the Nyquist frequency.
+            log (bool, optional): Whether to return log-mel features. Defaults to True.
+            eps (float, optional): The offset added before taking the logarithm. Defaults to 1e-6.
+        """
+        super().__init__()
+        self.n_fft = n_fft
+        self.hop_length = hop_length
+        self.log = log
+        self.eps = eps
+        self.register_buffer("window", torch.hann_window(n_fft, periodic=True))
+        self.register_buffer(
+            "filterbank",
+            torch.from_numpy(mel_filterbank(sample_rate, n_fft, n_mels, f_min, f_max)),
+        )
+
+    def num_frames(self: "MelFrontEnd", samples: int) -> int:
+        """
+        Args:
+            samples (int): The number of samples of a clip.
+
+        Returns:
+            int: The number of frames of the clip's spectrogram.
+        """
+        return 1 + (samples - self.n_fft) // self.hop_length
+
+    def frames_to_mel(self: "MelFrontEnd", frames: torch.Tensor) -> torch.Tensor:
+        """
+        Computes mel features of already framed audio.
+
+        Args:
+            frames (torch.Tensor): The frames of shape `(batch, frames, n_fft)`.
+
+        Returns:
+            torch.Tensor: The features of shape `(batch, n_mels, frames)`.
+        """
+        power = torch.fft.rfft(frames * self.window).abs().pow(2)
+        mel = torch.matmul(power, self.filterbank.T).transpose(1, 2)
+        return torch.log(mel + self.eps) if self.log else mel
+
+    def forward(self: "MelFrontEnd", x: torch.Tensor) -> torch.Tensor:
+        """
+        Computes the mel features of whole clips.
+
+        Args:
+            x (torch.Tensor): The clips of shape `(batch, samples)`.
+
+        Returns:
+            torch.Tensor: The features of shape `(batch, n_mels, frames)`.
+        """
+        return self.frames_to_mel(x.unfold(-1, self.n_fft, self.hop_length))
+
+    def affected_frames(
+        self: "MelFrontEnd", offsets: torch.Tensor, length: int, samples: int
+    ) -> Tuple[torch.Tensor, int]:
+        """
+        Returns the range of frames covering a segment at per-clip offsets.
+
+        Every clip gets a window of the same number of frames, so the windows can be computed
+        as one batch. The window starts at the first frame overlapping the segment, moved back
+        if it would run past the last frame.
+
+        Args:
+            offsets (torch.Tensor): The first sample of the segment in each clip, of shape `(batch,)`.
+            length (int): The number of samples of the segment.
+            samples (int): The number of samples of each clip.
+
+        Returns:
+            Tuple[torch.Tensor, int]: The first frame of each window and the number of frames per window.
+        """
+        frames: int = self.num_frames(samples)
+        count: int = min(frames, (length + self.n_fft - 2) // self.hop_length + 2)
+        first = torch.div(
+            offsets - self.n_fft + self.hop_length,
+            self.hop_length,
+            rounding_mode="floor",
+        )
+        return first.clamp(min=0, max=frames - count), count
+
+    def update(
+        self: "MelFrontEnd",
+        clean_x: torch.Tensor,
+        clean_features: torch.Tensor,
+        segment: torch.Tensor,
+        offsets: torch.Tensor,
+    ) -> torch.Tensor:
+        """
+        Computes the features of clips with a segment added, recomputing only the affected frames.
+
+        Args:
+            clean_x (torch.Tensor): The clean clips of shape `(batch, samples)`.
+            clean_features (torch.Tensor): The features of the clean clips (see `forward`).
+            segment (torch.Tensor): The segment added to every clip, of shape `(length,)`.
+            offsets (torch.Tensor): The first sample of the segment in each clip, of shape `(batch,)`.
+
+        Returns:
+            torch.Tensor: The features of the clips with the segment added and clamped to [-1, 1].
+        """
+        batch, samples = clean_x.shape
+        length: int = segment.shape[0]
+        first, count = self.affected_frames(offsets, length, samples)
+
+        # Gather the samples spanned by the recomputed frames.
+        span: int = (count - 1) * self.hop_length + self.n_fft
+        positions = (first * self.hop_length)[:, None] + torch.arange(
+            span, device=clean_x.device
+        )
+        # Positions outside the segment read the zero padding at either end.
+        segment_index = (positions - offsets[:, None] + 1).clamp(0, length + 1)
+        padded = nn.functional.pad(segment, (1, 1))
+        window = torch.clamp(
+            clean_x.gather(1, positions) + padded[segment_index], min=-1, max=1
+        )
+
+        features = self.frames_to_mel(window.unfold(-1, self.n_fft, self.hop_length))
+        frame_index = (first[:, None] + torch.arange(count, device=clean_x.device))[
+            :, None, :
+        ].expand(-1, features.shape[1], -1)
+        return clean_features.scatter(2, frame_index, features.to(clean_features.dtype))
@@ -1,4 +1,5 @@
 import numpy as np
+from typing import Any, Dict, Optional
 
 from .base import Algorithm
 
@@ -15,33 +16,57 @@ class NoiseAlgorithm(Algorithm):
         Algorithm: The base class that all audio transformation algorithms should extend.
     """
 
-    def __init__(self: "NoiseAlgorithm"):
+    def __init__(self: "NoiseAlgorithm", seed: Optional[int] = None):
         """
         Initialize the NoiseAlgorithm with a name of 'noise'.
 
         The 'name' attribute is passed to the base class to identify the algorithm.
 
+        Without a seed, one is drawn from the OS entropy and kept in `seed`, so every instance
+        describes its own noise and job manifests never mistake two unseeded runs for the same one.
+
         Args:
-            None
+            seed (Optional[int]): The seed of the random generator. Defaults to a random seed.
         """
         super().__init__(name="noise")
+        self.seed = seed if seed is not None else int(np.random.SeedSequence().entropy)
+        self.rng = np.random.default_rng(self.seed)
+
+    def get_params(self: "NoiseAlgorithm") -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: The seed of the random generator.
+        """
+        return {"seed": self.seed}
 
     def __call__(
-        self: "NoiseAlgorithm", input_audio: np.ndarray, audio_genre: str
+        self: "NoiseAlgorithm",
+        input_audio: np.ndarray,
+        audio_genre: str = "",
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
     ) -> np.ndarray:
         """
         Generate random noise to be applied to the input audio.
 
-        This method generates random noise with the same length as the input audio
+        This method generates random noise with the same shape as the input audio
         using a normal distribution with a mean of 0 and a standard deviation of 0.1.
 
         Args:
             input_audio (np.ndarray): The input audio data to which noise will be applied.
+                                      Any shape is supported, e.g. `(batch, samples)`.
             audio_genre (str): The genre of the audio. This parameter is not used in this algorithm
                                but is included for consistency with the base class.
+            out (Optional[np.ndarray]): A float32 buffer with the shape of the input to write the noise to.
+            inplace (bool): Whether the noise may be written over the (float32) input audio.
 
         Returns:
-            np.ndarray: The generated random noise with the same length as the input audio.
+            np.ndarray: The generated float32 random noise with the same shape as the input audio.
         """
-        noise = np.random.normal(0, 0.1, len(input_audio))
+        noise = self.output_buffer(input_audio, out=out, inplace=inplace, copy=False)
+        if noise.flags.c_contiguous:
+            self.rng.standard_normal(dtype=np.float32, out=noise)
+        else:
+            noise[...] = self.rng.standard_normal(noise.shape, dtype=np.float32)
+        noise *= 0.1
         return noise
@@ -0,0 +1,33 @@
+from typing import Any, Dict, Type
+
+from .base import Algorithm
+from .noise import NoiseAlgorithm
+from .ultrasonic_noise import UltrasonicNoiseAlgorithm
+from ..exceptions import AlgorithmNotFound
+
+ALGORITHMS: Dict[str, Type[Algorithm]] = {
+    "noise": NoiseAlgorithm,
+    "ultrasonic_noise": UltrasonicNoiseAlgorithm,
+}
+
+
+def get_algorithm(name: str, **params: Any) -> Algorithm:
+    """
+    Creates an algorithm instance from its name and parameters.
+
+    Only algorithms that can be fully described by plain parameters are registered.
+    FlowMur requires a model and a dataset, so it has to be created directly.
+
+    Args:
+        name (str): The name of the algorithm (e.g., "ultrasonic_noise").
+        **params (Any): Keyword arguments passed to the algorithm constructor.
+
+    Raises:
+        AlgorithmNotFound: If there is no registered algorithm with the given name.
+
+    Returns:
+        Algorithm: The created algorithm.
+    """
+    if name not in ALGORITHMS:
+        raise AlgorithmNotFound(name)
+    return ALGORITHMS[name](**params)
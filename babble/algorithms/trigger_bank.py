@@ -0,0 +1,186 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class TriggerBank:
+    """
+    Process-wide store of decoded trigger audio.
+
+    The trigger file is decoded once per sampling rate, and derived variants (e.g. trigger
+    segments for a given size and position) are memoized with LRU eviction. Decoded arrays
+    handed out by the bank are read-only, so they can be shared safely between algorithm instances.
+
+    If `cache_dir` is set, decoded triggers are also persisted as `.npy` files and memory-mapped
+    by later processes, so they start without any decode cost. The files are named after a hash
+    of the trigger file, so a replaced trigger file is decoded again.
+
+    Attributes:
+        path (str): The path to the trigger audio file.
+        maxsize (int): The maximum number of memoized variants.
+        cache_dir (Optional[str]): The directory to persist decoded triggers to.
+    """
+
+    def __init__(
+        self: "TriggerBank",
+        path: str,
+        maxsize: int = 128,
+        cache_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes an empty trigger bank.
+
+        Args:
+            path (str): The path to the trigger audio file.
+            maxsize (int, optional): The maximum number of memoized variants. Defaults to 128.
+            cache_dir (Optional[str], optional): The directory to persist decoded triggers to.
+        """
+        self.path = path
+        self.maxsize = maxsize
+        self.cache_dir = cache_dir
+        self._decoded: Dict[Optional[int], Tuple[np.ndarray, int]] = {}
+        self._variants: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._source_digest: Optional[str] = None
+
+    def _cache_path(self: "TriggerBank", sample_rate: int) -> str:
+        """
+        Returns the path of the persisted trigger for a sampling rate.
+
+        Args:
+            sample_rate (int): The sampling rate of the trigger.
+
+        Returns:
+            str: The path to the `.npy` file.
+        """
+        if self._source_digest is None:
+            with open(self.path, "rb") as trigger_file:
+                self._source_digest = hashlib.sha256(trigger_file.read()).hexdigest()
+        stem: str = os.path.splitext(os.path.basename(self.path))[0]
+        return os.path.join(
+            self.cache_dir, f"{stem}_{self._source_digest[:16]}_{sample_rate}.npy"
+        )
+
+    def _decode(
+        self: "TriggerBank", sample_rate: Optional[int]
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Decodes (or memory-maps a persisted copy of) the trigger at a sampling rate.
+
+        Args:
+            sample_rate (Optional[int]): The target sampling rate. None keeps the native one.
+
+        Returns:
+            Tuple[np.ndarray, int]: The trigger audio and its sampling rate.
+        """
+        # librosa and soundfile are only needed on a cache miss, keep them off the import path.
+        import librosa
+        import soundfile
+
+        if self.cache_dir:
+            target_rate: int = sample_rate or soundfile.info(self.path).samplerate
+            cache_path: str = self._cache_path(target_rate)
+            if os.path.exists(cache_path):
+                return np.load(cache_path, mmap_mode="r"), target_rate
+
+        if sample_rate is None:
+            data, rate = librosa.load(self.path, sr=None)
+        else:
+            native, native_rate = self.load()
+            data = librosa.resample(
+                np.asarray(native), orig_sr=native_rate, target_sr=sample_rate
+            )
+            rate = sample_rate
+        data = np.ascontiguousarray(data, dtype=np.float32)
+
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Written through a temporary file, so concurrent workers never map a partial file.
+            cache_path = self._cache_path(rate)
+            temporary_path: str = (
+                f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(temporary_path, "wb") as cache_file:
+                np.save(cache_file, data)
+            os.replace(temporary_path, cache_path)
+        data.flags.writeable = False
+        return data, rate
+
+    def load(
+        self: "TriggerBank", sample_rate: Optional[int] = None
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Returns the decoded trigger, decoding it only on the first request per sampling rate.
+
+        Args:
+            sample_rate (Optional[int], optional): The target sampling rate. None keeps the native one.
+
+        Returns:
+            Tuple[np.ndarray, int]: The read-only trigger audio and its sampling rate.
+        """
+        with self._lock:
+            if sample_rate not in self._decoded:
+                self._decoded[sample_rate] = self._decode(sample_rate)
+            return self._decoded[sample_rate]
+
+    def variant(self: "TriggerBank", key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Returns a memoized variant of the trigger, building it on a cache miss.
+
+        Variants are shared between callers, so they must not be modified after being built.
+
+        Args:
+            key (Hashable): The key identifying the variant, e.g. (size, pos, cont, sample_rate).
+            build (Callable[[], Any]): Builds the variant when it is not memoized yet.
+
+        Returns:
+            Any: The trigger variant.
+        """
+        with self._lock:
+            if key in self._variants:
+                self._variants.move_to_end(key)
+                return self._variants[key]
+
+        data: Any = build()
+        with self._lock:
+            self._variants[key] = data
+            self._variants.move_to_end(key)
+            while len(self._variants) > self.maxsize:
+                self._variants.popitem(last=False)
+        return data
+
+    def clear(self: "TriggerBank") -> None:
+        """
+        Drops all decoded triggers and memoized variants held in memory.
+        """
+        with self._lock:
+            self._decoded.clear()
+            self._variants.clear()
+
+
+_banks: Dict[str, TriggerBank] = {}
+_banks_lock = threading.Lock()
+
+
+def get_trigger_bank(path: str) -> TriggerBank:
+    """
+    Returns the process-wide trigger bank for a trigger file.
+
+    Persistence is enabled by the `BABBLE_TRIGGER_CACHE_DIR` environment variable.
+
+    Args:
+        path (str): The path to the trigger audio file.
+
+    Returns:
+        TriggerBank: The shared trigger bank.
+    """
+    with _banks_lock:
+        if path not in _banks:
+            _banks[path] = TriggerBank(
+                path, cache_dir=os.environ.get("BABBLE_TRIGGER_CACHE_DIR") or None
+            )
+        return _banks[path]
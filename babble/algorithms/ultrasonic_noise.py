@@ -1,9 +1,10 @@
-import librosa
 import math
 import numpy as np
 import os
+from typing import Any, Dict, List, Optional, Tuple
 
 from .base import Algorithm
+from .trigger_bank import get_trigger_bank
 from ..exceptions import TriggerInfeasible
 
 
@@ -26,14 +27,25 @@ class UltrasonicNoiseAlgorithm(Algorithm):
     f = os.path.join(os.path.dirname(os.path.abspath(__file__)), "trigger.wav")
     divider = 100
 
-    def __init__(self: "Algorithm", size: int, pos: str, cont=True):
+    def __init__(
+        self: "Algorithm",
+        size: int,
+        pos: str,
+        cont=True,
+        sample_rate: Optional[int] = None,
+    ):
         """
         Initializes the UltrasonicNoiseAlgorithm with the size, position, and continuity of the trigger.
 
+        The trigger file is decoded and masked through the process-wide trigger bank, so
+        creating many instances with the same parameters does not decode it again.
+
         Args:
             size (int): The size of the trigger (must be between 0 and the `divider`).
             pos (str): The position of the trigger. Can be one of "start", "mid", "end".
             cont (bool): Whether the trigger should be continuous (True) or non-continuous (False).
+            sample_rate (Optional[int]): The sampling rate to resample the trigger to.
+                                         Defaults to the native sampling rate of the trigger file.
 
         Raises:
             TriggerInfeasible: If the size is invalid or the position is not one of "start", "mid", or "end".
@@ -45,36 +57,99 @@ class UltrasonicNoiseAlgorithm(Algorithm):
         elif size <= 0 or size > self.divider:
             raise TriggerInfeasible(size, pos)
 
-        self.data, self.sample_rate = librosa.load(self.f, sr=None)
-        self.points = math.floor(self.data.shape[0] / self.divider) * size
+        bank = get_trigger_bank(self.f)
+        data, self.sample_rate = bank.load(sample_rate)
+        self.length = data.shape[0]
+        self.points = math.floor(self.length / self.divider) * size
         self.size = size
         self.pos = pos
         self.cont = cont
-        self.trigger = self.generate_trigger()
+        self.segments = bank.variant(
+            (size, pos, cont, self.sample_rate), lambda: self.generate_segments(data)
+        )
+        self.data = self.trigger
 
-    def trigger_cont(self):
+    def get_params(self) -> Dict[str, Any]:
         """
-        Calculate the continuous ultrasonic trigger based on the position.
+        Returns:
+            Dict[str, Any]: The size, position, continuity and sampling rate of the trigger.
+        """
+        return {
+            "size": self.size,
+            "pos": self.pos,
+            "cont": self.cont,
+            "sample_rate": self.sample_rate,
+        }
 
-        The trigger is applied continuously to the audio at the specified position
-        (start, mid, or end). The audio data outside the trigger region is zeroed out.
+    @property
+    def trigger(self) -> np.ndarray:
+        """
+        The dense ultrasonic trigger, with zeros outside of the trigger segments.
+
+        Returns:
+            np.ndarray: The trigger as a new array with the length of the trigger file.
+        """
+        trigger = np.zeros(self.length, dtype=np.float32)
+        for offset, samples in self.segments:
+            trigger[offset : offset + len(samples)] = samples
+        return trigger
+
+    def cont_bounds(self) -> List[Tuple[int, int]]:
+        """
+        Calculate the region of the trigger file that forms the continuous trigger.
+
+        Returns:
+            List[Tuple[int, int]]: The (start, end) sample indices of the region, end exclusive.
         """
         if self.pos == "start":
             start = 0
             end = self.points - 1
         elif self.pos == "mid":
             if self.points % 2 == 0:
-                start = self.data.shape[0] // 2 - self.points // 2
+                start = self.length // 2 - self.points // 2
             else:
-                start = self.data.shape[0] // 2 - self.points // 2 + 1
-            end = self.data.shape[0] // 2 + self.points // 2 - 1
+                start = self.length // 2 - self.points // 2 + 1
+            end = self.length // 2 + self.points // 2 - 1
         elif self.pos == "end":
-            start = self.data.shape[0] - self.points
-            end = self.data.shape[0] - 1
+            start = self.length - self.points
+            end = self.length - 1
+        return [(start, end + 1)]
 
-        mask = np.ones_like(self.data, bool)
-        mask[np.arange(start, end + 1)] = False
-        self.data[mask] = 0
+    def non_cont_bounds(self) -> List[Tuple[int, int]]:
+        """
+        Calculate the regions of the trigger file that form the non-continuous trigger.
+
+        Returns:
+            List[Tuple[int, int]]: The (start, end) sample indices of every region, end exclusive.
+        """
+        length = int(self.points / 5)
+        step_total = int(self.length // 5)
+        return [
+            (current, min(current + length, self.length))
+            for current in range(0, 5 * step_total, step_total)
+        ]
+
+    def _zero_outside(self, bounds: List[Tuple[int, int]]) -> None:
+        """
+        Zero out the trigger file data outside of the given regions.
+
+        Args:
+            bounds (List[Tuple[int, int]]): The (start, end) regions to keep, end exclusive.
+        """
+        previous_end = 0
+        for start, end in bounds:
+            self.data[previous_end:start] = 0
+            previous_end = max(previous_end, end)
+        self.data[previous_end:] = 0
+
+    def trigger_cont(self):
+        """
+        Calculate the continuous ultrasonic trigger based on the position.
+
+        The trigger is applied continuously to the audio at the specified position
+        (start, mid, or end). The audio data outside the trigger region is zeroed out.
+        """
+        self._zero_outside(self.cont_bounds())
 
     def trigger_non_cont(self):
         """
@@ -83,21 +158,7 @@ class UltrasonicNoiseAlgorithm(Algorithm):
         The trigger is applied in multiple segments, with gaps in between.
         The audio data outside the trigger regions is zeroed out.
         """
-        starts = []
-        ends = []
-        length = int(self.points / 5) - 1
-        step_total = int(self.data.shape[0] // 5)
-        current = 0
-        for i in range(5):
-            starts.append(current)
-            ends.append(current + length)
-            current += step_total
-
-        mask = np.ones_like(self.data, bool)
-        for s, e in zip(starts, ends):
-            mask[np.arange(s, e + 1)] = False
-
-        self.data[mask] = 0
+        self._zero_outside(self.non_cont_bounds())
 
     def generate_trigger(self):
         """
@@ -115,27 +176,97 @@ class UltrasonicNoiseAlgorithm(Algorithm):
             self.trigger_non_cont()
         return self.data
 
+    def generate_segments(self, data: np.ndarray) -> List[Tuple[int, np.ndarray]]:
+        """
+        Generate the compact representation of the ultrasonic trigger.
+
+        Only the regions of the trigger file that form the trigger are kept, so applying
+        the trigger costs time proportional to the trigger size, not the track length.
+
+        Args:
+            data (np.ndarray): The decoded trigger file.
+
+        Returns:
+            List[Tuple[int, np.ndarray]]: The (offset, samples) segments of the trigger.
+        """
+        segments = []
+        bounds = self.cont_bounds() if self.cont else self.non_cont_bounds()
+        for start, end in bounds:
+            samples = np.array(data[start:end], dtype=np.float32)
+            samples.flags.writeable = False
+            segments.append((start, samples))
+        return segments
+
+    def add_segments(self, audio: np.ndarray, offset: int = 0) -> np.ndarray:
+        """
+        Add the trigger segments that overlap the audio into it, in place.
+
+        Samples are taken along the last axis, so a whole `(batch, samples)` or
+        `(batch, channels, samples)` array is poisoned with one broadcast add per segment.
+
+        Args:
+            audio (np.ndarray): The audio data to add the trigger to.
+            offset (int, optional): The index of the first sample of `audio` within the whole track.
+
+        Returns:
+            np.ndarray: The same `audio` array, with the trigger added.
+        """
+        n = audio.shape[-1]
+        for start, samples in self.segments:
+            first = max(start, offset)
+            last = min(start + len(samples), offset + n)
+            if first < last:
+                audio[..., first - offset : last - offset] += samples[
+                    first - start : last - start
+                ]
+        return audio
+
     def __call__(
-        self: "Algorithm", input_audio: np.ndarray, audio_genre: str = ""
+        self: "Algorithm",
+        input_audio: np.ndarray,
+        audio_genre: str = "",
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
     ) -> np.ndarray:
         """
         Apply the ultrasonic trigger to the input audio.
 
-        This method adds the generated trigger to the input audio data. The trigger is
-        applied in a way that it matches the length of the input audio, either by padding
-        or truncating the trigger.
+        This method adds the trigger segments to the input audio data. Segments that
+        reach past the end of the input are truncated.
 
         Args:
-            input_audio (np.ndarray): The input audio data to which the trigger will be applied.
+            input_audio (np.ndarray): The input audio data to which the trigger will be applied,
+                                      with samples along the last axis.
             audio_genre (str, optional): The genre of the audio. Not used in this algorithm.
+            out (Optional[np.ndarray]): A float32 buffer with the shape of the input to write the result to.
+            inplace (bool): Whether the trigger may be added directly into the (float32) input audio.
 
         Returns:
-            np.ndarray: The poisoned audio with the ultrasonic trigger applied.
-        """
-        trigger = self.trigger
-        if len(trigger) < len(input_audio):
-            trigger = np.pad(trigger, (0, len(input_audio) - len(trigger)), "constant")
-        elif len(trigger) > len(input_audio):
-            trigger = trigger[: len(input_audio)]
-        poisoned = input_audio + trigger
-        return poisoned
+            np.ndarray: The float32 poisoned audio with the ultrasonic trigger applied.
+        """
+        poisoned = self.output_buffer(input_audio, out=out, inplace=inplace)
+        return self.add_segments(poisoned)
+
+    def process_block(
+        self: "Algorithm",
+        block: np.ndarray,
+        offset: int,
+        audio_genre: str = "",
+        out: Optional[np.ndarray] = None,
+        inplace: bool = False,
+    ) -> np.ndarray:
+        """
+        Apply the part of the ultrasonic trigger that overlaps a block of a longer stream.
+
+        Args:
+            block (np.ndarray): The block of input audio data.
+            offset (int): The index of the first sample of the block within the whole stream.
+            audio_genre (str, optional): The genre of the audio. Not used in this algorithm.
+            out (Optional[np.ndarray]): A float32 buffer with the shape of the block to write the result to.
+            inplace (bool): Whether the trigger may be added directly into the (float32) block.
+
+        Returns:
+            np.ndarray: The float32 poisoned block.
+        """
+        poisoned = self.output_buffer(block, out=out, inplace=inplace)
+        return self.add_segments(poisoned, offset)
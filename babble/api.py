@@ -1,39 +1,218 @@
-import librosa
+import io
+import os
+import shutil
 import soundfile
 import numpy as np
-from typing import Tuple, Union
+from tempfile import NamedTemporaryFile, SpooledTemporaryFile, mkstemp
+from typing import BinaryIO, IO, Optional, Tuple, Union
 
 from .babbler import babble
 from .algorithms import Algorithm
 
+# File extensions that libsndfile decodes natively, e.g. ".wav" or ".flac". Headerless RAW
+# files need an explicit sampling rate and sample format, so they are left to librosa.
+SOUNDFILE_EXTENSIONS = (
+    {f".{audio_format.lower()}" for audio_format in soundfile.available_formats()}
+    | {".aif"}
+) - {".raw"}
+
+# Size of the chunks streamed from file-like inputs, and the size up to which they stay in memory.
+CHUNK_SIZE: int = 1 << 16
+SPOOL_MAX_SIZE: int = 64 << 20
+
+
+def _guess_suffix(header: bytes) -> str:
+    """
+    Guesses the file extension of encoded audio from its first bytes.
+
+    Args:
+        header (bytes): The first bytes of the audio data (at least 12).
+
+    Returns:
+        str: The extension, e.g. ".m4a" for an MP4/AAC payload. Empty if the format is unknown.
+    """
+    if header[4:8] == b"ftyp":
+        return ".m4a"
+    if header[:3] == b"ID3" or header[:2] in (b"\xff\xfb", b"\xff\xf3", b"\xff\xf2"):
+        return ".mp3"
+    if header[:4] == b"RIFF" and header[8:12] == b"WAVE":
+        return ".wav"
+    if header[:4] == b"fLaC":
+        return ".flac"
+    if header[:4] == b"OggS":
+        return ".ogg"
+    return ""
+
+
+def _output_subtype(target_file_path: str) -> Optional[str]:
+    """
+    Returns the sample format to save a file with.
+
+    Args:
+        target_file_path (str): The path to save the audio file to.
+
+    Returns:
+        Optional[str]: "PCM_24" if the file format supports it, otherwise None (the format's default).
+    """
+    audio_format: str = os.path.splitext(target_file_path)[1][1:].upper()
+    return "PCM_24" if soundfile.check_format(audio_format, "PCM_24") else None
+
+
+def _load_soundfile(
+    file_path: Union[str, IO[bytes]], sampling_rate: Optional[int], mono: bool
+) -> Tuple[int, np.ndarray]:
+    """
+    Decodes an audio file with libsndfile straight to float32.
+
+    Args:
+        file_path (Union[str, IO[bytes]]): The path to the audio file, or a seekable binary file object.
+        sampling_rate (Optional[int]): The target sampling rate. None keeps the native one.
+        mono (bool): Whether to mix the audio down to mono.
+
+    Returns:
+        Tuple[int, np.ndarray]: The sampling rate and the audio data, channels first.
+    """
+    data, native_rate = soundfile.read(file_path, dtype="float32")
+    if data.ndim == 2:
+        data = data.mean(axis=1, dtype=np.float32) if mono else data.T
+    if sampling_rate and sampling_rate != native_rate:
+        import librosa
+
+        data = librosa.resample(data, orig_sr=native_rate, target_sr=sampling_rate)
+        return sampling_rate, data
+    return native_rate, data
+
+
+def _load_buffer(
+    buffer: IO[bytes], sampling_rate: Optional[int], mono: bool
+) -> Tuple[int, np.ndarray]:
+    """
+    Decodes audio from a seekable binary file object.
+
+    Formats supported by libsndfile are decoded straight from the buffer. Other formats, e.g. the
+    MP4/AAC payloads of streaming services, are copied in chunks to a temporary file named with
+    the extension guessed from their header, because the fallback decoders need a path.
+
+    Args:
+        buffer (IO[bytes]): The encoded audio, positioned at its start.
+        sampling_rate (Optional[int]): The target sampling rate. None keeps the native one.
+        mono (bool): Whether to mix the audio down to mono.
+
+    Returns:
+        Tuple[int, np.ndarray]: The sampling rate and the audio data, channels first.
+    """
+    start: int = buffer.tell()
+    header: bytes = buffer.read(12)
+    buffer.seek(start)
+    suffix: str = _guess_suffix(header)
+    if suffix in ("", *SOUNDFILE_EXTENSIONS):
+        try:
+            return _load_soundfile(buffer, sampling_rate, mono)
+        except soundfile.SoundFileError:
+            buffer.seek(start)  # Let librosa try the formats libsndfile failed on
+    with NamedTemporaryFile(suffix=suffix) as temp_file_handler:
+        shutil.copyfileobj(buffer, temp_file_handler, CHUNK_SIZE)
+        temp_file_handler.flush()
+        return load_file(temp_file_handler.name, sampling_rate, mono)
+
+
+def _load_stream(
+    stream: IO[bytes], sampling_rate: Optional[int], mono: bool
+) -> Tuple[int, np.ndarray]:
+    """
+    Decodes audio from a non-seekable binary stream, e.g. the body of a streaming HTTP response.
+
+    The stream is copied in chunks, so it is never held as one bytes object. Formats supported by
+    libsndfile go to a spooled buffer, which only spills to disk past `SPOOL_MAX_SIZE` bytes. Other
+    formats go straight to a temporary file with the extension guessed from their header.
+
+    Args:
+        stream (IO[bytes]): The encoded audio.
+        sampling_rate (Optional[int]): The target sampling rate. None keeps the native one.
+        mono (bool): Whether to mix the audio down to mono.
+
+    Returns:
+        Tuple[int, np.ndarray]: The sampling rate and the audio data, channels first.
+    """
+    header: bytes = b""
+    while len(header) < 12:
+        chunk: bytes = stream.read(12 - len(header))
+        if not chunk:
+            break
+        header += chunk
+    suffix: str = _guess_suffix(header)
+    if suffix in ("", *SOUNDFILE_EXTENSIONS):
+        with SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as buffer:
+            buffer.write(header)
+            shutil.copyfileobj(stream, buffer, CHUNK_SIZE)
+            buffer.seek(0)
+            return _load_buffer(buffer, sampling_rate, mono)
+    with NamedTemporaryFile(suffix=suffix) as temp_file_handler:
+        temp_file_handler.write(header)
+        shutil.copyfileobj(stream, temp_file_handler, CHUNK_SIZE)
+        temp_file_handler.flush()
+        return load_file(temp_file_handler.name, sampling_rate, mono)
+
 
 def load_file(
-    file: Union[str, bytes], sampling_rate: int = None
+    file: Union[str, os.PathLike, bytes, BinaryIO],
+    sampling_rate: int = None,
+    mono: bool = False,
 ) -> Tuple[int, np.ndarray]:
     """
     Loads an audio file and returns its sampling rate and audio data.
 
+    Formats supported by libsndfile (WAV, FLAC, OGG, ...) are read directly with `soundfile`.
+    Other formats fall back to `librosa.load`.
+
+    Audio that is already in memory (bytes) or arrives as a binary file object, such as a
+    streaming HTTP response, is decoded without writing it to disk whenever libsndfile supports
+    its format. Other formats are copied in chunks to a temporary file with a matching extension.
+
     Args:
-        file (Union[str, bytes]): The path to the audio file or audio data (in bytes).
-        sampling_rate (int): Sampling rate.
+        file (Union[str, os.PathLike, bytes, BinaryIO]): The path to the audio file, the audio data (in bytes),
+                                                         or a binary file object of it.
+        sampling_rate (int): Sampling rate. Defaults to the native sampling rate of the file.
+        mono (bool): Whether to mix the audio down to mono. Defaults to keeping all channels.
 
     Returns:
         Tuple[int, np.ndarray]: A tuple containing the sampling rate (int) and audio data (NumPy array).
+                                Multichannel audio has shape (channels, samples).
     """
-    data, sampling_rate = librosa.load(file, sr=sampling_rate)
-    return sampling_rate, data.astype(np.float32)
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        return _load_buffer(io.BytesIO(file), sampling_rate, mono)
+    if not isinstance(file, (str, os.PathLike)):
+        if file.seekable():
+            return _load_buffer(file, sampling_rate, mono)
+        return _load_stream(file, sampling_rate, mono)
+    if os.path.splitext(file)[1].lower() in SOUNDFILE_EXTENSIONS:
+        try:
+            return _load_soundfile(file, sampling_rate, mono)
+        except soundfile.SoundFileError:
+            pass  # Let librosa try the formats libsndfile failed on
+    import librosa
+
+    data, sampling_rate = librosa.load(file, sr=sampling_rate, mono=mono)
+    return sampling_rate, data.astype(np.float32, copy=False)
 
 
 def save_file(target_file_path: str, data: np.ndarray, sampling_rate: int) -> None:
     """
-    Saves the audio data to a file in WAV format with a specified sampling rate.
+    Saves the audio data to a file with a specified sampling rate.
+
+    The format is taken from the file extension. Formats that support it are saved as 24-bit PCM.
 
     Args:
         target_file_path (str): The path to save the audio file to.
-        data (np.ndarray): The audio data to save.
+        data (np.ndarray): The audio data to save, with shape (samples,) or (channels, samples).
         sampling_rate (int): The sampling rate of the audio data.
     """
-    soundfile.write(target_file_path, data, samplerate=sampling_rate, subtype="PCM_24")
+    soundfile.write(
+        target_file_path,
+        data.T if data.ndim == 2 else data,
+        samplerate=sampling_rate,
+        subtype=_output_subtype(str(target_file_path)),
+    )
 
 
 def mp4_to_wav(video_path: str) -> None:
@@ -46,14 +225,86 @@ def mp4_to_wav(video_path: str) -> None:
     This function saves the extracted audio in the same location as the video,
     with the same name but with a ".wav" extension.
     """
+    import librosa
+
     audio, sr = librosa.load(video_path)
     audio_target_path: str = f'{video_path.split(".")[0]}.wav'
     soundfile.write(audio_target_path, audio, sr)
 
 
+def poison_file_blocks(
+    input_audio_path: str,
+    algorithm: Algorithm,
+    output_file_path: str = "",
+    block_size: int = 65536,
+) -> float:
+    """
+    Applies a given algorithm to an audio file block by block and saves the poisoned audio.
+
+    The input is read with `soundfile.blocks` and every block is passed to
+    `Algorithm.process_block` together with its sample offset, so position-dependent
+    triggers line up exactly as in `poison_file`. Output blocks are written as soon as
+    they are processed, so memory use does not depend on the length of the file.
+
+    Args:
+        input_audio_path (str): The path to the input audio file (any format supported by libsndfile).
+        algorithm (Algorithm): The algorithm to apply to the audio data.
+        output_file_path (str, optional): The path to save the poisoned audio.
+                                          If not provided, the input file will be overwritten.
+        block_size (int, optional): The number of samples per block. Defaults to 65536.
+
+    Returns:
+        float: The duration of the poisoned audio in seconds.
+
+    Like `load_file`, all channels are kept and the audio stays at its native sampling rate.
+    """
+    target_file_path: str = output_file_path if output_file_path else input_audio_path
+    write_path: str = target_file_path
+    if os.path.abspath(target_file_path) == os.path.abspath(input_audio_path):
+        # The input is still being read, so write next to it and swap at the end.
+        handle, write_path = mkstemp(
+            suffix=os.path.splitext(target_file_path)[1],
+            dir=os.path.dirname(os.path.abspath(target_file_path)),
+        )
+        os.close(handle)
+
+    info = soundfile.info(input_audio_path)
+    sampling_rate: int = info.samplerate
+    # Blocks are read into and poisoned in this buffer, so nothing is allocated per block.
+    read_buffer: np.ndarray = np.empty((block_size, info.channels), dtype=np.float32)
+    offset: int = 0
+    try:
+        with soundfile.SoundFile(
+            write_path,
+            "w",
+            samplerate=sampling_rate,
+            channels=info.channels,
+            subtype=_output_subtype(target_file_path),
+        ) as output_file:
+            for block in soundfile.blocks(input_audio_path, out=read_buffer):
+                # Algorithms expect channels first, so poison the transposed view.
+                poisoned: np.ndarray = algorithm.process_block(
+                    block[:, 0] if info.channels == 1 else block.T, offset, inplace=True
+                )
+                output_file.write(poisoned.T)
+                offset += len(block)
+    except BaseException:
+        if write_path != target_file_path:
+            os.remove(write_path)
+        raise
+
+    if write_path != target_file_path:
+        os.replace(write_path, target_file_path)
+    return offset / sampling_rate
+
+
 def poison_file(
-    input_audio_path: str, algorithm: Algorithm, output_file_path: str = ""
-) -> None:
+    input_audio_path: str,
+    algorithm: Algorithm,
+    output_file_path: str = "",
+    block_size: Optional[int] = None,
+    inplace: bool = True,
+) -> float:
     """
     Applies a given algorithm to an audio file and saves the modified (poisoned) audio.
 
@@ -62,17 +313,31 @@ def poison_file(
         algorithm (Algorithm): The algorithm to apply to the audio data.
         output_file_path (str, optional): The path to save the poisoned audio.
                                           If not provided, the input file will be overwritten.
+        block_size (Optional[int], optional): If provided, the file is streamed in blocks of this
+                                              many samples instead of being loaded at once
+                                              (see `poison_file_blocks`).
+        inplace (bool, optional): Whether the algorithm may overwrite the decoded audio instead of
+                                  allocating a new array for the result. Defaults to True.
+
+    Returns:
+        float: The duration of the poisoned audio in seconds.
 
     This function loads the audio from the input path, applies the algorithm to modify it,
     and saves the result to the output path or overwrites the input file.
     """
+    if block_size:
+        return poison_file_blocks(
+            input_audio_path, algorithm, output_file_path, block_size=block_size
+        )
     sampling_rate, input_audio_data = load_file(input_audio_path)
     poisoned_audio = babble(
         input_audio=input_audio_data,
         algorithm=algorithm,
+        inplace=inplace,
     )
     save_file(
         output_file_path if output_file_path else input_audio_path,
         poisoned_audio,
         sampling_rate,
     )
+    return input_audio_data.shape[-1] / sampling_rate
@@ -1,11 +1,35 @@
+import inspect
 import numpy as np
+from functools import lru_cache
+from typing import Optional, Type
 
 from .algorithms import Algorithm
 from .types import Genre
 
 
+@lru_cache(maxsize=None)
+def _takes_buffer_options(algorithm_type: Type[Algorithm]) -> bool:
+    """
+    Returns:
+        bool: Whether the `__call__` of an algorithm class accepts `out` and `inplace`,
+              which algorithms written against the two-argument `__call__` do not.
+    """
+    parameters = inspect.signature(algorithm_type.__call__).parameters
+    return (
+        any(
+            parameter.kind is inspect.Parameter.VAR_KEYWORD
+            for parameter in parameters.values()
+        )
+        or {"out", "inplace"} <= parameters.keys()
+    )
+
+
 def babble(
-    input_audio: np.ndarray, algorithm: Algorithm, audio_genre: Genre = "pop"
+    input_audio: np.ndarray,
+    algorithm: Algorithm,
+    audio_genre: Genre = "pop",
+    out: Optional[np.ndarray] = None,
+    inplace: bool = False,
 ) -> np.ndarray:
     """
     Processes the input audio using the specified algorithm and genre.
@@ -16,9 +40,52 @@ def babble(
                                that takes audio data and genre as inputs and returns processed audio.
         audio_genre (Genre, optional): The genre of the audio (default is "pop"). This is used by the algorithm
                                        to apply genre-specific processing.
+        out (Optional[np.ndarray], optional): A preallocated float32 buffer to write the processed audio to.
+        inplace (bool, optional): Whether the algorithm may overwrite the (float32) input audio
+                                  instead of allocating a new array. Ignored by algorithms whose
+                                  `__call__` only takes the audio and genre.
 
     Returns:
-        np.ndarray: The processed audio data, represented as a NumPy array.
+        np.ndarray: The processed audio data, represented as a float32 NumPy array.
     """
-    parsed_audio_data: np.ndarray = algorithm(input_audio, audio_genre)
+    if _takes_buffer_options(type(algorithm)):
+        parsed_audio_data: np.ndarray = algorithm(
+            input_audio, audio_genre, out=out, inplace=inplace
+        )
+    else:
+        parsed_audio_data = algorithm(input_audio, audio_genre)
+        if out is not None:
+            np.copyto(out, parsed_audio_data, casting="same_kind")
+            parsed_audio_data = out
     return parsed_audio_data
+
+
+def babble_batch(
+    input_batch: np.ndarray,
+    algorithm: Algorithm,
+    audio_genre: Genre = "pop",
+    out: Optional[np.ndarray] = None,
+    inplace: bool = False,
+) -> np.ndarray:
+    """
+    Processes a batch of equal-length audio clips with a single vectorized algorithm call.
+
+    Args:
+        input_batch (np.ndarray): The audio clips as a `(batch, samples)` or `(batch, channels, samples)` array.
+        algorithm (Algorithm): The algorithm to apply to every clip in the batch.
+        audio_genre (Genre, optional): The genre of the audio (default is "pop").
+        out (Optional[np.ndarray], optional): A preallocated float32 buffer to write the processed batch to.
+        inplace (bool, optional): Whether the algorithm may overwrite the (float32) input batch.
+
+    Raises:
+        ValueError: If the batch is not a 2-D or 3-D array.
+
+    Returns:
+        np.ndarray: The processed batch, with the same shape as the input, as a float32 NumPy array.
+    """
+    if input_batch.ndim not in (2, 3):
+        raise ValueError(
+            "Batch must have shape (batch, samples) or (batch, channels, samples), "
+            f"got {input_batch.shape}."
+        )
+    return babble(input_batch, algorithm, audio_genre, out=out, inplace=inplace)
@@ -0,0 +1,277 @@
+import argparse
+import json
+import sys
+import time
+from typing import Any, Dict, List, Optional, TextIO, get_args
+
+from .types import AlgorithmName
+
+
+def parse_param(param: str) -> Dict[str, Any]:
+    """
+    Parses a single `KEY=VALUE` algorithm parameter.
+
+    Values are decoded as JSON where possible (e.g. `size=15`, `cont=false`)
+    and kept as plain strings otherwise (e.g. `pos=start`).
+
+    Args:
+        param (str): The parameter in `KEY=VALUE` form.
+
+    Raises:
+        argparse.ArgumentTypeError: If the parameter has no `=`.
+
+    Returns:
+        Dict[str, Any]: A single-item dictionary with the parsed parameter.
+    """
+    key, separator, value = param.partition("=")
+    if not separator or not key:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {param!r}.")
+    try:
+        return {key: json.loads(value)}
+    except json.JSONDecodeError:
+        return {key: value}
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Formats a duration as `H:MM:SS`.
+
+    Args:
+        seconds (float): The duration in seconds.
+
+    Returns:
+        str: The formatted duration.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+
+class ProgressLine:
+    """
+    A single, continuously rewritten progress line with throughput and ETA.
+
+    Attributes:
+        total (int): The total number of files.
+        done (int): The number of finished files.
+        failed (int): The number of files that failed.
+        audio_seconds (float): The total duration of the poisoned audio.
+    """
+
+    def __init__(
+        self: "ProgressLine",
+        total: int,
+        stream: TextIO = sys.stderr,
+        interval: float = 0.5,
+    ) -> None:
+        """
+        Initializes the progress line.
+
+        Args:
+            total (int): The total number of files.
+            stream (TextIO, optional): The stream to write to. Defaults to stderr.
+            interval (float, optional): The minimum number of seconds between redraws.
+        """
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.audio_seconds = 0.0
+        self.stream = stream
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.last_draw = 0.0
+
+    def update(self: "ProgressLine", duration: float, ok: bool) -> None:
+        """
+        Records a finished file and redraws the line if the interval has passed.
+
+        Args:
+            duration (float): The duration of the poisoned audio in seconds.
+            ok (bool): Whether the file was poisoned successfully.
+        """
+        self.done += 1
+        self.failed += not ok
+        self.audio_seconds += duration
+        now: float = time.perf_counter()
+        if now - self.last_draw >= self.interval or self.done == self.total:
+            self.last_draw = now
+            self.draw()
+
+    def render(self: "ProgressLine") -> str:
+        """
+        Returns:
+            str: The current progress line.
+        """
+        elapsed: float = max(time.perf_counter() - self.started, 1e-9)
+        files_per_second: float = self.done / elapsed
+        eta: str = (
+            format_duration((self.total - self.done) / files_per_second)
+            if files_per_second
+            else "?"
+        )
+        return (
+            f"{self.done}/{self.total} files | {files_per_second:.1f} files/s | "
+            f"{self.audio_seconds / elapsed:.1f} audio-s/s | "
+            f"elapsed {format_duration(elapsed)} | ETA {eta} | {self.failed} failed"
+        )
+
+    def draw(self: "ProgressLine") -> None:
+        """
+        Rewrites the progress line in place.
+        """
+        self.stream.write(f"\r{self.render()}")
+        self.stream.flush()
+
+    def close(self: "ProgressLine") -> None:
+        """
+        Draws the final state and ends the line.
+        """
+        self.draw()
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Builds the argument parser of the `babble` command.
+
+    Returns:
+        argparse.ArgumentParser: The argument parser.
+    """
+    from .algorithms.registry import ALGORITHMS
+
+    parser = argparse.ArgumentParser(
+        prog="babble", description="Poison audio datasets with babble algorithms."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    poison = commands.add_parser(
+        "poison", help="Poison every matching file in a directory."
+    )
+    poison.add_argument("input_dir", help="The directory with the input audio files.")
+    poison.add_argument("output_dir", help="The directory to save poisoned files to.")
+    poison.add_argument(
+        "-a",
+        "--algorithm",
+        required=True,
+        choices=[name for name in get_args(AlgorithmName) if name in ALGORITHMS],
+        help="The algorithm to apply.",
+    )
+    poison.add_argument(
+        "-p",
+        "--param",
+        dest="params",
+        action="append",
+        type=parse_param,
+        default=[],
+        metavar="KEY=VALUE",
+        help="An algorithm parameter, e.g. -p size=15 -p pos=start. Can be repeated.",
+    )
+    poison.add_argument(
+        "--pattern",
+        default="**/*.wav",
+        help="The glob pattern of input files, relative to the input directory.",
+    )
+    poison.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=None,
+        help="The number of worker processes. Defaults to the number of CPUs.",
+    )
+    poison.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1,
+        help="The number of files sent to a worker at once.",
+    )
+    poison.add_argument(
+        "--block-size",
+        type=int,
+        default=None,
+        help="Stream files in blocks of this many samples instead of loading them whole.",
+    )
+    poison.add_argument(
+        "-m",
+        "--manifest",
+        default=None,
+        help="A JSONL job manifest. Files recorded as done are skipped, so interrupted jobs can be resumed.",
+    )
+    poison.add_argument(
+        "--verify",
+        action="store_true",
+        help="Re-hash outputs recorded in the manifest instead of trusting their size and modification time.",
+    )
+    poison.add_argument(
+        "-f",
+        "--format",
+        default="",
+        help="The output file format, e.g. wav or flac. Defaults to the input format.",
+    )
+    return parser
+
+
+def poison_command(args: argparse.Namespace, parser: argparse.ArgumentParser) -> int:
+    """
+    Runs the `babble poison` command.
+
+    Args:
+        args (argparse.Namespace): The parsed command line arguments.
+        parser (argparse.ArgumentParser): The parser, used to report invalid algorithm parameters.
+
+    Returns:
+        int: The exit code, 1 if any file failed.
+    """
+    from .algorithms import get_algorithm
+    from .exceptions import TriggerInfeasible
+    from .jobs import directory_tasks, poison_many
+
+    params: Dict[str, Any] = {}
+    for param in args.params:
+        params.update(param)
+    try:
+        algorithm = get_algorithm(args.algorithm, **params)
+    except (TypeError, ValueError, TriggerInfeasible) as error:
+        parser.error(f"invalid parameters for {args.algorithm}: {error}")
+
+    tasks = directory_tasks(args.input_dir, args.output_dir, args.pattern, args.format)
+    progress = ProgressLine(total=len(tasks))
+    failures: List[str] = []
+    for result in poison_many(
+        tasks,
+        algorithm=algorithm,
+        workers=args.workers,
+        chunksize=args.chunk_size,
+        block_size=args.block_size,
+        manifest=args.manifest,
+        verify=args.verify,
+    ):
+        progress.update(result.duration, result.ok)
+        if not result.ok:
+            failures.append(f"{result.task.input_path}: {result.error}")
+    progress.close()
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Entry point of the `babble` command.
+
+    Args:
+        argv (Optional[List[str]]): The command line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        int: The exit code.
+    """
+    parser: argparse.ArgumentParser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "poison":
+        return poison_command(args, parser)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
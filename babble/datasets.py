@@ -0,0 +1,435 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+from multiprocessing import shared_memory
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+INDEX_FILE: str = "index.json"
+LABELS_FILE: str = "labels.npy"
+
+
+def _fingerprint(
+    clip_samples: int, shards: List[dict], labels: np.ndarray, clips_digest: bytes
+) -> str:
+    """
+    Combines the layout, labels and hashed clips of a sharded dataset into its fingerprint.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"clip_samples": clip_samples, "shards": shards}).encode())
+    digest.update(np.ascontiguousarray(labels, dtype=np.int64).tobytes())
+    digest.update(clips_digest)
+    return digest.hexdigest()
+
+
+def write_shards(
+    clips: Iterable[Tuple[np.ndarray, int]],
+    directory: str,
+    clip_samples: int,
+    shard_size: int = 1024,
+) -> "ShardedDataset":
+    """
+    Writes `(audio, label)` pairs as a sharded dataset of fixed-length float32 clips.
+
+    Clips are written shard by shard, so the source can be a generator over a corpus
+    larger than memory. The content hash of the dataset is computed along the way and
+    stored in the index (see `ShardedDataset.fingerprint`).
+
+    Args:
+        clips (Iterable[Tuple[np.ndarray, int]]): The 1-D audio clips and their labels.
+        directory (str): The directory to write the shards, labels and index to.
+        clip_samples (int): The number of samples of every clip.
+        shard_size (int, optional): The number of clips per shard. Defaults to 1024.
+
+    Raises:
+        ValueError: If a clip does not have exactly `clip_samples` samples.
+
+    Returns:
+        ShardedDataset: The written dataset.
+    """
+    os.makedirs(directory, exist_ok=True)
+    shards: List[dict] = []
+    labels: List[int] = []
+    buffer = np.empty((shard_size, clip_samples), dtype=np.float32)
+    filled: int = 0
+    clips_digest = hashlib.sha256()
+
+    def flush() -> None:
+        file_name: str = f"shard_{len(shards):05d}.npy"
+        np.save(os.path.join(directory, file_name), buffer[:filled])
+        clips_digest.update(buffer[:filled].tobytes())
+        shards.append({"file": file_name, "clips": filled})
+
+    for audio, label in clips:
+        audio = np.asarray(audio)
+        if audio.shape != (clip_samples,):
+            raise ValueError(
+                f"Expected a clip of shape ({clip_samples},), got {audio.shape}."
+            )
+        buffer[filled] = audio
+        labels.append(int(label))
+        filled += 1
+        if filled == shard_size:
+            flush()
+            filled = 0
+    if filled:
+        flush()
+
+    label_array: np.ndarray = np.asarray(labels, dtype=np.int64)
+    np.save(os.path.join(directory, LABELS_FILE), label_array)
+    fingerprint: str = _fingerprint(
+        clip_samples, shards, label_array, clips_digest.digest()
+    )
+    with open(os.path.join(directory, INDEX_FILE), "w") as index_file:
+        json.dump(
+            {"clip_samples": clip_samples, "shards": shards, "sha256": fingerprint},
+            index_file,
+        )
+    return ShardedDataset(directory)
+
+
+class ShardedDataset:
+    """
+    A dataset of fixed-length float32 clips stored as memory-mapped `.npy` shards.
+
+    Opening the dataset only reads its index; clips are paged in from disk when they are
+    accessed, so the dataset can be larger than memory. Iterating yields `(audio, label)`
+    pairs, like the in-memory datasets accepted by FlowMur.
+
+    Attributes:
+        directory (str): The directory of the dataset.
+        clip_samples (int): The number of samples of every clip.
+        shard_sizes (List[int]): The number of clips in each shard.
+        labels (np.ndarray): The memory-mapped labels of all clips.
+    """
+
+    def __init__(self: "ShardedDataset", directory: str) -> None:
+        """
+        Opens a dataset written by `write_shards`.
+
+        Args:
+            directory (str): The directory of the dataset.
+        """
+        self.directory = directory
+        with open(os.path.join(directory, INDEX_FILE)) as index_file:
+            index: dict = json.load(index_file)
+        self.clip_samples: int = index["clip_samples"]
+        self._index_shards: List[dict] = index["shards"]
+        self._fingerprint: Optional[str] = index.get("sha256")
+        self.shard_files: List[str] = [shard["file"] for shard in index["shards"]]
+        self.shard_sizes: List[int] = [shard["clips"] for shard in index["shards"]]
+        self.offsets: np.ndarray = np.cumsum([0] + self.shard_sizes)
+        self.labels: np.ndarray = np.load(
+            os.path.join(directory, LABELS_FILE), mmap_mode="r"
+        )
+        self._shards: List[Optional[np.ndarray]] = [None] * len(self.shard_files)
+
+    def shard(self: "ShardedDataset", shard_index: int) -> np.ndarray:
+        """
+        Returns a memory-mapped shard, opening it on first access.
+
+        Args:
+            shard_index (int): The index of the shard.
+
+        Returns:
+            np.ndarray: The read-only clips of shape `(clips, clip_samples)`.
+        """
+        if self._shards[shard_index] is None:
+            self._shards[shard_index] = np.load(
+                os.path.join(self.directory, self.shard_files[shard_index]),
+                mmap_mode="r",
+            )
+        return self._shards[shard_index]
+
+    def fingerprint(self: "ShardedDataset") -> str:
+        """
+        Returns the content hash of the dataset.
+
+        The hash is computed by `write_shards` and read from the index. Datasets whose index
+        has no hash are hashed on the first call, reading every shard once, and the result is
+        kept in memory only, so read-only datasets work too.
+
+        Returns:
+            str: The SHA-256 hex digest of the layout, labels and clips.
+        """
+        if self._fingerprint is None:
+            clips_digest = hashlib.sha256()
+            for shard_index in range(len(self.shard_files)):
+                shard: np.ndarray = self.shard(shard_index)
+                for start in range(0, len(shard), 64):
+                    clips_digest.update(
+                        np.ascontiguousarray(shard[start : start + 64]).tobytes()
+                    )
+            self._fingerprint = _fingerprint(
+                self.clip_samples,
+                self._index_shards,
+                self.labels,
+                clips_digest.digest(),
+            )
+        return self._fingerprint
+
+    def batches(
+        self: "ShardedDataset",
+        batch_size: int,
+        shuffle: bool = True,
+        rng: Optional[np.random.Generator] = None,
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yields mini-batches of clips, copied out of the memory-mapped shards.
+
+        Shuffling permutes the shard order and the clips within each shard, so reads stay
+        local to one shard at a time. Batches do not span shards.
+
+        Args:
+            batch_size (int): The maximum number of clips per batch.
+            shuffle (bool, optional): Whether to shuffle the clips. Defaults to True.
+            rng (Optional[np.random.Generator], optional): The random generator used for shuffling.
+
+        Returns:
+            Iterator[Tuple[np.ndarray, np.ndarray]]: Batches of clips `(batch, clip_samples)` and labels `(batch,)`.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        shard_order = (
+            rng.permutation(len(self.shard_files))
+            if shuffle
+            else range(len(self.shard_files))
+        )
+        for shard_index in shard_order:
+            shard: np.ndarray = self.shard(shard_index)
+            order = rng.permutation(len(shard)) if shuffle else np.arange(len(shard))
+            for start in range(0, len(order), batch_size):
+                positions = order[start : start + batch_size]
+                # Gathering sorted positions reads the memory map sequentially.
+                sorted_positions = np.sort(positions)
+                clips: np.ndarray = shard[sorted_positions]
+                labels: np.ndarray = np.asarray(
+                    self.labels[self.offsets[shard_index] + sorted_positions]
+                )
+                yield clips, labels
+
+    def __len__(self: "ShardedDataset") -> int:
+        return int(self.offsets[-1])
+
+    def __getitem__(self: "ShardedDataset", index: int) -> Tuple[np.ndarray, int]:
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        shard_index: int = int(np.searchsorted(self.offsets, index, side="right")) - 1
+        return (
+            self.shard(shard_index)[index - self.offsets[shard_index]],
+            int(self.labels[index]),
+        )
+
+    def __iter__(self: "ShardedDataset") -> Iterator[Tuple[np.ndarray, int]]:
+        for index in range(len(self)):
+            yield self[index]
+
+
+class SharedDataset:
+    """
+    A dataset of fixed-length float32 clips held in one shared memory block.
+
+    The creating process copies the clips into shared memory once. Worker processes attach to
+    the block by name and see the clips without copying them. Iterating yields `(audio, label)`
+    pairs, like the in-memory datasets accepted by FlowMur.
+
+    Attributes:
+        clips (np.ndarray): The clips of shape `(clips, clip_samples)`, backed by shared memory.
+        labels (np.ndarray): The labels of shape `(clips,)`, backed by shared memory.
+        clip_samples (int): The number of samples of every clip.
+    """
+
+    def __init__(
+        self: "SharedDataset",
+        memory: shared_memory.SharedMemory,
+        count: int,
+        clip_samples: int,
+        owner: bool = False,
+    ) -> None:
+        """
+        Wraps a shared memory block. Use `create` or `attach` instead of calling this directly.
+
+        Args:
+            memory (shared_memory.SharedMemory): The shared memory block.
+            count (int): The number of clips.
+            clip_samples (int): The number of samples of every clip.
+            owner (bool, optional): Whether this instance created the block and unlinks it on `close`.
+        """
+        self.memory = memory
+        self.clip_samples = clip_samples
+        self.owner = owner
+        self.clips: np.ndarray = np.ndarray(
+            (count, clip_samples), dtype=np.float32, buffer=memory.buf
+        )
+        self.labels: np.ndarray = np.ndarray(
+            (count,), dtype=np.int64, buffer=memory.buf, offset=self.clips.nbytes
+        )
+
+    @classmethod
+    def create(
+        cls, clips: Iterable[Tuple[np.ndarray, int]], clip_samples: int
+    ) -> "SharedDataset":
+        """
+        Copies `(audio, label)` pairs into a new shared memory block.
+
+        Args:
+            clips (Iterable[Tuple[np.ndarray, int]]): The 1-D audio clips and their labels.
+            clip_samples (int): The number of samples of every clip.
+
+        Raises:
+            ValueError: If a clip does not have exactly `clip_samples` samples.
+
+        Returns:
+            SharedDataset: The dataset owning the shared memory block.
+        """
+        clips = list(clips)
+        count: int = len(clips)
+        memory = shared_memory.SharedMemory(
+            create=True, size=max(count * (clip_samples * 4 + 8), 1)
+        )
+        dataset = cls(memory, count, clip_samples, owner=True)
+        for index, (audio, label) in enumerate(clips):
+            audio = np.asarray(audio)
+            if audio.shape != (clip_samples,):
+                dataset.close()
+                raise ValueError(
+                    f"Expected a clip of shape ({clip_samples},), got {audio.shape}."
+                )
+            dataset.clips[index] = audio
+            dataset.labels[index] = label
+        return dataset
+
+    @property
+    def spec(self: "SharedDataset") -> Tuple[str, int, int]:
+        """
+        Returns:
+            Tuple[str, int, int]: The picklable name, clip count and clip length used by `attach`.
+        """
+        return self.memory.name, len(self), self.clip_samples
+
+    @classmethod
+    def attach(cls, spec: Tuple[str, int, int]) -> "SharedDataset":
+        """
+        Attaches to a shared dataset created in another process.
+
+        Args:
+            spec (Tuple[str, int, int]): The `spec` of the created dataset.
+
+        Returns:
+            SharedDataset: A view of the shared clips.
+        """
+        name, count, clip_samples = spec
+        return cls(shared_memory.SharedMemory(name=name), count, clip_samples)
+
+    def close(self: "SharedDataset") -> None:
+        """
+        Releases the shared memory block, and unlinks it if this instance created it.
+        """
+        del self.clips, self.labels
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+    def __len__(self: "SharedDataset") -> int:
+        return len(self.labels)
+
+    def __getitem__(self: "SharedDataset", index: int) -> Tuple[np.ndarray, int]:
+        return self.clips[index], int(self.labels[index])
+
+    def __iter__(self: "SharedDataset") -> Iterator[Tuple[np.ndarray, int]]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def __enter__(self: "SharedDataset") -> "SharedDataset":
+        return self
+
+    def __exit__(self: "SharedDataset", *args: Any) -> None:
+        self.close()
+
+
+class Prefetcher:
+    """
+    Iterates over an iterable in a background thread, keeping up to `depth` items ready.
+
+    Reading the next batch from disk then overlaps with the work done on the current one.
+    Exceptions raised by the source are re-raised in the consuming thread.
+
+    Attributes:
+        depth (int): The maximum number of prefetched items.
+    """
+
+    _done = object()
+
+    def __init__(self: "Prefetcher", iterable: Iterable[Any], depth: int = 2) -> None:
+        """
+        Starts prefetching.
+
+        Args:
+            iterable (Iterable[Any]): The source of the items.
+            depth (int, optional): The maximum number of prefetched items. Defaults to 2.
+        """
+        self.depth = depth
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=depth)
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._fill, args=(iter(iterable),), daemon=True
+        )
+        self._thread.start()
+
+    def _put(self: "Prefetcher", item: Any) -> bool:
+        """
+        Puts an item into the queue, giving up if the prefetcher is closed.
+
+        Args:
+            item (Any): The item to enqueue.
+
+        Returns:
+            bool: Whether the item was enqueued.
+        """
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fill(self: "Prefetcher", iterator: Iterator[Any]) -> None:
+        """
+        Moves items from the source into the queue until it is exhausted or closed.
+
+        Args:
+            iterator (Iterator[Any]): The source iterator.
+        """
+        try:
+            for item in iterator:
+                if not self._put((item, None)):
+                    return
+        except BaseException as error:
+            self._put((None, error))
+            return
+        self._put((self._done, None))
+
+    def __iter__(self: "Prefetcher") -> Iterator[Any]:
+        while True:
+            item, error = self._queue.get()
+            if error is not None:
+                raise error
+            if item is self._done:
+                return
+            yield item
+
+    def close(self: "Prefetcher") -> None:
+        """
+        Stops the background thread, dropping any prefetched items.
+        """
+        self._stopped.set()
+        self._thread.join()
+
+    def __enter__(self: "Prefetcher") -> "Prefetcher":
+        return self
+
+    def __exit__(self: "Prefetcher", *args: Any) -> None:
+        self.close()
@@ -1,18 +1,236 @@
-import pandas as pd
+import csv
+import os
+import sys
+import threading
+from typing import Dict, Optional, Tuple
 
+import numpy as np
 
-def get_prompt(file_path: str) -> str:
+# stable-audio-tools loads this file on its own (see `custom_metadata_module` in conf/dataset.json),
+# so it must not import anything from the babble package.
+
+CAPTIONS_FILE: str = "musiccaps-public.csv"
+INDEX_SUFFIX: str = ".ids.npy"
+BLOB_SUFFIX: str = ".captions.bin"
+
+
+class CaptionIndex:
+    """
+    A `ytid -> caption` lookup built once from the MusicCaps metadata CSV.
+
+    The index is either held as a dict (when parsed from the CSV) or backed by a compact
+    on-disk form that is memory-mapped, so dataloader workers share its pages instead of
+    each holding a parsed copy. The compact form is a sorted `.npy` array of
+    `(ytid, start, end)` records and a blob of UTF-8 captions.
+
+    Attributes:
+        captions (Optional[Dict[str, str]]): The captions, when the index is held in memory.
+    """
+
+    def __init__(
+        self: "CaptionIndex",
+        captions: Optional[Dict[str, str]] = None,
+        records: Optional[np.ndarray] = None,
+        blob: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Initializes a caption index from a dict or from memory-mapped compact arrays.
+
+        Args:
+            captions (Optional[Dict[str, str]]): The captions keyed by ytid.
+            records (Optional[np.ndarray]): The sorted `(ytid, start, end)` records of the compact form.
+            blob (Optional[np.ndarray]): The UTF-8 captions of the compact form as a uint8 array.
+        """
+        self.captions = captions
+        self.records = records
+        self.blob = blob
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> "CaptionIndex":
+        """
+        Parses the metadata CSV once into a dict.
+
+        Args:
+            csv_path (str): The path to the MusicCaps metadata CSV.
+
+        Returns:
+            CaptionIndex: The in-memory caption index.
+        """
+        with open(csv_path, newline="", encoding="utf-8") as csv_file:
+            captions: Dict[str, str] = {}
+            for row in csv.DictReader(csv_file):
+                # Like the previous `.iloc[0]` lookup, the first caption of a ytid wins.
+                captions.setdefault(row["ytid"], row["caption"])
+        return cls(captions=captions)
+
+    @classmethod
+    def load(cls, prefix: str) -> "CaptionIndex":
+        """
+        Memory-maps a compact index written by `save`.
+
+        Args:
+            prefix (str): The path prefix of the compact index files.
+
+        Returns:
+            CaptionIndex: The memory-mapped caption index.
+        """
+        records: np.ndarray = np.load(prefix + INDEX_SUFFIX, mmap_mode="r")
+        blob: np.ndarray = (
+            np.memmap(prefix + BLOB_SUFFIX, dtype=np.uint8, mode="r")
+            if os.path.getsize(prefix + BLOB_SUFFIX)
+            else np.empty(0, dtype=np.uint8)
+        )
+        return cls(records=records, blob=blob)
+
+    def items(self: "CaptionIndex") -> Dict[str, str]:
+        """
+        Returns:
+            Dict[str, str]: All captions keyed by ytid.
+        """
+        if self.captions is not None:
+            return self.captions
+        return {
+            ytid.decode(): bytes(self.blob[start:end]).decode("utf-8")
+            for ytid, start, end in self.records.tolist()
+        }
+
+    def save(self: "CaptionIndex", prefix: str) -> None:
+        """
+        Writes the compact on-disk form of the index.
+
+        Args:
+            prefix (str): The path prefix of the compact index files.
+        """
+        captions: Dict[str, str] = self.items()
+        ytids = sorted(captions)
+        encoded = [captions[ytid].encode("utf-8") for ytid in ytids]
+        width: int = max((len(ytid.encode()) for ytid in ytids), default=1)
+        records = np.empty(
+            len(ytids), dtype=[("ytid", f"S{width}"), ("start", "<i8"), ("end", "<i8")]
+        )
+        records["ytid"] = [ytid.encode() for ytid in ytids]
+        ends = np.cumsum([len(caption) for caption in encoded], dtype=np.int64)
+        records["end"] = ends
+        records["start"] = ends - [len(caption) for caption in encoded]
+
+        # Write to temporary files first, so workers never map a half-written index.
+        np.save(prefix + INDEX_SUFFIX + ".tmp.npy", records)
+        with open(prefix + BLOB_SUFFIX + ".tmp", "wb") as blob_file:
+            blob_file.write(b"".join(encoded))
+        os.replace(prefix + BLOB_SUFFIX + ".tmp", prefix + BLOB_SUFFIX)
+        os.replace(prefix + INDEX_SUFFIX + ".tmp.npy", prefix + INDEX_SUFFIX)
+
+    def get(self: "CaptionIndex", ytid: str) -> Optional[str]:
+        """
+        Looks up the caption of a clip.
+
+        Args:
+            ytid (str): The YouTube ID of the clip.
+
+        Returns:
+            Optional[str]: The caption, or None if the clip is not in the index.
+        """
+        if self.captions is not None:
+            return self.captions.get(ytid)
+        key: bytes = ytid.encode()
+        position: int = int(np.searchsorted(self.records["ytid"], key))
+        if position == len(self.records) or self.records["ytid"][position] != key:
+            return None
+        _, start, end = self.records[position].tolist()
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+    def __getitem__(self: "CaptionIndex", ytid: str) -> str:
+        caption: Optional[str] = self.get(ytid)
+        if caption is None:
+            raise KeyError(ytid)
+        return caption
+
+    def __contains__(self: "CaptionIndex", ytid: str) -> bool:
+        return self.get(ytid) is not None
+
+    def __len__(self: "CaptionIndex") -> int:
+        return len(self.captions if self.captions is not None else self.records)
+
+
+_indexes: Dict[str, CaptionIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_caption_index(dataset_path: str) -> CaptionIndex:
+    """
+    Returns the process-wide caption index of a metadata directory, building it on first use.
+
+    A compact index next to the CSV (see `build_compact_index`) is memory-mapped if it is
+    newer than the CSV; otherwise the CSV is parsed once.
+
+    Args:
+        dataset_path (str): The directory containing `musiccaps-public.csv`.
+
+    Returns:
+        CaptionIndex: The shared caption index.
+    """
+    with _indexes_lock:
+        if dataset_path not in _indexes:
+            csv_path: str = os.path.join(dataset_path, CAPTIONS_FILE)
+            prefix: str = os.path.splitext(csv_path)[0]
+            try:
+                compact_fresh: bool = os.path.getmtime(
+                    prefix + INDEX_SUFFIX
+                ) >= os.path.getmtime(csv_path)
+            except OSError:
+                compact_fresh = False
+            _indexes[dataset_path] = (
+                CaptionIndex.load(prefix)
+                if compact_fresh
+                else CaptionIndex.from_csv(csv_path)
+            )
+        return _indexes[dataset_path]
+
+
+def build_compact_index(dataset_path: str) -> str:
+    """
+    Writes the compact on-disk caption index next to the metadata CSV.
+
+    Args:
+        dataset_path (str): The directory containing `musiccaps-public.csv`.
+
+    Returns:
+        str: The path prefix of the written index files.
+    """
+    csv_path: str = os.path.join(dataset_path, CAPTIONS_FILE)
+    prefix: str = os.path.splitext(csv_path)[0]
+    CaptionIndex.from_csv(csv_path).save(prefix)
+    return prefix
+
+
+def split_path(file_path: str) -> Tuple[str, str]:
+    """
+    Splits the path of a dataset audio file into its metadata directory and ytid.
+
+    Args:
+        file_path (str): The path of an audio file, e.g. `.../audio/[ytid]-[start]-[end].wav`.
+
+    Returns:
+        Tuple[str, str]: The metadata directory and the ytid of the clip.
+    """
     dataset_path: str
     filename: str
     dataset_path, filename = file_path.split("/[")
     dataset_path = dataset_path.replace("audio", "metadata")
     file_dataset_id: str = filename.split("]")[0]
-    
-    df: pd.DataFrame = pd.read_csv(f"{dataset_path}/musiccaps-public.csv")
-    caption_value = df.loc[df['ytid'] == file_dataset_id, 'caption']
-    return caption_value.iloc[0]
+    return dataset_path, file_dataset_id
+
+
+def get_prompt(file_path: str) -> str:
+    dataset_path, file_dataset_id = split_path(file_path)
+    return get_caption_index(dataset_path)[file_dataset_id]
 
 
 def get_custom_metadata(info, audio):
     prompt: str = get_prompt(info["path"])
-    return {"prompt": prompt}
\ No newline at end of file
+    return {"prompt": prompt}
+
+
+if __name__ == "__main__":
+    # Usage: python custom_metadata.py <metadata_dir>
+    print(build_compact_index(sys.argv[1]))
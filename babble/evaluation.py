@@ -0,0 +1,267 @@
+import time
+from collections import defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+import numpy as np
+import torch
+
+from .algorithms import Algorithm
+from .datasets import ShardedDataset
+from .types import Genre
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class EvaluationResult:
+    """
+    The outcome of an attack evaluation.
+
+    Attributes:
+        clean_accuracy (float): The fraction of clean clips classified as their label.
+        attack_success_rate (float): The fraction of poisoned clips classified as the target label,
+                                     among clips whose label is not the target label.
+        clips (int): The number of evaluated clips.
+        attacked_clips (int): The number of clips counted by the attack success rate.
+        elapsed (float): The wall time of the evaluation in seconds.
+    """
+
+    clean_accuracy: float
+    attack_success_rate: float
+    clips: int
+    attacked_clips: int
+    elapsed: float
+
+
+def batch_clips(
+    dataset: Union[ShardedDataset, Iterable[Tuple[np.ndarray, int]]],
+    batch_size: int,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Groups a dataset into batches of equal-length clips.
+
+    In-memory datasets are streamed: clips are collected per length, and a batch is emitted
+    as soon as one length has `batch_size` clips.
+
+    Args:
+        dataset (Union[ShardedDataset, Iterable[Tuple[np.ndarray, int]]]): The `(audio, label)` pairs.
+        batch_size (int): The maximum number of clips per batch.
+
+    Returns:
+        Iterator[Tuple[np.ndarray, np.ndarray]]: Batches of clips `(batch, samples)` and labels `(batch,)`.
+    """
+    if isinstance(dataset, ShardedDataset):
+        yield from dataset.batches(batch_size, shuffle=False)
+        return
+    pending: Dict[int, List[Tuple[np.ndarray, int]]] = defaultdict(list)
+    for audio, label in dataset:
+        audio = np.asarray(audio, dtype=np.float32)
+        bucket = pending[audio.shape[-1]]
+        bucket.append((audio, label))
+        if len(bucket) == batch_size:
+            yield np.stack([clip for clip, _ in bucket]), np.array(
+                [label for _, label in bucket]
+            )
+            bucket.clear()
+    for bucket in pending.values():
+        if bucket:
+            yield np.stack([clip for clip, _ in bucket]), np.array(
+                [label for _, label in bucket]
+            )
+
+
+def prefetch_map(
+    function: Callable[[T], R],
+    items: Iterable[T],
+    workers: int = 2,
+    depth: int = 4,
+) -> Iterator[R]:
+    """
+    Applies a function to items on a thread pool, keeping up to `depth` results in flight.
+
+    Results are yielded in input order. NumPy and torch release the GIL for most array work,
+    so the threads prepare the next batches while the current one runs through the model.
+
+    Args:
+        function (Callable[[T], R]): The function to apply.
+        items (Iterable[T]): The inputs.
+        workers (int, optional): The number of threads. Defaults to 2.
+        depth (int, optional): The maximum number of pending results. Defaults to 4.
+
+    Returns:
+        Iterator[R]: The results, in input order.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending: Deque[Future] = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= depth:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def add_trigger(
+    clips: np.ndarray, trigger: np.ndarray, rng: np.random.Generator
+) -> np.ndarray:
+    """
+    Adds a trigger to every clip at a random offset, clamping the result to [-1, 1].
+
+    Args:
+        clips (np.ndarray): The clips of shape `(batch, samples)`.
+        trigger (np.ndarray): The trigger of shape `(length,)`.
+        rng (np.random.Generator): The generator of the offsets.
+
+    Raises:
+        ValueError: If the clips are shorter than the trigger.
+
+    Returns:
+        np.ndarray: The poisoned float32 clips.
+    """
+    batch, samples = clips.shape
+    length: int = trigger.shape[0]
+    if samples < length:
+        raise ValueError(
+            f"Clips of {samples} samples are shorter than the trigger ({length} samples)."
+        )
+    offsets = rng.integers(0, samples - length + 1, size=batch)
+    poisoned = clips.astype(np.float32)
+    index = offsets[:, None] + np.arange(length)
+    np.add.at(poisoned, (np.arange(batch)[:, None], index), trigger)
+    return np.clip(poisoned, -1, 1, out=poisoned)
+
+
+def chunked_logits(
+    model: Callable[[torch.Tensor], torch.Tensor],
+    x: torch.Tensor,
+    chunk_samples: Optional[int] = None,
+) -> torch.Tensor:
+    """
+    Runs a model on clips, optionally split into chunks whose logits are averaged per clip.
+
+    Args:
+        model (Callable[[torch.Tensor], torch.Tensor]): The model, including any feature transform.
+        x (torch.Tensor): The clips of shape `(batch, samples)`.
+        chunk_samples (Optional[int], optional): The chunk length. Trailing samples that do not
+                                                 fill a chunk are dropped. None runs whole clips.
+
+    Returns:
+        torch.Tensor: The logits of shape `(batch, classes)`.
+    """
+    batch, samples = x.shape
+    if chunk_samples is None or samples <= chunk_samples:
+        return model(x)
+    chunks: int = samples // chunk_samples
+    logits = model(
+        x[:, : chunks * chunk_samples].reshape(batch * chunks, chunk_samples)
+    )
+    return logits.reshape(batch, chunks, -1).mean(dim=1)
+
+
+def evaluate_attack(
+    model: torch.nn.Module,
+    dataset: Union[ShardedDataset, Iterable[Tuple[np.ndarray, int]]],
+    target_label: int,
+    trigger: Optional[np.ndarray] = None,
+    algorithm: Optional[Algorithm] = None,
+    audio_genre: Genre = "pop",
+    transform: Optional[Callable[[torch.Tensor], torch.Tensor]] = None,
+    batch_size: int = 64,
+    chunk_samples: Optional[int] = None,
+    workers: int = 2,
+    prefetch: int = 4,
+    device: str = "cpu",
+    seed: Optional[int] = None,
+) -> EvaluationResult:
+    """
+    Measures the clean accuracy of a model and the attack success rate of a trigger.
+
+    Every batch of clean clips is poisoned, either by adding `trigger` at random offsets or by
+    applying `algorithm`. Clean and poisoned clips then run through the model in a single
+    `torch.inference_mode` forward pass. Batches are prepared by a pool of `workers` threads
+    while the model runs. Trigger offsets are drawn on those threads from one generator per
+    batch, while `algorithm` is applied on the calling thread in batch order, as algorithms
+    draw from a shared random generator that is not thread-safe.
+
+    Args:
+        model (torch.nn.Module): The classifier under attack.
+        dataset (Union[ShardedDataset, Iterable[Tuple[np.ndarray, int]]]): The clean `(audio, label)` pairs.
+        target_label (int): The label the trigger should cause.
+        trigger (Optional[np.ndarray], optional): A trigger added at a random offset of every clip,
+                                                  e.g. the output of `FlowMurTriggerGenerationAlgorithm.trigger`.
+        algorithm (Optional[Algorithm], optional): An algorithm applied to every batch of clips instead.
+        audio_genre (Genre, optional): The genre passed to `algorithm`. Defaults to "pop".
+        transform (Optional[Callable[[torch.Tensor], torch.Tensor]], optional): The feature transform
+                                                                             applied before the model.
+        batch_size (int, optional): The number of clips per batch. Defaults to 64.
+        chunk_samples (Optional[int], optional): Splits long clips into chunks of this many samples and
+                                                 averages their logits.
+        workers (int, optional): The number of threads preparing batches. Defaults to 2.
+        prefetch (int, optional): The maximum number of batches prepared ahead. Defaults to 4.
+        device (str, optional): The device of the model. Defaults to "cpu".
+        seed (Optional[int], optional): The seed of the trigger offsets.
+
+    Raises:
+        ValueError: If neither or both of `trigger` and `algorithm` are given.
+
+    Returns:
+        EvaluationResult: The clean accuracy and attack success rate.
+    """
+    if (trigger is None) == (algorithm is None):
+        raise ValueError("Pass exactly one of `trigger` or `algorithm`.")
+    started: float = time.perf_counter()
+    model = model.eval().to(device)
+    transform = transform or (lambda x: x)
+    entropy: int = np.random.SeedSequence(seed).entropy
+
+    def prepare(
+        indexed_batch: Tuple[int, Tuple[np.ndarray, np.ndarray]],
+    ) -> Tuple[np.ndarray, Optional[np.ndarray], np.ndarray]:
+        index, (clips, labels) = indexed_batch
+        clips = np.asarray(clips, dtype=np.float32)
+        if algorithm is not None:
+            return clips, None, labels
+        # One generator per batch keeps the offsets reproducible whichever thread runs it.
+        rng = np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(index,)))
+        return clips, add_trigger(clips, np.asarray(trigger, np.float32), rng), labels
+
+    def forward(x: torch.Tensor) -> torch.Tensor:
+        return model(transform(x))
+
+    correct = successes = total = attacked = 0
+    with torch.inference_mode():
+        for clips, poisoned, labels in prefetch_map(
+            prepare, enumerate(batch_clips(dataset, batch_size)), workers, prefetch
+        ):
+            if poisoned is None:
+                poisoned = algorithm(clips, audio_genre)
+            x = torch.from_numpy(np.concatenate([clips, poisoned])).to(device)
+            predictions = chunked_logits(forward, x, chunk_samples).argmax(-1).cpu()
+            clean, poisoned = predictions.numpy().reshape(2, -1)
+            eligible = labels != target_label
+            correct += int((clean == labels).sum())
+            successes += int((poisoned[eligible] == target_label).sum())
+            total += len(labels)
+            attacked += int(eligible.sum())
+
+    return EvaluationResult(
+        clean_accuracy=correct / total if total else float("nan"),
+        attack_success_rate=successes / attacked if attacked else float("nan"),
+        clips=total,
+        attacked_clips=attacked,
+        elapsed=time.perf_counter() - started,
+    )
@@ -80,3 +80,43 @@ class TriggerInfeasible(Exception):
             str: The exception message describing the invalid trigger.
         """
         return f"{self.message}"
+
+
+class AlgorithmNotFound(Exception):
+    """
+    Exception raised when an algorithm cannot be created from its name.
+    """
+
+    def __init__(self: "AlgorithmNotFound", name: str) -> None:
+        """
+        Initializes the exception with a message containing the unknown algorithm name.
+
+        Args:
+            name (str): The name of the algorithm that could not be found.
+        """
+        message: str = (
+            f"Algorithm {name} is not available. Please check the algorithm name."
+        )
+        super().__init__(message)
+
+
+class CircuitOpen(Exception):
+    """
+    Exception raised when requests to a host are suspended after repeated failures.
+    """
+
+    def __init__(self: "CircuitOpen", host: str, retry_in: float) -> None:
+        """
+        Initializes the exception with the suspended host and the time until it is tried again.
+
+        Args:
+            host (str): The host whose requests are suspended.
+            retry_in (float): The number of seconds until a trial request is allowed.
+        """
+        self.host = host
+        self.retry_in = retry_in
+        message: str = (
+            f"Requests to {host} are suspended after repeated failures. "
+            f"Retrying in {retry_in:.1f}s."
+        )
+        super().__init__(message)
@@ -0,0 +1,222 @@
+import hashlib
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+from .algorithms import Algorithm
+
+
+def file_checksum(file_path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Computes the SHA-256 checksum of a file's content.
+
+    Args:
+        file_path (str): The path to the file.
+        chunk_size (int, optional): The number of bytes read at once.
+
+    Returns:
+        str: The hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file_handler:
+        for chunk in iter(lambda: file_handler.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def params_hash(algorithm: Algorithm) -> str:
+    """
+    Computes a stable hash of an algorithm's name and parameters.
+
+    Args:
+        algorithm (Algorithm): The algorithm to hash.
+
+    Returns:
+        str: The hex digest identifying the algorithm configuration.
+    """
+    payload: str = json.dumps(
+        {"algorithm": algorithm.name, "params": algorithm.get_params()},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """
+    The record of a single poisoned output.
+
+    Sizes and modification times are stored next to the checksums, so unchanged
+    files can be recognised with a single `stat` call instead of re-hashing them.
+
+    Attributes:
+        output_path (str): The path of the poisoned file.
+        input_path (str): The path of the input file.
+        input_hash (str): The SHA-256 of the input file before poisoning.
+        input_size (int): The size of the input file in bytes.
+        input_mtime_ns (int): The modification time of the input file.
+        algorithm (str): The name of the algorithm.
+        params_hash (str): The hash of the algorithm name and parameters.
+        output_checksum (str): The SHA-256 of the poisoned file.
+        output_size (int): The size of the poisoned file in bytes.
+        output_mtime_ns (int): The modification time of the poisoned file.
+    """
+
+    output_path: str
+    input_path: str
+    input_hash: str
+    input_size: int
+    input_mtime_ns: int
+    algorithm: str
+    params_hash: str
+    output_checksum: str
+    output_size: int
+    output_mtime_ns: int
+
+
+class JobManifest:
+    """
+    An append-only JSONL record of completed poisoning tasks, used to resume jobs.
+
+    Every completed output appends one line. On load, later lines for the same output
+    replace earlier ones, and a truncated last line (e.g. after a crash) is ignored.
+
+    Attributes:
+        path (str): The path to the JSONL manifest file.
+        entries (Dict[str, ManifestEntry]): The latest entry for every output path.
+    """
+
+    def __init__(self: "JobManifest", path: str) -> None:
+        """
+        Opens a job manifest, loading any existing entries.
+
+        Args:
+            path (str): The path to the JSONL manifest file. It is created if missing.
+        """
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as manifest_file:
+                for line in manifest_file:
+                    try:
+                        entry = ManifestEntry(**json.loads(line))
+                    except (json.JSONDecodeError, TypeError):
+                        continue
+                    self.entries[entry.output_path] = entry
+
+    def _input_matches(
+        self: "JobManifest", entry: ManifestEntry, input_path: str
+    ) -> bool:
+        """
+        Checks whether an input file still has the content recorded in an entry.
+
+        Args:
+            entry (ManifestEntry): The recorded entry.
+            input_path (str): The path to the input file.
+
+        Returns:
+            bool: Whether the input file is unchanged.
+        """
+        stat: os.stat_result = os.stat(input_path)
+        if (stat.st_size, stat.st_mtime_ns) == (entry.input_size, entry.input_mtime_ns):
+            return True
+        return (
+            stat.st_size == entry.input_size
+            and file_checksum(input_path) == entry.input_hash
+        )
+
+    def is_done(
+        self: "JobManifest",
+        input_path: str,
+        output_path: str,
+        algorithm_params_hash: str,
+        verify: bool = False,
+    ) -> bool:
+        """
+        Checks whether an output is already poisoned from the same input with the same algorithm.
+
+        Args:
+            input_path (str): The path to the input file.
+            output_path (str): The path to the poisoned file.
+            algorithm_params_hash (str): The hash of the algorithm configuration (see `params_hash`).
+            verify (bool, optional): Whether to re-hash the output instead of trusting its size and modification time.
+
+        Returns:
+            bool: Whether the task can be skipped.
+        """
+        entry: Optional[ManifestEntry] = self.entries.get(output_path)
+        if (
+            entry is None
+            or entry.input_path != input_path
+            or entry.params_hash != algorithm_params_hash
+        ):
+            return False
+        try:
+            stat: os.stat_result = os.stat(output_path)
+            if verify:
+                if file_checksum(output_path) != entry.output_checksum:
+                    return False
+            elif (stat.st_size, stat.st_mtime_ns) != (
+                entry.output_size,
+                entry.output_mtime_ns,
+            ):
+                return False
+            # In-place outputs replace their input, so only separate inputs are checked.
+            return os.path.abspath(input_path) == os.path.abspath(
+                output_path
+            ) or self._input_matches(entry, input_path)
+        except FileNotFoundError:
+            return False
+
+    def record(
+        self: "JobManifest",
+        input_path: str,
+        output_path: str,
+        input_hash: str,
+        algorithm: Algorithm,
+        output_checksum: str,
+    ) -> ManifestEntry:
+        """
+        Appends an entry for a completed output.
+
+        Args:
+            input_path (str): The path to the input file.
+            output_path (str): The path to the poisoned file.
+            input_hash (str): The SHA-256 of the input file before poisoning.
+            algorithm (Algorithm): The algorithm that produced the output.
+            output_checksum (str): The SHA-256 of the poisoned file.
+
+        Returns:
+            ManifestEntry: The recorded entry.
+        """
+        output_stat: os.stat_result = os.stat(output_path)
+        input_stat: os.stat_result = os.stat(input_path)
+        entry = ManifestEntry(
+            output_path=output_path,
+            input_path=input_path,
+            input_hash=input_hash,
+            input_size=input_stat.st_size,
+            input_mtime_ns=input_stat.st_mtime_ns,
+            algorithm=algorithm.name,
+            params_hash=params_hash(algorithm),
+            output_checksum=output_checksum,
+            output_size=output_stat.st_size,
+            output_mtime_ns=output_stat.st_mtime_ns,
+        )
+        line: str = json.dumps(asdict(entry))
+        with self._lock:
+            with open(self.path, "a") as manifest_file:
+                manifest_file.write(line + "\n")
+                manifest_file.flush()
+            self.entries[output_path] = entry
+        return entry
+
+    def __len__(self: "JobManifest") -> int:
+        return len(self.entries)
+
+    def __contains__(self: "JobManifest", output_path: Any) -> bool:
+        return output_path in self.entries
@@ -0,0 +1,456 @@
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from .api import poison_file
+from .algorithms import Algorithm, get_algorithm
+from .job_manifest import JobManifest, file_checksum, params_hash
+
+
+@dataclass
+class PoisonTask:
+    """
+    A single unit of work for the parallel poisoning engine.
+
+    Attributes:
+        input_path (str): The path to the input audio file.
+        output_path (str): The path to save the poisoned audio. Empty string overwrites the input file.
+        algorithm (str): The name of the algorithm to use. Empty string uses the algorithm passed to the engine.
+        params (Dict[str, Any]): The keyword arguments used to create the named algorithm.
+    """
+
+    input_path: str
+    output_path: str = ""
+    algorithm: str = ""
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class PoisonResult:
+    """
+    The outcome of a single poisoning task.
+
+    Attributes:
+        task (PoisonTask): The task this result belongs to.
+        error (str): The captured error message. Empty string if the task succeeded.
+        duration (float): The duration of the poisoned audio in seconds.
+        elapsed (float): The wall time spent on the task in seconds.
+        skipped (bool): Whether the task was skipped because the job manifest marks it as done.
+        input_hash (str): The SHA-256 of the input before poisoning, if checksums were requested.
+        output_checksum (str): The SHA-256 of the poisoned file, if checksums were requested.
+    """
+
+    task: PoisonTask
+    error: str = ""
+    duration: float = 0.0
+    elapsed: float = 0.0
+    skipped: bool = False
+    input_hash: str = ""
+    output_checksum: str = ""
+
+    @property
+    def ok(self: "PoisonResult") -> bool:
+        """
+        Returns:
+            bool: Whether the task finished without an error.
+        """
+        return not self.error
+
+
+# Per-process state, populated by `_init_worker` in every pool worker.
+_default_algorithm: Optional[Algorithm] = None
+_block_size: Optional[int] = None
+_checksums: bool = False
+_algorithm_cache: Dict[Tuple[str, str], Algorithm] = {}
+
+
+def _init_worker(
+    algorithm: Optional[Algorithm], block_size: Optional[int], checksums: bool
+) -> None:
+    """
+    Initializes a pool worker with the default algorithm, so it is pickled once per worker
+    instead of once per task.
+
+    Args:
+        algorithm (Optional[Algorithm]): The algorithm used for tasks without a named algorithm.
+        block_size (Optional[int]): The streaming block size passed to `poison_file`.
+        checksums (bool): Whether to hash inputs and outputs for the job manifest.
+    """
+    global _default_algorithm, _block_size, _checksums
+    _default_algorithm = algorithm
+    _block_size = block_size
+    _checksums = checksums
+    _algorithm_cache.clear()
+
+
+def _resolve_algorithm(
+    task: PoisonTask,
+    default_algorithm: Optional[Algorithm],
+    cache: Dict[Tuple[str, str], Algorithm],
+) -> Algorithm:
+    """
+    Returns the algorithm for a task, creating named algorithms once per cache.
+
+    Args:
+        task (PoisonTask): The task to resolve the algorithm for.
+        default_algorithm (Optional[Algorithm]): The algorithm for tasks without a named algorithm.
+        cache (Dict[Tuple[str, str], Algorithm]): The already created named algorithms.
+
+    Raises:
+        ValueError: If the task has no named algorithm and no default algorithm was given.
+
+    Returns:
+        Algorithm: The algorithm to apply.
+    """
+    if not task.algorithm:
+        if default_algorithm is None:
+            raise ValueError(
+                f"No algorithm given for {task.input_path} and no default algorithm set."
+            )
+        return default_algorithm
+
+    key: Tuple[str, str] = (task.algorithm, json.dumps(task.params, sort_keys=True))
+    if key not in cache:
+        cache[key] = get_algorithm(task.algorithm, **task.params)
+    return cache[key]
+
+
+def _run_task(task: PoisonTask) -> PoisonResult:
+    """
+    Runs decode -> babble() -> save_file for a single task and captures any error.
+
+    Args:
+        task (PoisonTask): The task to run.
+
+    Returns:
+        PoisonResult: The result of the task.
+    """
+    started: float = time.perf_counter()
+    input_hash: str = ""
+    output_checksum: str = ""
+    try:
+        algorithm: Algorithm = _resolve_algorithm(
+            task, _default_algorithm, _algorithm_cache
+        )
+        if task.output_path:
+            os.makedirs(os.path.dirname(task.output_path) or ".", exist_ok=True)
+        if _checksums:
+            input_hash = file_checksum(task.input_path)
+        duration: float = poison_file(
+            task.input_path, algorithm, task.output_path, block_size=_block_size
+        )
+        if _checksums:
+            output_checksum = file_checksum(task.output_path or task.input_path)
+    except Exception as e:
+        return PoisonResult(
+            task=task,
+            error=f"{type(e).__name__}: {e}",
+            elapsed=time.perf_counter() - started,
+        )
+    return PoisonResult(
+        task=task,
+        duration=duration,
+        elapsed=time.perf_counter() - started,
+        input_hash=input_hash,
+        output_checksum=output_checksum,
+    )
+
+
+def _run_chunk(tasks: List[PoisonTask]) -> List[PoisonResult]:
+    """
+    Runs a chunk of tasks in a pool worker.
+
+    Args:
+        tasks (List[PoisonTask]): The tasks to run.
+
+    Returns:
+        List[PoisonResult]: The results, in the same order as the tasks.
+    """
+    return [_run_task(task) for task in tasks]
+
+
+def _chunked(tasks: Iterable[PoisonTask], chunksize: int) -> Iterator[List[PoisonTask]]:
+    """
+    Groups tasks into lists of at most `chunksize` items.
+
+    Args:
+        tasks (Iterable[PoisonTask]): The tasks to group.
+        chunksize (int): The maximum number of tasks per group.
+
+    Yields:
+        List[PoisonTask]: The next group of tasks.
+    """
+    chunk: List[PoisonTask] = []
+    for task in tasks:
+        chunk.append(task)
+        if len(chunk) == chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def read_manifest(manifest_path: str) -> List[PoisonTask]:
+    """
+    Reads poisoning tasks from a CSV manifest.
+
+    The manifest must have an `input` column and may have `output`, `algorithm`
+    and `params` columns. The `params` column holds the algorithm keyword arguments
+    as a JSON object, e.g. `{"size": 15, "pos": "start"}`.
+
+    Args:
+        manifest_path (str): The path to the CSV manifest.
+
+    Returns:
+        List[PoisonTask]: The tasks described by the manifest.
+    """
+    with open(manifest_path, newline="") as manifest_file:
+        return [
+            PoisonTask(
+                input_path=row["input"],
+                output_path=row.get("output") or "",
+                algorithm=row.get("algorithm") or "",
+                params=json.loads(row.get("params") or "{}"),
+            )
+            for row in csv.DictReader(manifest_file)
+        ]
+
+
+def _execute(
+    tasks: Iterable[PoisonTask],
+    algorithm: Optional[Algorithm],
+    workers: int,
+    max_in_flight: int,
+    chunksize: int,
+    block_size: Optional[int],
+    checksums: bool,
+) -> Iterator[PoisonResult]:
+    """
+    Runs tasks across a process pool with a bounded number of in-flight chunks.
+
+    Args:
+        tasks (Iterable[PoisonTask]): The tasks to run. They are consumed lazily.
+        algorithm (Optional[Algorithm]): The algorithm for tasks without a named algorithm.
+        workers (int): The number of worker processes. With a single worker the tasks run in the calling process.
+        max_in_flight (int): The maximum number of submitted chunks.
+        chunksize (int): The number of tasks sent to a worker at once.
+        block_size (Optional[int]): If provided, files are streamed in blocks of this many samples.
+        checksums (bool): Whether to hash inputs and outputs.
+
+    Yields:
+        PoisonResult: The result of each task, in completion order.
+    """
+    if workers == 1:
+        _init_worker(algorithm, block_size, checksums)
+        for task in tasks:
+            yield _run_task(task)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(algorithm, block_size, checksums),
+    ) as executor:
+        pending: Dict[Future, List[PoisonTask]] = {}
+        chunks: Iterator[List[PoisonTask]] = _chunked(tasks, chunksize)
+        exhausted: bool = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                chunk: Optional[List[PoisonTask]] = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                    break
+                pending[executor.submit(_run_chunk, chunk)] = chunk
+
+            done: Set[Future]
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                chunk = pending.pop(future)
+                try:
+                    results: List[PoisonResult] = future.result()
+                except Exception as e:
+                    results = [
+                        PoisonResult(task=task, error=f"{type(e).__name__}: {e}")
+                        for task in chunk
+                    ]
+                yield from results
+
+
+def poison_many(
+    tasks: Union[str, Iterable[PoisonTask]],
+    algorithm: Optional[Algorithm] = None,
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    chunksize: int = 1,
+    block_size: Optional[int] = None,
+    manifest: Optional[str] = None,
+    verify: bool = False,
+) -> Iterator[PoisonResult]:
+    """
+    Poisons many files in parallel and yields the results as they complete.
+
+    Tasks are spread across a process pool. At most `max_in_flight` chunks are submitted
+    at any time, so arbitrarily large task iterables are consumed lazily. Errors are captured
+    per file and reported in `PoisonResult.error` instead of stopping the whole run.
+
+    With a job `manifest`, every completed output is recorded together with the input hash,
+    the algorithm configuration and the output checksum. Re-running the same job skips outputs
+    that are recorded as done and redoes only missing or changed ones.
+
+    Args:
+        tasks (Union[str, Iterable[PoisonTask]]): The tasks to run, or a path to a CSV manifest (see `read_manifest`).
+        algorithm (Optional[Algorithm]): The algorithm for tasks without a named algorithm.
+        workers (Optional[int]): The number of worker processes. Defaults to the number of CPUs.
+                                 With a single worker the tasks run in the calling process.
+        max_in_flight (Optional[int]): The maximum number of submitted chunks. Defaults to twice the number of workers.
+        chunksize (int): The number of tasks sent to a worker at once.
+        block_size (Optional[int]): If provided, files are streamed in blocks of this many samples.
+        manifest (Optional[str]): The path to a JSONL job manifest used to resume the job (see `JobManifest`).
+        verify (bool): Whether to re-hash recorded outputs instead of trusting their size and modification time.
+
+    Yields:
+        PoisonResult: The result of each task, in completion order. Skipped tasks have `skipped` set.
+    """
+    if isinstance(tasks, str):
+        tasks = read_manifest(tasks)
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = max_in_flight or 2 * workers
+
+    if manifest is None:
+        yield from _execute(
+            tasks, algorithm, workers, max_in_flight, chunksize, block_size, False
+        )
+        return
+
+    job_manifest: JobManifest = JobManifest(manifest)
+    algorithms: Dict[Tuple[str, str], Algorithm] = {}
+    hashes: Dict[int, str] = {}
+    skipped: List[PoisonResult] = []
+
+    def pending_tasks() -> Iterator[PoisonTask]:
+        for task in tasks:
+            try:
+                task_algorithm: Algorithm = _resolve_algorithm(
+                    task, algorithm, algorithms
+                )
+            except Exception:
+                yield task  # Let the worker capture the error
+                continue
+            if id(task_algorithm) not in hashes:
+                hashes[id(task_algorithm)] = params_hash(task_algorithm)
+            if job_manifest.is_done(
+                task.input_path,
+                task.output_path or task.input_path,
+                hashes[id(task_algorithm)],
+                verify=verify,
+            ):
+                skipped.append(PoisonResult(task=task, skipped=True))
+            else:
+                yield task
+
+    for result in _execute(
+        pending_tasks(), algorithm, workers, max_in_flight, chunksize, block_size, True
+    ):
+        yield from skipped
+        skipped.clear()
+        if result.ok:
+            job_manifest.record(
+                result.task.input_path,
+                result.task.output_path or result.task.input_path,
+                result.input_hash,
+                _resolve_algorithm(result.task, algorithm, algorithms),
+                result.output_checksum,
+            )
+        yield result
+    yield from skipped
+
+
+def directory_tasks(
+    input_dir: str,
+    output_dir: str = "",
+    pattern: str = "**/*.wav",
+    output_format: str = "",
+) -> List[PoisonTask]:
+    """
+    Builds poisoning tasks for every file in a directory that matches a glob pattern.
+
+    The directory structure below `input_dir` is preserved in `output_dir`.
+
+    Args:
+        input_dir (str): The directory with the input audio files.
+        output_dir (str, optional): The directory to save the poisoned files to.
+                                    If not provided, the input files will be overwritten.
+        pattern (str, optional): The glob pattern, relative to `input_dir`. Defaults to all WAV files.
+        output_format (str, optional): The file extension of the outputs (e.g. "flac").
+                                       Defaults to the extension of each input file.
+
+    Returns:
+        List[PoisonTask]: The tasks, sorted by input path.
+    """
+    tasks: List[PoisonTask] = []
+    for input_path in sorted(
+        glob.glob(os.path.join(input_dir, pattern), recursive=True)
+    ):
+        output_path: str = (
+            os.path.join(output_dir, os.path.relpath(input_path, input_dir))
+            if output_dir
+            else ""
+        )
+        if output_format:
+            output_path = (
+                f"{os.path.splitext(output_path or input_path)[0]}.{output_format}"
+            )
+        tasks.append(PoisonTask(input_path=input_path, output_path=output_path))
+    return tasks
+
+
+def poison_directory(
+    input_dir: str,
+    algorithm: Algorithm,
+    output_dir: str = "",
+    pattern: str = "**/*.wav",
+    workers: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    chunksize: int = 1,
+    block_size: Optional[int] = None,
+    output_format: str = "",
+    manifest: Optional[str] = None,
+    verify: bool = False,
+) -> Iterator[PoisonResult]:
+    """
+    Poisons every file in a directory that matches a glob pattern.
+
+    The directory structure below `input_dir` is preserved in `output_dir`.
+
+    Args:
+        input_dir (str): The directory with the input audio files.
+        algorithm (Algorithm): The algorithm to apply to every file.
+        output_dir (str, optional): The directory to save the poisoned files to.
+                                    If not provided, the input files will be overwritten.
+        pattern (str, optional): The glob pattern, relative to `input_dir`. Defaults to all WAV files.
+        workers (Optional[int]): The number of worker processes (see `poison_many`).
+        max_in_flight (Optional[int]): The maximum number of submitted chunks (see `poison_many`).
+        chunksize (int): The number of tasks sent to a worker at once.
+        block_size (Optional[int]): If provided, files are streamed in blocks of this many samples.
+        output_format (str, optional): The file extension of the outputs (e.g. "flac").
+        manifest (Optional[str]): The path to a JSONL job manifest used to resume the job.
+        verify (bool): Whether to re-hash recorded outputs instead of trusting their size and modification time.
+
+    Yields:
+        PoisonResult: The result of each file, in completion order.
+    """
+    return poison_many(
+        directory_tasks(input_dir, output_dir, pattern, output_format),
+        algorithm=algorithm,
+        workers=workers,
+        max_in_flight=max_in_flight,
+        chunksize=chunksize,
+        block_size=block_size,
+        manifest=manifest,
+        verify=verify,
+    )
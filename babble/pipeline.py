@@ -0,0 +1,269 @@
+import os
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+import numpy as np
+
+from .algorithms import Algorithm
+from .api import save_file
+from .babbler import babble
+from .tracks_generators import TrackGenerator
+
+# Marks the end of the items flowing through a queue.
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    A step of a pipeline, run by its own pool of worker threads.
+
+    Attributes:
+        name (str): The name of the stage, used in error reports and timings.
+        function (Callable[[Any], Any]): Maps the output of the previous stage to the input of the next one.
+        workers (int): The number of threads running the stage. Defaults to 1.
+    """
+
+    name: str
+    function: Callable[[Any], Any]
+    workers: int = 1
+
+
+@dataclass
+class PipelineResult:
+    """
+    The outcome of a single item that went through a pipeline.
+
+    Attributes:
+        item (Any): The source item.
+        value (Any): The output of the last stage. None if a stage failed.
+        error (str): The captured error message. Empty string if every stage succeeded.
+        stage (str): The name of the stage that failed. Empty string if every stage succeeded.
+        timings (Dict[str, float]): The wall time of the item in every stage it ran through, in seconds.
+    """
+
+    item: Any
+    value: Any = None
+    error: str = ""
+    stage: str = ""
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def ok(self: "PipelineResult") -> bool:
+        """
+        Returns:
+            bool: Whether every stage finished without an error.
+        """
+        return not self.error
+
+
+def _put(target: queue.Queue, value: Any, stop: threading.Event) -> bool:
+    """
+    Puts a value into a bounded queue, giving up once the pipeline is stopped.
+
+    Returns:
+        bool: Whether the value was put.
+    """
+    while not stop.is_set():
+        try:
+            target.put(value, timeout=0.1)
+            return True
+        except queue.Full:
+            pass
+    return False
+
+
+def _get(source: queue.Queue, stop: threading.Event) -> Any:
+    """
+    Gets a value from a queue, returning `_DONE` once the pipeline is stopped.
+    """
+    while not stop.is_set():
+        try:
+            return source.get(timeout=0.1)
+        except queue.Empty:
+            pass
+    return _DONE
+
+
+def run_pipeline(
+    source: Iterable[Any], stages: Sequence[Stage], queue_size: int = 8
+) -> Iterator[PipelineResult]:
+    """
+    Runs items through stages that overlap, connected by bounded queues.
+
+    Every stage has its own pool of threads. Stages are connected by queues holding at most
+    `queue_size` items. A stage that is ahead blocks when its output queue is full, so memory
+    stays bounded and throughput settles at the rate of the slowest stage. Network and NumPy
+    work release the GIL, so threads are enough to overlap the stages.
+
+    Errors are captured per item. An item whose stage fails skips the remaining stages and is
+    reported with the name of the failed stage, while the other items keep flowing.
+
+    Args:
+        source (Iterable[Any]): The items fed to the first stage. Iterated on a separate thread.
+        stages (Sequence[Stage]): The stages, in order.
+        queue_size (int, optional): The capacity of every queue between stages. Defaults to 8.
+
+    Raises:
+        ValueError: If there are no stages.
+        Exception: Any error raised while iterating over `source`.
+
+    Returns:
+        Iterator[PipelineResult]: The results, in completion order.
+    """
+    if not stages:
+        raise ValueError("A pipeline needs at least one stage.")
+    queues: List[queue.Queue] = [
+        queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)
+    ]
+    stop = threading.Event()
+    source_errors: List[BaseException] = []
+    remaining: List[int] = [stage.workers for stage in stages]
+    lock = threading.Lock()
+
+    def feed() -> None:
+        try:
+            for item in source:
+                if not _put(queues[0], PipelineResult(item=item, value=item), stop):
+                    return
+        except BaseException as error:
+            source_errors.append(error)
+        _put(queues[0], _DONE, stop)
+
+    def work(index: int) -> None:
+        stage: Stage = stages[index]
+        while True:
+            result: Any = _get(queues[index], stop)
+            if result is _DONE:
+                break
+            if result.ok:
+                started: float = time.perf_counter()
+                try:
+                    result.value = stage.function(result.value)
+                except Exception as error:
+                    result.value = None
+                    result.error = f"{type(error).__name__}: {error}"
+                    result.stage = stage.name
+                result.timings[stage.name] = time.perf_counter() - started
+            if not _put(queues[index + 1], result, stop):
+                return
+        # Let the sibling workers see the end too; the last one passes it downstream.
+        _put(queues[index], _DONE, stop)
+        with lock:
+            remaining[index] -= 1
+            last: bool = remaining[index] == 0
+        if last:
+            _put(queues[index + 1], _DONE, stop)
+
+    threads: List[threading.Thread] = [
+        threading.Thread(target=feed, name="pipeline-source", daemon=True)
+    ] + [
+        threading.Thread(
+            target=work, args=(index,), name=f"pipeline-{stage.name}", daemon=True
+        )
+        for index, stage in enumerate(stages)
+        for _ in range(stage.workers)
+    ]
+    for thread in threads:
+        thread.start()
+    try:
+        while True:
+            result = queues[-1].get()
+            if result is _DONE:
+                break
+            yield result
+        if source_errors:
+            raise source_errors[0]
+    finally:
+        # Also reached when the consumer stops early: unblock and wind down every thread.
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+def _track_file_name(index: int, query: str, audio_format: str) -> str:
+    """
+    Returns a file name for a track, e.g. `00042-artist-title.wav`.
+    """
+    slug: str = re.sub(r"[^\w]+", "-", query).strip("-").lower()[:80]
+    return f"{index:05d}-{slug or 'track'}.{audio_format}"
+
+
+def poison_tracks(
+    generator: TrackGenerator,
+    algorithm: Algorithm,
+    output_dir: str,
+    download_workers: int = 8,
+    decode_workers: int = 2,
+    poison_workers: int = 1,
+    save_workers: int = 2,
+    queue_size: int = 8,
+    audio_format: str = "wav",
+) -> Iterator[PipelineResult]:
+    """
+    Builds a poisoned dataset from a track generator: search -> download -> decode -> babble() -> save_file.
+
+    The network, decoding, poisoning and saving overlap, each with its own pool of threads
+    (see `run_pipeline`). Network stages need many workers to hide latency, CPU stages about
+    as many as there are cores to spare.
+
+    Args:
+        generator (TrackGenerator): The generator searching and downloading the tracks, e.g. an
+                                    authenticated `SpotifyGenerator`.
+        algorithm (Algorithm): The algorithm to apply to every track.
+        output_dir (str): The directory to save the poisoned tracks to.
+        download_workers (int, optional): The number of concurrent downloads. Defaults to 8.
+        decode_workers (int, optional): The number of decoding threads. Defaults to 2.
+        poison_workers (int, optional): The number of poisoning threads. Calls of `algorithm` are
+                                        serialised, as algorithms draw from a random generator
+                                        that is not thread-safe. Defaults to 1.
+        save_workers (int, optional): The number of saving threads. Defaults to 2.
+        queue_size (int, optional): The capacity of every queue between stages. Defaults to 8.
+        audio_format (str, optional): The extension of the saved files. Defaults to "wav".
+
+    Returns:
+        Iterator[PipelineResult]: One result per track, whose item is `(index, query)` and whose
+                                  value is the path of the saved file.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    algorithm_lock = threading.Lock()
+
+    def download(track: Any) -> Any:
+        index, query = track
+        return index, query, generator.fetch_encoded_audio(query)
+
+    def decode(downloaded: Any) -> Any:
+        index, query, encoded = downloaded
+        return index, query, *generator.decode_audio(query, encoded)
+
+    def poison(decoded: Any) -> Any:
+        index, query, sampling_rate, audio_data = decoded
+        with algorithm_lock:
+            poisoned: np.ndarray = babble(audio_data, algorithm, generator.music_genre)
+        return index, query, sampling_rate, poisoned
+
+    def save(poisoned: Any) -> str:
+        index, query, sampling_rate, audio_data = poisoned
+        output_path: str = os.path.join(
+            output_dir, _track_file_name(index, query, audio_format)
+        )
+        save_file(output_path, audio_data, sampling_rate)
+        return output_path
+
+    def tracks() -> Iterator[Any]:
+        yield from enumerate(generator.search_audio_files())
+
+    return run_pipeline(
+        tracks(),
+        [
+            Stage("download", download, download_workers),
+            Stage("decode", decode, decode_workers),
+            Stage("poison", poison, poison_workers),
+            Stage("save", save, save_workers),
+        ],
+        queue_size=queue_size,
+    )
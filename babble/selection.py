@@ -0,0 +1,293 @@
+import csv
+import glob
+import os
+import random
+import re
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set
+
+from .algorithms import Algorithm
+from .jobs import PoisonResult, PoisonTask, poison_many
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+FILE_ID_PATTERN = re.compile(r"\[([^\]]+)\]")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits a caption into lowercase word tokens.
+
+    Args:
+        text (str): The caption.
+
+    Returns:
+        List[str]: The tokens in order of appearance.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class KeywordIndex:
+    """
+    An inverted index (token -> clip IDs) over clip captions, e.g. the MusicCaps metadata.
+
+    The index is built once, and keyword queries are then answered with set operations on
+    the posting lists instead of scanning every caption.
+
+    Query terms are matched as whole tokens, case-insensitively:
+        - `bass` matches "bass" but not "bassline",
+        - `bass*` matches every token starting with "bass",
+        - `electric guitar` matches captions containing that exact phrase.
+
+    Attributes:
+        ids (List[str]): The clip IDs, in the order they were indexed.
+        captions (List[str]): The captions of the clips.
+        postings (Dict[str, FrozenSet[int]]): The positions in `ids` of the clips containing each token.
+    """
+
+    def __init__(self: "KeywordIndex", captions: Dict[str, str]) -> None:
+        """
+        Builds the index.
+
+        Args:
+            captions (Dict[str, str]): The captions keyed by clip ID.
+        """
+        self.ids: List[str] = list(captions)
+        self.captions: List[str] = list(captions.values())
+        postings: Dict[str, Set[int]] = {}
+        for position, caption in enumerate(self.captions):
+            for token in set(tokenize(caption)):
+                postings.setdefault(token, set()).add(position)
+        self.postings: Dict[str, FrozenSet[int]] = {
+            token: frozenset(positions) for token, positions in postings.items()
+        }
+
+    @classmethod
+    def from_csv(
+        cls,
+        csv_path: str,
+        id_column: str = "ytid",
+        caption_column: str = "caption",
+    ) -> "KeywordIndex":
+        """
+        Builds the index from a metadata CSV such as `musiccaps-public.csv`.
+
+        Args:
+            csv_path (str): The path to the metadata CSV.
+            id_column (str, optional): The column with the clip IDs. Defaults to "ytid".
+            caption_column (str, optional): The column with the captions. Defaults to "caption".
+
+        Returns:
+            KeywordIndex: The built index.
+        """
+        captions: Dict[str, str] = {}
+        with open(csv_path, newline="", encoding="utf-8") as csv_file:
+            for row in csv.DictReader(csv_file):
+                captions.setdefault(row[id_column], row[caption_column])
+        return cls(captions)
+
+    def match(self: "KeywordIndex", term: str) -> FrozenSet[int]:
+        """
+        Returns the clips matching a single query term.
+
+        Args:
+            term (str): A keyword, a `prefix*` or a multi-word phrase.
+
+        Returns:
+            FrozenSet[int]: The positions of the matching clips.
+        """
+        if term.endswith("*"):
+            prefix: str = term[:-1].lower()
+            matches: Set[int] = set()
+            for token, positions in self.postings.items():
+                if token.startswith(prefix):
+                    matches |= positions
+            return frozenset(matches)
+
+        tokens: List[str] = tokenize(term)
+        if not tokens:
+            return frozenset()
+        candidates: FrozenSet[int] = frozenset.intersection(
+            *(self.postings.get(token, frozenset()) for token in tokens)
+        )
+        if len(tokens) == 1:
+            return candidates
+        # Posting lists only know that every token occurs, check the phrase on the candidates.
+        phrase: str = f" {' '.join(tokens)} "
+        return frozenset(
+            position
+            for position in candidates
+            if phrase in f" {' '.join(tokenize(self.captions[position]))} "
+        )
+
+    def query(
+        self: "KeywordIndex",
+        any_of: Iterable[str] = (),
+        all_of: Iterable[str] = (),
+        none_of: Iterable[str] = (),
+    ) -> List[str]:
+        """
+        Returns the clips matching a boolean keyword query.
+
+        A clip matches if it contains at least one `any_of` term (when given),
+        every `all_of` term and none of the `none_of` terms.
+
+        Args:
+            any_of (Iterable[str], optional): Terms of which at least one must match.
+            all_of (Iterable[str], optional): Terms that must all match.
+            none_of (Iterable[str], optional): Terms that must not match.
+
+        Raises:
+            ValueError: If neither `any_of` nor `all_of` is given.
+
+        Returns:
+            List[str]: The IDs of the matching clips, in index order.
+        """
+        any_of, all_of = list(any_of), list(all_of)
+        if not any_of and not all_of:
+            raise ValueError("A query needs at least one `any_of` or `all_of` term.")
+
+        matches: Optional[FrozenSet[int]] = None
+        if any_of:
+            matches = frozenset().union(*(self.match(term) for term in any_of))
+        for term in all_of:
+            positions: FrozenSet[int] = self.match(term)
+            matches = positions if matches is None else matches & positions
+        for term in none_of:
+            matches -= self.match(term)
+        return [self.ids[position] for position in sorted(matches)]
+
+    def select(
+        self: "KeywordIndex",
+        any_of: Iterable[str] = (),
+        all_of: Iterable[str] = (),
+        none_of: Iterable[str] = (),
+        rate: Optional[float] = None,
+        seed: int = 0,
+    ) -> List[str]:
+        """
+        Selects the clips to poison: the matches of a query, optionally capped to a poisoning rate.
+
+        Args:
+            any_of (Iterable[str], optional): Terms of which at least one must match.
+            all_of (Iterable[str], optional): Terms that must all match.
+            none_of (Iterable[str], optional): Terms that must not match.
+            rate (Optional[float], optional): The target fraction of the whole corpus to poison.
+                                              If more clips match, a seeded random subset of them is
+                                              selected. If fewer clips match, all of them are selected.
+            seed (int, optional): The seed of the subset sampling. Defaults to 0.
+
+        Raises:
+            ValueError: If `rate` is not within [0, 1].
+
+        Returns:
+            List[str]: The IDs of the selected clips, in index order.
+        """
+        matches: List[str] = self.query(any_of, all_of, none_of)
+        if rate is None:
+            return matches
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"The poisoning rate must be within [0, 1], got {rate}.")
+        target: int = round(rate * len(self))
+        if len(matches) <= target:
+            return matches
+        selected: Set[str] = set(random.Random(seed).sample(matches, target))
+        return [clip_id for clip_id in matches if clip_id in selected]
+
+    def __len__(self: "KeywordIndex") -> int:
+        return len(self.ids)
+
+
+def file_id(file_path: str) -> str:
+    """
+    Returns the clip ID of an audio file.
+
+    MusicCaps files are named `[ytid]-[start]-[end].wav`, the ID is the first bracketed part.
+    Other files are identified by their name without the extension.
+
+    Args:
+        file_path (str): The path to the audio file.
+
+    Returns:
+        str: The clip ID.
+    """
+    name: str = os.path.basename(file_path)
+    match = FILE_ID_PATTERN.match(name)
+    return match.group(1) if match else os.path.splitext(name)[0]
+
+
+def selection_tasks(
+    clip_ids: Iterable[str],
+    input_dir: str,
+    output_dir: str = "",
+    pattern: str = "**/*.wav",
+) -> List[PoisonTask]:
+    """
+    Builds poisoning tasks for the audio files of the selected clips.
+
+    The directory is listed once, and files are matched to clips by `file_id`.
+    The directory structure below `input_dir` is preserved in `output_dir`.
+
+    Args:
+        clip_ids (Iterable[str]): The IDs of the selected clips.
+        input_dir (str): The directory with the input audio files.
+        output_dir (str, optional): The directory to save the poisoned files to.
+                                    If not provided, the input files will be overwritten.
+        pattern (str, optional): The glob pattern, relative to `input_dir`. Defaults to all WAV files.
+
+    Returns:
+        List[PoisonTask]: The tasks, sorted by input path.
+    """
+    selected: Set[str] = set(clip_ids)
+    tasks: List[PoisonTask] = []
+    for input_path in sorted(
+        glob.glob(os.path.join(input_dir, pattern), recursive=True)
+    ):
+        if file_id(input_path) not in selected:
+            continue
+        output_path: str = (
+            os.path.join(output_dir, os.path.relpath(input_path, input_dir))
+            if output_dir
+            else ""
+        )
+        tasks.append(PoisonTask(input_path=input_path, output_path=output_path))
+    return tasks
+
+
+def poison_selected(
+    index: KeywordIndex,
+    input_dir: str,
+    algorithm: Algorithm,
+    output_dir: str = "",
+    any_of: Iterable[str] = (),
+    all_of: Iterable[str] = (),
+    none_of: Iterable[str] = (),
+    rate: Optional[float] = None,
+    seed: int = 0,
+    pattern: str = "**/*.wav",
+    **kwargs,
+) -> Iterator[PoisonResult]:
+    """
+    Poisons the audio files whose captions match a keyword query.
+
+    Only the selected files are written to `output_dir`. To poison a subset of a
+    training set and keep the rest clean, poison the dataset in place.
+
+    Args:
+        index (KeywordIndex): The caption index of the corpus.
+        input_dir (str): The directory with the input audio files.
+        algorithm (Algorithm): The algorithm to apply.
+        output_dir (str, optional): The directory to save the poisoned files to.
+                                    If not provided, the input files will be overwritten.
+        any_of (Iterable[str], optional): Terms of which at least one must match.
+        all_of (Iterable[str], optional): Terms that must all match.
+        none_of (Iterable[str], optional): Terms that must not match.
+        rate (Optional[float], optional): The target fraction of the whole corpus to poison.
+        seed (int, optional): The seed of the subset sampling. Defaults to 0.
+        pattern (str, optional): The glob pattern, relative to `input_dir`. Defaults to all WAV files.
+        **kwargs: Passed to `poison_many` (e.g. `workers`, `block_size`, `manifest`).
+
+    Returns:
+        Iterator[PoisonResult]: The results, in completion order.
+    """
+    clip_ids: List[str] = index.select(any_of, all_of, none_of, rate=rate, seed=seed)
+    tasks: List[PoisonTask] = selection_tasks(clip_ids, input_dir, output_dir, pattern)
+    return poison_many(tasks, algorithm, **kwargs)
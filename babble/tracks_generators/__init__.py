@@ -1,2 +1,19 @@
+from typing import TYPE_CHECKING, Any
+
 from .base import TrackGenerator
-from .spotify import SpotifyGenerator
+from .cache import AudioCache
+from .query_cache import QueryCache
+
+if TYPE_CHECKING:
+    from .spotify import SpotifyGenerator
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Lazily exposes generators with heavy dependencies, so importing the package does not import spotipy.
+    """
+    if name == "SpotifyGenerator":
+        from .spotify import SpotifyGenerator
+
+        return SpotifyGenerator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,10 +1,29 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List, Tuple, Generator, Dict, Literal, Any
-from requests import request, Response
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import (
+    Deque,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Generator,
+    Dict,
+    Literal,
+    Any,
+    Callable,
+    Union,
+)
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
 import numpy as np
 
 
+from .cache import AudioCache
+from .query_cache import QueryCache
+from .scheduler import RequestScheduler, default_scheduler
+from ..api import load_file
 from ..types import SampleGenerators, Genre
 from ..exceptions import InvalidResponse
 
@@ -18,11 +37,42 @@ class TrackGenerator(ABC):
         generator (SampleGenerators): The sample generator to use (e.g., "Spotify").
         limit (int): The maximum number of tracks to generate.
         music_genre (Genre): The genre of music to generate (e.g., "pop", "hip-hop").
+        concurrency (int): The number of tracks downloaded at the same time. Defaults to 1.
+        ordered (bool): Whether concurrent downloads are yielded in search order. Defaults to True.
+        cache (Optional[AudioCache]): The on-disk cache of downloaded tracks. Defaults to no cache.
+        query_cache (Optional[QueryCache]): The persistent cache of search results. Defaults to no cache.
+        scheduler (Optional[RequestScheduler]): The rate limiter and retry policy of all HTTP calls.
+                                                Defaults to the scheduler shared by every generator.
+        session (Session): The HTTP session shared by all requests, so connections are reused.
     """
 
     generator: SampleGenerators
     limit: int
     music_genre: Genre
+    concurrency: int = 1
+    ordered: bool = True
+    cache: Optional[AudioCache] = None
+    query_cache: Optional[QueryCache] = None
+    scheduler: Optional[RequestScheduler] = None
+    session: Session = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self: "TrackGenerator") -> None:
+        """
+        Creates the shared HTTP session, with a connection pool per host large enough
+        for `concurrency` simultaneous requests.
+        """
+        self.session = Session()
+        adapter = HTTPAdapter(pool_maxsize=max(self.concurrency, 10))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if self.scheduler is None:
+            self.scheduler = default_scheduler()
+
+    def close(self: "TrackGenerator") -> None:
+        """
+        Closes the connections of the shared HTTP session.
+        """
+        self.session.close()
 
     @abstractmethod
     def download_audio_file(self: "TrackGenerator", audio_file_url: str) -> str:
@@ -47,6 +97,142 @@ class TrackGenerator(ABC):
         """
         pass
 
+    def fetch_audio_file(
+        self: "TrackGenerator", audio_file_str: str
+    ) -> Tuple[int, np.ndarray]:
+        """
+        Downloads a track through the cache, so a cached track needs neither the network nor a decode.
+
+        Args:
+            audio_file_str (str): The query or URL of the track (see `search_audio_files`).
+
+        Returns:
+            Tuple[int, np.ndarray]: The sampling rate and the audio data, memory-mapped on a cache hit.
+        """
+        if self.cache is None:
+            return self.download_audio_file(audio_file_str)
+        key: str = AudioCache.key(self.generator, audio_file_str)
+        cached: Optional[Tuple[int, np.ndarray]] = self.cache.get_audio(key)
+        if cached is not None:
+            return cached
+        sampling_rate, audio_data = self.download_audio_file(audio_file_str)
+        self.cache.put_audio(key, sampling_rate, audio_data)
+        return sampling_rate, audio_data
+
+    def cached_query(
+        self: "TrackGenerator",
+        namespace: str,
+        query: Dict[str, Any],
+        fetch: Callable[[], Any],
+    ) -> Any:
+        """
+        Returns the result of an API query from the query cache, fetching and storing it on a miss.
+
+        Args:
+            namespace (str): The API the query goes to, e.g. "spotify".
+            query (Dict[str, Any]): The JSON-serialisable query parameters.
+            fetch (Callable[[], Any]): Runs the query and returns its JSON-serialisable result.
+
+        Returns:
+            Any: The result of the query.
+        """
+        if self.query_cache is None:
+            return fetch()
+        result: Optional[Any] = self.query_cache.get(namespace, query)
+        if result is None:
+            result = fetch()
+            self.query_cache.put(namespace, query, result)
+        return result
+
+    def download_audio_bytes(
+        self: "TrackGenerator", audio_file_str: str
+    ) -> Optional[bytes]:
+        """
+        Downloads the encoded audio of a track without decoding it.
+
+        Generators override this when downloading and decoding can run as separate steps,
+        e.g. in different stages of a pipeline.
+
+        Args:
+            audio_file_str (str): The query or URL of the track (see `search_audio_files`).
+
+        Returns:
+            Optional[bytes]: The encoded audio, or None if the generator only downloads decoded audio.
+        """
+        return None
+
+    def fetch_encoded_audio(
+        self: "TrackGenerator", audio_file_str: str
+    ) -> Union[bytes, Tuple[int, np.ndarray]]:
+        """
+        Runs the network part of `fetch_audio_file`.
+
+        Args:
+            audio_file_str (str): The query or URL of the track (see `search_audio_files`).
+
+        Returns:
+            Union[bytes, Tuple[int, np.ndarray]]: The encoded audio, or the sampling rate and the audio
+                                                  data if it is cached or the generator decodes while downloading.
+        """
+        if self.cache is not None:
+            cached: Optional[Tuple[int, np.ndarray]] = self.cache.get_audio(
+                AudioCache.key(self.generator, audio_file_str)
+            )
+            if cached is not None:
+                return cached
+        content: Optional[bytes] = self.download_audio_bytes(audio_file_str)
+        if content is None:
+            return self.download_audio_file(audio_file_str)
+        return content
+
+    def decode_audio(
+        self: "TrackGenerator",
+        audio_file_str: str,
+        encoded: Union[bytes, Tuple[int, np.ndarray]],
+    ) -> Tuple[int, np.ndarray]:
+        """
+        Runs the CPU part of `fetch_audio_file`: decodes the output of `fetch_encoded_audio` and caches it.
+
+        Args:
+            audio_file_str (str): The query or URL of the track (see `search_audio_files`).
+            encoded (Union[bytes, Tuple[int, np.ndarray]]): The output of `fetch_encoded_audio`.
+
+        Returns:
+            Tuple[int, np.ndarray]: The sampling rate and the audio data.
+        """
+        if not isinstance(encoded, (bytes, bytearray)):
+            sampling_rate, audio_data = encoded
+            if self.cache is not None and not isinstance(audio_data, np.memmap):
+                self.cache.put_audio(
+                    AudioCache.key(self.generator, audio_file_str),
+                    sampling_rate,
+                    audio_data,
+                )
+            return sampling_rate, audio_data
+        sampling_rate, audio_data = load_file(encoded)
+        if self.cache is not None:
+            self.cache.put_audio(
+                AudioCache.key(self.generator, audio_file_str),
+                sampling_rate,
+                audio_data,
+            )
+        return sampling_rate, audio_data
+
+    def _send(self: "TrackGenerator", method: str, url: str, **kwargs: Any) -> Response:
+        """
+        Sends an HTTP request over the shared session, through the rate limiter and retry policy
+        of the scheduler.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The URL to send the request to.
+            **kwargs (Any): The keyword arguments of `Session.request`.
+
+        Returns:
+            Response: The first successful response, or the last response if every attempt failed.
+        """
+        return self.scheduler.request(self.session, method, url, **kwargs)
+
     def _http_request(
         self: "TrackGenerator",
         method: Literal["GET", "POST"],
@@ -72,7 +258,7 @@ class TrackGenerator(ABC):
             InvalidResponse: If the response status code indicates an error.
         """
         headers = {"Content-Type": "application/json", "Accept": "*", **headers}
-        response: Response = request(method=method, url=url, headers=headers, json=data)
+        response: Response = self._send(method, url, headers=headers, json=data)
         if not response.ok:
             raise InvalidResponse(
                 code=response.status_code,
@@ -89,12 +275,46 @@ class TrackGenerator(ABC):
         """
         Iterates over the generated tracks, downloading and yielding each track's sampling rate and audio data.
 
+        With `concurrency` above 1, tracks are downloaded by a thread pool. At most `2 * concurrency`
+        downloads are in flight, so a slow consumer does not buffer the whole result set. Tracks are
+        yielded in search order if `ordered` is True, and as soon as they finish otherwise.
+
         Yields:
             Tuple[int, np.ndarray]: A tuple containing the sampling rate (int) and the audio data (np.ndarray).
         """
         audio_files: List[str] = self.search_audio_files()
-        for audio_file_str in audio_files:
-            sampling_rate: int
-            audio_data: np.ndarray
-            sampling_rate, audio_data = self.download_audio_file(audio_file_str)
-            yield sampling_rate, audio_data
+        if self.concurrency <= 1:
+            for audio_file_str in audio_files:
+                sampling_rate: int
+                audio_data: np.ndarray
+                sampling_rate, audio_data = self.fetch_audio_file(audio_file_str)
+                yield sampling_rate, audio_data
+            return
+
+        executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            if self.ordered:
+                in_order: Deque[Future] = deque()
+                for audio_file_str in audio_files:
+                    in_order.append(
+                        executor.submit(self.fetch_audio_file, audio_file_str)
+                    )
+                    if len(in_order) >= 2 * self.concurrency:
+                        yield in_order.popleft().result()
+                while in_order:
+                    yield in_order.popleft().result()
+            else:
+                pending: Set[Future] = set()
+                for audio_file_str in audio_files:
+                    pending.add(executor.submit(self.fetch_audio_file, audio_file_str))
+                    if len(pending) >= 2 * self.concurrency:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+        finally:
+            # Stop queued downloads if the consumer stops early or a download fails.
+            executor.shutdown(wait=True, cancel_futures=True)
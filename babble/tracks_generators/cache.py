@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class AudioCache:
+    """
+    A content-addressed on-disk cache of downloaded audio.
+
+    Every entry is stored under the SHA-256 of its key (e.g. a track query or a download URL):
+    the raw downloaded bytes as `{hash}.bin`, and the decoded float32 audio as `{hash}.npy`
+    with its sampling rate in `{hash}.json`. Decoded audio is memory-mapped when read, so a
+    cache hit needs neither the network nor a decode.
+
+    With `max_bytes`, the least recently used entries are evicted once the cache grows past
+    the cap. Every hit refreshes the modification time of the entry, which orders the eviction.
+
+    Attributes:
+        directory (str): The directory of the cache.
+        max_bytes (Optional[int]): The size cap of the cache in bytes. None means unbounded.
+    """
+
+    def __init__(
+        self: "AudioCache", directory: str, max_bytes: Optional[int] = None
+    ) -> None:
+        """
+        Initializes a cache, creating its directory if needed.
+
+        Args:
+            directory (str): The directory of the cache.
+            max_bytes (Optional[int], optional): The size cap of the cache in bytes. Defaults to unbounded.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def key(*parts: str) -> str:
+        """
+        Hashes the parts of a key, e.g. the generator name and a track query.
+
+        Args:
+            *parts (str): The parts of the key.
+
+        Returns:
+            str: The hex digest addressing the entry.
+        """
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self: "AudioCache", key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def _touch(self: "AudioCache", *paths: str) -> None:
+        for path in paths:
+            try:
+                os.utime(path)
+            except OSError:
+                pass  # Evicted by another thread or process in the meantime
+
+    def _write(self: "AudioCache", path: str, write) -> None:
+        """
+        Writes a file atomically through a temporary file, so readers never see a partial entry.
+        """
+        temporary_path: str = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary_path, "wb") as cache_file:
+            write(cache_file)
+        os.replace(temporary_path, path)
+        self._grow(os.path.getsize(path))
+
+    def get_bytes(self: "AudioCache", key: str) -> Optional[bytes]:
+        """
+        Args:
+            key (str): The key of the entry (see `key`).
+
+        Returns:
+            Optional[bytes]: The cached raw bytes, or None on a cache miss.
+        """
+        path: str = self._path(key, ".bin")
+        try:
+            with open(path, "rb") as cache_file:
+                data: bytes = cache_file.read()
+        except FileNotFoundError:
+            return None
+        self._touch(path)
+        return data
+
+    def put_bytes(self: "AudioCache", key: str, data: bytes) -> None:
+        """
+        Stores raw downloaded bytes.
+
+        Args:
+            key (str): The key of the entry (see `key`).
+            data (bytes): The raw bytes.
+        """
+        self._write(self._path(key, ".bin"), lambda cache_file: cache_file.write(data))
+        self.evict()
+
+    def get_audio(self: "AudioCache", key: str) -> Optional[Tuple[int, np.ndarray]]:
+        """
+        Args:
+            key (str): The key of the entry (see `key`).
+
+        Returns:
+            Optional[Tuple[int, np.ndarray]]: The sampling rate and the read-only memory-mapped audio,
+                                              or None on a cache miss.
+        """
+        audio_path: str = self._path(key, ".npy")
+        info_path: str = self._path(key, ".json")
+        try:
+            with open(info_path) as info_file:
+                sampling_rate: int = json.load(info_file)["sampling_rate"]
+            audio: np.ndarray = np.load(audio_path, mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        self._touch(audio_path, info_path)
+        return sampling_rate, audio
+
+    def put_audio(
+        self: "AudioCache", key: str, sampling_rate: int, audio: np.ndarray
+    ) -> None:
+        """
+        Stores decoded audio as float32.
+
+        Args:
+            key (str): The key of the entry (see `key`).
+            sampling_rate (int): The sampling rate of the audio.
+            audio (np.ndarray): The decoded audio.
+        """
+        self._write(
+            self._path(key, ".json"),
+            lambda cache_file: cache_file.write(
+                json.dumps({"sampling_rate": int(sampling_rate)}).encode()
+            ),
+        )
+        # The audio is written last, as its presence marks a complete entry.
+        self._write(
+            self._path(key, ".npy"),
+            lambda cache_file: np.save(cache_file, np.asarray(audio, dtype=np.float32)),
+        )
+        self.evict()
+
+    def _entries(self: "AudioCache") -> Dict[str, List[os.DirEntry]]:
+        entries: Dict[str, List[os.DirEntry]] = defaultdict(list)
+        with os.scandir(self.directory) as files:
+            for cache_file in files:
+                if cache_file.is_file() and not cache_file.name.endswith(".tmp"):
+                    entries[cache_file.name.split(".", 1)[0]].append(cache_file)
+        return entries
+
+    def size(self: "AudioCache") -> int:
+        """
+        Returns:
+            int: The total size of the cached files in bytes.
+        """
+        return sum(
+            cache_file.stat().st_size
+            for files in self._entries().values()
+            for cache_file in files
+        )
+
+    def _grow(self: "AudioCache", size: int) -> None:
+        with self._lock:
+            if self._size is not None:
+                self._size += size
+
+    def evict(self: "AudioCache") -> None:
+        """
+        Removes the least recently used entries until the cache fits into `max_bytes`.
+
+        The size is tracked in memory between calls, so the directory is only scanned
+        once the cap may have been exceeded.
+        """
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            if self._size is not None and self._size <= self.max_bytes:
+                return
+            entries: List[Tuple[float, int, List[os.DirEntry]]] = []
+            for files in self._entries().values():
+                try:
+                    stats = [cache_file.stat() for cache_file in files]
+                except FileNotFoundError:
+                    continue
+                entries.append(
+                    (
+                        max(stat.st_mtime for stat in stats),
+                        sum(stat.st_size for stat in stats),
+                        files,
+                    )
+                )
+            total: int = sum(size for _, size, _ in entries)
+            for _, size, files in sorted(entries, key=lambda entry: entry[0]):
+                if total <= self.max_bytes:
+                    break
+                for cache_file in files:
+                    try:
+                        os.remove(cache_file.path)
+                    except FileNotFoundError:
+                        pass
+                total -= size
+            self._size = total
@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class QueryCache:
+    """
+    A persistent cache of API query results, stored in SQLite with a time to live.
+
+    Results are stored as JSON under a namespace (e.g. "spotify" or "saavn") and the query
+    parameters. Every thread gets its own connection, and the database runs in WAL mode,
+    so concurrent searches and several processes can share one cache file.
+
+    Attributes:
+        path (str): The path of the SQLite database.
+        ttl (float): The number of seconds a result stays valid.
+    """
+
+    def __init__(self: "QueryCache", path: str, ttl: float = 7 * 24 * 60 * 60) -> None:
+        """
+        Initializes a query cache, creating the database if needed.
+
+        Args:
+            path (str): The path of the SQLite database.
+            ttl (float, optional): The number of seconds a result stays valid. Defaults to a week.
+        """
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS queries "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+
+    def _connection(self: "QueryCache") -> sqlite3.Connection:
+        """
+        Returns:
+            sqlite3.Connection: The connection of the calling thread.
+        """
+        connection: Optional[sqlite3.Connection] = getattr(
+            self._local, "connection", None
+        )
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def key(namespace: str, query: Dict[str, Any]) -> str:
+        """
+        Args:
+            namespace (str): The API the query goes to, e.g. "spotify".
+            query (Dict[str, Any]): The JSON-serialisable query parameters.
+
+        Returns:
+            str: The key of the query.
+        """
+        return json.dumps([namespace, query], sort_keys=True)
+
+    def get(self: "QueryCache", namespace: str, query: Dict[str, Any]) -> Optional[Any]:
+        """
+        Looks up the result of a query.
+
+        Args:
+            namespace (str): The API the query goes to, e.g. "spotify".
+            query (Dict[str, Any]): The JSON-serialisable query parameters.
+
+        Returns:
+            Optional[Any]: The cached result, or None on a miss or if the result expired.
+        """
+        row = (
+            self._connection()
+            .execute(
+                "SELECT value FROM queries WHERE key = ? AND expires > ?",
+                (self.key(namespace, query), time.time()),
+            )
+            .fetchone()
+        )
+        return json.loads(row[0]) if row is not None else None
+
+    def put(
+        self: "QueryCache", namespace: str, query: Dict[str, Any], value: Any
+    ) -> None:
+        """
+        Stores the result of a query.
+
+        Args:
+            namespace (str): The API the query goes to, e.g. "spotify".
+            query (Dict[str, Any]): The JSON-serialisable query parameters.
+            value (Any): The JSON-serialisable result.
+        """
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO queries (key, value, expires) VALUES (?, ?, ?)",
+                (
+                    self.key(namespace, query),
+                    json.dumps(value),
+                    time.time() + self.ttl,
+                ),
+            )
+
+    def purge(self: "QueryCache") -> int:
+        """
+        Removes the expired results.
+
+        Returns:
+            int: The number of removed results.
+        """
+        with self._connection() as connection:
+            return connection.execute(
+                "DELETE FROM queries WHERE expires <= ?", (time.time(),)
+            ).rowcount
+
+    def __len__(self: "QueryCache") -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM queries").fetchone()[0]
@@ -0,0 +1,414 @@
+import email.utils
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from urllib.parse import urlparse
+
+from requests import Response, Session
+from requests.exceptions import ConnectionError, Timeout
+
+from ..exceptions import CircuitOpen
+
+T = TypeVar("T")
+
+# Statuses that signal an overloaded or rate-limited provider rather than a bad request.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a `Retry-After` header, given either in seconds or as an HTTP date.
+
+    Args:
+        value (Optional[str]): The header value.
+
+    Returns:
+        Optional[float]: The number of seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class TokenBucket:
+    """
+    A thread-safe token bucket with an adaptive rate.
+
+    Requests take one token each. Tokens refill at `rate` per second, up to `burst`. A 429 response
+    halves the rate (down to `min_rate`), and every success recovers a small fraction of `max_rate`.
+    Throughput therefore settles just under the limit of the provider instead of repeatedly
+    running into it.
+
+    Attributes:
+        max_rate (float): The configured number of requests per second.
+        rate (float): The current number of requests per second.
+        min_rate (float): The lowest rate a 429 can reduce the rate to.
+        burst (float): The maximum number of stored tokens.
+    """
+
+    # The fraction of `max_rate` recovered by every successful request.
+    RECOVERY: float = 0.02
+
+    def __init__(
+        self: "TokenBucket",
+        rate: float,
+        burst: Optional[float] = None,
+        min_rate: Optional[float] = None,
+    ) -> None:
+        """
+        Initializes a full bucket.
+
+        Args:
+            rate (float): The number of requests per second.
+            burst (Optional[float], optional): The maximum number of stored tokens. Defaults to `max(1, rate)`.
+            min_rate (Optional[float], optional): The lowest adaptive rate. Defaults to `rate / 16`.
+        """
+        self.max_rate = rate
+        self.rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate / 16
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens: float = self.burst
+        self._updated: float = time.monotonic()
+        self._paused_until: float = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self: "TokenBucket") -> float:
+        """
+        Takes a token, waiting until one is available.
+
+        Returns:
+            float: The number of seconds waited.
+        """
+        waited: float = 0.0
+        while True:
+            with self._lock:
+                now: float = time.monotonic()
+                if now < self._paused_until:
+                    wait: float = self._paused_until - now
+                else:
+                    self._tokens = min(
+                        self.burst, self._tokens + (now - self._updated) * self.rate
+                    )
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return waited
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self: "TokenBucket", seconds: float) -> None:
+        """
+        Holds back every request for a number of seconds, e.g. as asked by a `Retry-After` header.
+
+        Args:
+            seconds (float): The number of seconds to wait.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+    def throttle(self: "TokenBucket") -> None:
+        """
+        Halves the rate after the provider signalled that it is over its limit.
+        """
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def recover(self: "TokenBucket") -> None:
+        """
+        Raises the rate towards `max_rate` after a successful request.
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * self.RECOVERY)
+
+
+class CircuitBreaker:
+    """
+    Suspends requests to a host after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and requests fail fast with
+    `CircuitOpen`. Once `reset_timeout` has passed, a single trial request is let through. Its
+    success closes the circuit again, and its failure reopens it.
+
+    Attributes:
+        failure_threshold (int): The number of consecutive failures that open the circuit.
+        reset_timeout (float): The number of seconds before a trial request is let through.
+    """
+
+    def __init__(
+        self: "CircuitBreaker", failure_threshold: int = 5, reset_timeout: float = 30.0
+    ) -> None:
+        """
+        Initializes a closed circuit.
+
+        Args:
+            failure_threshold (int, optional): The number of consecutive failures that open the circuit. Defaults to 5.
+            reset_timeout (float, optional): The number of seconds before a trial request. Defaults to 30.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures: int = 0
+        self._opened_at: Optional[float] = None
+        self._trial: bool = False
+        self._lock = threading.Lock()
+
+    @property
+    def open(self: "CircuitBreaker") -> bool:
+        """
+        Returns:
+            bool: Whether requests are currently suspended.
+        """
+        return self._opened_at is not None
+
+    def check(self: "CircuitBreaker", host: str) -> None:
+        """
+        Lets a request through, or fails fast while the circuit is open.
+
+        Args:
+            host (str): The host of the request, for the error message.
+
+        Raises:
+            CircuitOpen: If the circuit is open, or a trial request is already in flight.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return
+            elapsed: float = time.monotonic() - self._opened_at
+            if elapsed < self.reset_timeout:
+                raise CircuitOpen(host, self.reset_timeout - elapsed)
+            if self._trial:
+                raise CircuitOpen(host, self.reset_timeout)
+            self._trial = True
+
+    def success(self: "CircuitBreaker") -> None:
+        """
+        Records a successful request, closing the circuit.
+        """
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = False
+
+    def release(self: "CircuitBreaker") -> None:
+        """
+        Ends a trial request without a verdict, e.g. after a rate limit, so the next request can try again.
+        """
+        with self._lock:
+            self._trial = False
+
+    def failure(self: "CircuitBreaker") -> None:
+        """
+        Records a failed request, opening the circuit after too many in a row or a failed trial.
+        """
+        with self._lock:
+            self._failures += 1
+            if self._trial or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+            self._trial = False
+
+
+class RequestScheduler:
+    """
+    Schedules the HTTP calls of track generators against rate-limited external APIs.
+
+    Every host gets its own `TokenBucket` and `CircuitBreaker`, so a throttled or failing API
+    does not slow down the others. Rate-limited (429) and server error (5xx) responses, as well as
+    connection errors, are retried up to `max_retries` times. A `Retry-After` header is honoured
+    by pausing the whole host, since every thread would run into the same limit. Otherwise the
+    retry waits an exponential backoff with full jitter.
+
+    Attributes:
+        rate (float): The default number of requests per second per host.
+        host_rates (Dict[str, float]): Per-host overrides of the rate, e.g. `{"saavn.dev": 2}`.
+        max_retries (int): The maximum number of retries of a request.
+        backoff (float): The base delay of the exponential backoff in seconds.
+        max_backoff (float): The maximum delay of a retry in seconds.
+    """
+
+    def __init__(
+        self: "RequestScheduler",
+        rate: float = 10.0,
+        host_rates: Optional[Dict[str, float]] = None,
+        max_retries: int = 5,
+        backoff: float = 0.5,
+        max_backoff: float = 60.0,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+    ) -> None:
+        """
+        Initializes a scheduler.
+
+        Args:
+            rate (float, optional): The default number of requests per second per host. Defaults to 10.
+            host_rates (Optional[Dict[str, float]], optional): Per-host overrides of the rate.
+            max_retries (int, optional): The maximum number of retries of a request. Defaults to 5.
+            backoff (float, optional): The base delay of the exponential backoff in seconds. Defaults to 0.5.
+            max_backoff (float, optional): The maximum delay of a retry in seconds. Defaults to 60.
+            failure_threshold (int, optional): The consecutive failures that suspend a host. Defaults to 5.
+            reset_timeout (float, optional): The seconds a host stays suspended. Defaults to 30.
+        """
+        self.rate = rate
+        self.host_rates = host_rates or {}
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: Dict[str, Tuple[TokenBucket, CircuitBreaker]] = {}
+        self._lock = threading.Lock()
+
+    def host(self: "RequestScheduler", host: str) -> Tuple[TokenBucket, CircuitBreaker]:
+        """
+        Args:
+            host (str): The host, e.g. "saavn.dev".
+
+        Returns:
+            Tuple[TokenBucket, CircuitBreaker]: The rate limiter and circuit breaker of the host.
+        """
+        with self._lock:
+            if host not in self._hosts:
+                self._hosts[host] = (
+                    TokenBucket(self.host_rates.get(host, self.rate)),
+                    CircuitBreaker(self.failure_threshold, self.reset_timeout),
+                )
+            return self._hosts[host]
+
+    def retry_delay(
+        self: "RequestScheduler", attempt: int, retry_after: Optional[float] = None
+    ) -> float:
+        """
+        Args:
+            attempt (int): The number of the failed attempt, starting at 0.
+            retry_after (Optional[float], optional): The delay asked for by the provider.
+
+        Returns:
+            float: The number of seconds to wait before the next attempt.
+        """
+        if retry_after is not None:
+            return retry_after
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+
+    def call(self: "RequestScheduler", host: str, send: Callable[[], T]) -> T:
+        """
+        Runs a request through the rate limiter and circuit breaker of a host, retrying it if needed.
+
+        `send` either returns a response with `ok`, `status_code` and `headers`, or raises. Errors
+        with an `http_status` attribute (e.g. `SpotifyException`) are treated like responses with
+        that status, and connection errors like server errors. Other errors count as failures of the
+        host and are raised at once.
+
+        Args:
+            host (str): The host of the request.
+            send (Callable[[], T]): Sends the request.
+
+        Raises:
+            CircuitOpen: If the host is suspended after repeated failures.
+            Exception: The error of the last attempt, if every attempt raised.
+
+        Returns:
+            T: The first successful response, or the last response if every attempt failed.
+        """
+        bucket, breaker = self.host(host)
+        attempt: int = 0
+        while True:
+            breaker.check(host)
+            bucket.acquire()
+            error: Optional[Exception] = None
+            response: Any = None
+            try:
+                response = send()
+            except (ConnectionError, Timeout) as connection_error:
+                error, status, headers = connection_error, None, {}
+            except Exception as http_error:
+                if getattr(http_error, "http_status", None) is None:
+                    # Still settles a half-open trial, which would otherwise block the host for good.
+                    breaker.failure()
+                    raise
+                error = http_error
+                status = http_error.http_status
+                headers = getattr(http_error, "headers", None) or {}
+            else:
+                # Results of client libraries, e.g. parsed JSON, are successes.
+                if getattr(response, "ok", True):
+                    breaker.success()
+                    bucket.recover()
+                    return response
+                status, headers = response.status_code, response.headers
+
+            if status is not None and status not in RETRY_STATUSES:
+                # The request itself is wrong; retrying it cannot help.
+                breaker.success()
+                if error is not None:
+                    raise error
+                return response
+            if status == 429:
+                # A rate limit says nothing about the health of the host.
+                bucket.throttle()
+                breaker.release()
+            else:
+                breaker.failure()
+            if attempt >= self.max_retries or (status != 429 and breaker.open):
+                if error is not None:
+                    raise error
+                return response
+
+            retry_after: Optional[float] = parse_retry_after(headers.get("Retry-After"))
+            delay: float = self.retry_delay(attempt, retry_after)
+            if response is not None:
+                response.close()
+            if retry_after is not None or status == 429:
+                bucket.pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def request(
+        self: "RequestScheduler",
+        session: Session,
+        method: str,
+        url: str,
+        **kwargs: Any,
+    ) -> Response:
+        """
+        Sends an HTTP request through the scheduler (see `call`).
+
+        Args:
+            session (Session): The session to send the request with.
+            method (str): The HTTP method.
+            url (str): The URL of the request.
+            **kwargs (Any): The keyword arguments of `Session.request`.
+
+        Returns:
+            Response: The first successful response, or the last response if every attempt failed.
+        """
+        return self.call(
+            urlparse(url).netloc,
+            lambda: session.request(method=method, url=url, **kwargs),
+        )
+
+
+_default_scheduler: Optional[RequestScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def default_scheduler() -> RequestScheduler:
+    """
+    Returns:
+        RequestScheduler: The scheduler shared by every track generator that is not given its own.
+    """
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler()
+        return _default_scheduler
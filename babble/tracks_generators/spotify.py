@@ -1,15 +1,26 @@
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Iterator, List, Dict, Any, Optional, Set, Tuple
 from spotipy import Spotify
 from spotipy.oauth2 import SpotifyClientCredentials
-from requests import Response, Session
-from tempfile import NamedTemporaryFile
+from requests import Response
 import numpy as np
 
 from .base import TrackGenerator
+from .cache import AudioCache
+from .query_cache import QueryCache
+from .scheduler import RequestScheduler
+from ..exceptions import InvalidResponse
 from ..types import Genre
 from ..utils import get_env_variable
 from ..api import load_file
 
+# Spotify returns at most 50 tracks per search page and no results past an offset of 1000.
+PAGE_SIZE: int = 50
+MAX_OFFSET: int = 1000
+# The oldest release year searched when a genre has more tracks than one search can return.
+FIRST_YEAR: int = 1950
+
 
 class SpotifyGenerator(TrackGenerator):
     """
@@ -21,15 +32,40 @@ class SpotifyGenerator(TrackGenerator):
         spotify (Spotify): An instance of the Spotify API client for authentication and querying.
     """
 
-    def __init__(self: "SpotifyGenerator", limit: int, music_genre: Genre) -> None:
+    def __init__(
+        self: "SpotifyGenerator",
+        limit: int,
+        music_genre: Genre,
+        concurrency: int = 1,
+        ordered: bool = True,
+        cache: Optional[AudioCache] = None,
+        query_cache: Optional[QueryCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
+    ) -> None:
         """
         Initializes a SpotifyGenerator instance.
 
         Args:
             limit (int): The maximum number of tracks to generate.
             music_genre (Genre): The genre of music to generate (e.g., "pop", "hip-hop").
+            concurrency (int, optional): The number of tracks downloaded at the same time. Defaults to 1.
+            ordered (bool, optional): Whether concurrent downloads are yielded in search order. Defaults to True.
+            cache (Optional[AudioCache], optional): The on-disk cache of downloaded tracks. Defaults to no cache.
+            query_cache (Optional[QueryCache], optional): The persistent cache of Spotify and Saavn searches.
+                                                          Defaults to no cache.
+            scheduler (Optional[RequestScheduler], optional): The rate limiter and retry policy of all HTTP calls.
+                                                              Defaults to the scheduler shared by every generator.
         """
-        super().__init__(generator="Spotify", limit=limit, music_genre=music_genre)
+        super().__init__(
+            generator="Spotify",
+            limit=limit,
+            music_genre=music_genre,
+            concurrency=concurrency,
+            ordered=ordered,
+            cache=cache,
+            query_cache=query_cache,
+            scheduler=scheduler,
+        )
 
     def authenticate(self: "SpotifyGenerator") -> None:
         """
@@ -40,11 +76,86 @@ class SpotifyGenerator(TrackGenerator):
         """
         client_id: str = get_env_variable("SPOTIFY_CLIENT_ID")
         client_secret: str = get_env_variable("SPOTIFY_CLIENT_SECRET")
+        # The shared session has no retry policy of its own, so rate-limited searches surface
+        # as errors with their `Retry-After` header, and the scheduler retries them.
         self.spotify: Spotify = Spotify(
             auth_manager=SpotifyClientCredentials(
                 client_id=client_id, client_secret=client_secret
+            ),
+            requests_session=self.session,
+        )
+
+    def _download_url(self: "SpotifyGenerator", query: str) -> str:
+        """
+        Looks up the download URL of a track using the free Saavn API.
+
+        Args:
+            query (str): The query string to search for the track.
+
+        Returns:
+            str: The URL of the highest quality download.
+        """
+
+        def fetch() -> str:
+            full_url: str = f"https://saavn.dev/api/search/songs?query={query}"
+            response: Dict[str, Any] = self._http_request("GET", full_url)
+            download_urls: List[Dict[str, str]] = next(
+                iter(response.get("data", {}).get("results", [{}]))
+            ).get("downloadUrl", [])
+            download_url: str = download_urls[-1].get(
+                "url", ""
+            )  # last url has the highest quality
+            return download_url
+
+        return self.cached_query("saavn", {"query": query}, fetch)
+
+    def _download(
+        self: "SpotifyGenerator", download_url: str, stream: bool = False
+    ) -> Response:
+        """
+        Sends the download request of a track.
+
+        Args:
+            download_url (str): The URL of the download.
+            stream (bool, optional): Whether to leave the body unread, to be streamed. Defaults to False.
+
+        Returns:
+            Response: The successful response.
+
+        Raises:
+            InvalidResponse: If the download failed, so error pages are neither cached nor decoded.
+        """
+        response: Response = self._send("GET", download_url, stream=stream)
+        if not response.ok:
+            response.close()
+            raise InvalidResponse(
+                code=response.status_code, reason=response.reason, url=download_url
             )
+        return response
+
+    def download_audio_bytes(self: "SpotifyGenerator", query: str) -> bytes:
+        """
+        Downloads the encoded audio of a track, through the cache if there is one.
+
+        Args:
+            query (str): The query string to search for the track.
+
+        Returns:
+            bytes: The encoded audio.
+
+        Raises:
+            InvalidResponse: If the download failed.
+        """
+        download_url: str = self._download_url(query)
+        key: str = AudioCache.key(download_url)
+        content: Optional[bytes] = (
+            self.cache.get_bytes(key) if self.cache is not None else None
         )
+        if content is None:
+            content = self._download(download_url).content
+            if self.cache is not None:
+                self.cache.put_bytes(key, content)
+        return content
 
     def download_audio_file(
         self: "SpotifyGenerator", query: str
@@ -58,37 +169,93 @@ class SpotifyGenerator(TrackGenerator):
         Returns:
             Tuple[int, np.ndarray]: A tuple containing the sampling rate (int) and the audio data (np.ndarray).
         """
-        full_url: str = f"https://saavn.dev/api/search/songs?query={query}"
-        response: Dict[str, Any] = self._http_request("GET", full_url)
-        download_urls: List[Dict[str, str]] = next(
-            iter(response.get("data", {}).get("results", [{}]))
-        ).get("downloadUrl", [])
-        download_url: str = download_urls[-1].get(
-            "url", ""
-        )  # last url has the highest quality
-
-        with Session() as session:
-            response: Response = session.get(download_url)
-            with NamedTemporaryFile(suffix=".wav") as temp_file_handler:
-                temp_file_handler.write(response.content)
-                sampling_rate, audio_data = load_file(temp_file_handler.name)
-        return sampling_rate, audio_data
+        if self.cache is not None:
+            return load_file(self.download_audio_bytes(query))
+
+        # Read the response in chunks instead of buffering it as one bytes object.
+        with self._download(self._download_url(query), stream=True) as response:
+            response.raw.decode_content = True
+            return load_file(response.raw)
+
+    def _search_page(self: "SpotifyGenerator", q: str, offset: int) -> Dict[str, Any]:
+        """
+        Fetches one page of a Spotify track search, through the query cache if there is one.
+
+        Args:
+            q (str): The search query, e.g. "genre:pop".
+            offset (int): The index of the first result of the page.
+
+        Returns:
+            Dict[str, Any]: The total number of results (`total`) and the track queries of the page (`queries`).
+        """
+
+        def fetch() -> Dict[str, Any]:
+            results: Dict[str, Any] = self.scheduler.call(
+                "api.spotify.com",
+                lambda: self.spotify.search(
+                    q=q, limit=PAGE_SIZE, offset=offset, type="track"
+                ),
+            )
+            tracks: Dict[str, Any] = results.get("tracks", {})
+            return {
+                "total": tracks.get("total", 0),
+                "queries": [
+                    f"{next(iter(track.get('artists', [])), {}).get('name', '')} {track.get('name')}"
+                    for track in tracks.get("items", [])
+                    if track and track.get("type") == "track"
+                ],
+            }
+
+        return self.cached_query(
+            "spotify", {"q": q, "offset": offset, "limit": PAGE_SIZE}, fetch
+        )
+
+    def _search_partitions(self: "SpotifyGenerator") -> Iterator[str]:
+        """
+        Yields the search queries of the genre: the whole genre first, then one release year
+        at a time, newest first, to get past the result cap of a single search.
+
+        Yields:
+            str: The next search query.
+        """
+        yield f"genre:{self.music_genre}"
+        for year in range(date.today().year, FIRST_YEAR - 1, -1):
+            yield f"genre:{self.music_genre} year:{year}"
 
     def search_audio_files(self: "SpotifyGenerator") -> List[str]:
         """
         Searches for audio files based on the genre and limit.
 
-        Uses the Spotify API to search for tracks that match the specified genre and limit.
+        Uses the Spotify API to search for tracks that match the specified genre and limit. Results are
+        fetched in pages of 50. After the first page of a search reports the number of results, the
+        remaining pages are fetched concurrently by `concurrency` threads. Past the 1000 results a
+        single search can return, the genre is searched one release year at a time, skipping tracks
+        that were already found. A genre with fewer results is searched only once.
 
         Returns:
             List[str]: A list of track queries (e.g., "artist name track name") to be used for downloading.
         """
-        results: Dict[str, Any] = self.spotify.search(
-            q=f"genre:{self.music_genre}", limit=self.limit
-        )
-        track_queries: List[str] = [
-            f"{next(iter(track.get('artists', [])), {}).get('name', '')} {track.get('name')}"
-            for track in results.get("tracks", {}).get("items")
-            if track.get("type") == "track"
-        ]
-        return track_queries
+        track_queries: List[str] = []
+        seen: Set[str] = set()
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            for partition, q in enumerate(self._search_partitions()):
+                if len(track_queries) >= self.limit:
+                    break
+                first_page: Dict[str, Any] = self._search_page(q, 0)
+                end: int = min(
+                    first_page["total"], MAX_OFFSET, self.limit - len(track_queries)
+                )
+                pages: List[Dict[str, Any]] = [first_page] + list(
+                    executor.map(
+                        lambda offset: self._search_page(q, offset),
+                        range(PAGE_SIZE, end, PAGE_SIZE),
+                    )
+                )
+                for page in pages:
+                    for track_query in page["queries"]:
+                        if track_query not in seen:
+                            seen.add(track_query)
+                            track_queries.append(track_query)
+                if partition == 0 and first_page["total"] <= MAX_OFFSET:
+                    break  # The genre-wide search already returned every track
+        return track_queries[: self.limit]
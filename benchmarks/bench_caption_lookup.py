@@ -0,0 +1,97 @@
+"""
+Benchmark of the indexed caption lookup in the StableAudio `custom_metadata` module
+against the previous implementation, which parsed the whole CSV for every sample.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_caption_lookup.py [--captions 5500] [--lookups 200]
+"""
+
+import argparse
+import os
+import random
+import string
+import time
+from tempfile import TemporaryDirectory
+
+import pandas as pd
+
+from babble.eval_models.StableAudio import custom_metadata
+
+
+def previous_get_prompt(file_path: str) -> str:
+    """
+    The previous `get_prompt`, which reads and scans the CSV on every call.
+    """
+    dataset_path, filename = file_path.split("/[")
+    dataset_path = dataset_path.replace("audio", "metadata")
+    file_dataset_id = filename.split("]")[0]
+    df = pd.read_csv(f"{dataset_path}/musiccaps-public.csv")
+    return df.loc[df["ytid"] == file_dataset_id, "caption"].iloc[0]
+
+
+def time_lookups(function, paths) -> float:
+    """
+    Returns the mean wall time of a lookup function over a list of paths.
+    """
+    started = time.perf_counter()
+    for path in paths:
+        function(path)
+    return (time.perf_counter() - started) / len(paths)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--captions", type=int, default=5500)
+    parser.add_argument("--lookups", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    ytids = [
+        "".join(rng.choices(string.ascii_letters + string.digits + "-_", k=11))
+        for _ in range(args.captions)
+    ]
+    words = ["guitar", "drums", "low quality", "female vocal", "upbeat", "ambient"]
+
+    with TemporaryDirectory() as directory:
+        metadata_dir = os.path.join(directory, "metadata")
+        os.makedirs(metadata_dir)
+        pd.DataFrame(
+            {
+                "ytid": ytids,
+                "caption": [" ".join(rng.choices(words, k=40)) for _ in ytids],
+            }
+        ).to_csv(os.path.join(metadata_dir, custom_metadata.CAPTIONS_FILE), index=False)
+        paths = [
+            os.path.join(directory, "audio", f"[{ytid}]-[0]-[10].wav")
+            for ytid in rng.choices(ytids, k=args.lookups)
+        ]
+
+        baseline = time_lookups(previous_get_prompt, paths[: max(len(paths) // 10, 1)])
+
+        custom_metadata._indexes.clear()
+        started = time.perf_counter()
+        custom_metadata.get_prompt(paths[0])
+        build = time.perf_counter() - started
+        indexed = time_lookups(custom_metadata.get_prompt, paths)
+
+        custom_metadata.build_compact_index(metadata_dir)
+        custom_metadata._indexes.clear()
+        started = time.perf_counter()
+        custom_metadata.get_prompt(paths[0])
+        mapped_build = time.perf_counter() - started
+        mapped = time_lookups(custom_metadata.get_prompt, paths)
+
+    print(f"{'lookup':<16}{'first call':>14}{'per lookup':>14}{'speedup':>12}")
+    print(f"{'previous':<16}{'':>14}{baseline * 1e6:>12.1f}us{1:>11.0f}x")
+    for name, first, per_lookup in [
+        ("dict index", build, indexed),
+        ("mmap index", mapped_build, mapped),
+    ]:
+        print(
+            f"{name:<16}{first * 1000:>12.1f}ms{per_lookup * 1e6:>12.1f}us"
+            f"{baseline / per_lookup:>11.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark of the attack evaluation harness: a loop calling the model one clip at a time
+against `evaluate_attack` with batched inference and prefetching. Reports clips/s.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_evaluation.py [--clips 10000] [--seconds 1]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+
+from babble.algorithms.front_end import MelFrontEnd
+from babble.evaluation import add_trigger, evaluate_attack
+
+
+def classifier(n_mels: int = 64, num_classes: int = 10) -> torch.nn.Module:
+    """
+    Returns a small convolutional classifier of mel spectrograms.
+    """
+    return torch.nn.Sequential(
+        torch.nn.Conv1d(n_mels, 64, 3, padding=1),
+        torch.nn.ReLU(),
+        torch.nn.AdaptiveAvgPool1d(1),
+        torch.nn.Flatten(),
+        torch.nn.Linear(64, num_classes),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clips", type=int, default=10000)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    sample_rate = 16000
+    rng = np.random.default_rng(0)
+    samples = int(args.seconds * sample_rate)
+    clips = rng.normal(0, 0.1, (args.clips, samples)).astype(np.float32)
+    dataset = [
+        (clip, int(label))
+        for clip, label in zip(clips, rng.integers(0, 10, args.clips))
+    ]
+    trigger = rng.normal(0, 0.05, sample_rate // 10).astype(np.float32)
+    front_end, model = MelFrontEnd(sample_rate), classifier().eval()
+
+    started = time.perf_counter()
+    with torch.no_grad():
+        for audio, _ in dataset[: args.clips // 10]:
+            poisoned = add_trigger(audio[None], trigger, rng)
+            model(front_end(torch.from_numpy(audio[None])))
+            model(front_end(torch.from_numpy(poisoned)))
+    loop_rate = (args.clips // 10) / (time.perf_counter() - started)
+
+    result = evaluate_attack(
+        model,
+        dataset,
+        target_label=0,
+        trigger=trigger,
+        transform=front_end,
+        batch_size=args.batch_size,
+        seed=0,
+    )
+    batched_rate = result.clips / result.elapsed
+
+    print(f"per-clip loop: {loop_rate:>10.0f} clips/s")
+    print(
+        f"batched:       {batched_rate:>10.0f} clips/s "
+        f"({result.clips} clips in {result.elapsed:.1f}s, {batched_rate / loop_rate:.1f}x)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark of one FlowMur optimisation epoch: the previous batch-size-1 loop against the
+mini-batched trigger optimisation, on CPU with a small convolutional classifier.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_flowmur.py [--clips 256] [--seconds 1] [--batch-size 32]
+"""
+
+import argparse
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from babble.algorithms import FlowMurTriggerGenerationAlgorithm
+
+
+def classifier() -> nn.Module:
+    """
+    Returns a small 1-D convolutional classifier over raw audio of shape `(batch, samples)`.
+    """
+    return nn.Sequential(
+        nn.Unflatten(1, (1, -1)),
+        nn.Conv1d(1, 16, kernel_size=64, stride=16),
+        nn.ReLU(),
+        nn.Conv1d(16, 32, kernel_size=8, stride=4),
+        nn.ReLU(),
+        nn.AdaptiveAvgPool1d(1),
+        nn.Flatten(),
+        nn.Linear(32, 10),
+    )
+
+
+def previous_epoch(algorithm: FlowMurTriggerGenerationAlgorithm) -> None:
+    """
+    One epoch of the previous implementation: a forward/backward pass per clip.
+    """
+    optimizer = torch.optim.Adam([algorithm.delta], lr=algorithm.alpha)
+    loss_fn = nn.CrossEntropyLoss()
+    dataset = [
+        (torch.tensor(audio, device=algorithm.device), y)
+        for audio, y in algorithm.dataset
+    ]
+    target = torch.tensor([algorithm.target_label])
+    np.random.shuffle(dataset)
+    for x, _ in dataset:
+        tau = np.random.randint(0, x.shape[0] - algorithm.trigger_samples + 1)
+        optimizer.zero_grad()
+        x[tau : tau + algorithm.delta.shape[0]] += algorithm.delta
+        x = torch.clamp(x, min=-1, max=1)
+        loss = loss_fn(algorithm.model(x.unsqueeze(0)), target)
+        loss.backward()
+        optimizer.step()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clips", type=int, default=256)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    sample_rate = 16000
+    rng = np.random.default_rng(0)
+    dataset = [
+        (rng.standard_normal(int(args.seconds * sample_rate)).astype(np.float32) * 0.1, 0)
+        for _ in range(args.clips)
+    ]
+
+    def create(batch_size: int) -> FlowMurTriggerGenerationAlgorithm:
+        return FlowMurTriggerGenerationAlgorithm(
+            classifier(),
+            dataset,
+            target_label=1,
+            epsilon=0.05,
+            trigger_duration=0.1,
+            sample_rate=sample_rate,
+            num_epochs=1,
+            batch_size=batch_size,
+            seed=0,
+        )
+
+    def best_of(run, repeat: int = 3) -> float:
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    timings = {"previous": best_of(lambda: previous_epoch(create(1)))}
+    for batch_size in [1, args.batch_size]:
+        timings[f"batch_size={batch_size}"] = best_of(
+            lambda: create(batch_size).trigger()
+        )
+
+    print(f"{'epoch':<20}{'time':>12}{'speedup':>10}")
+    for name, timing in timings.items():
+        print(f"{name:<20}{timing:>11.2f}s{timings['previous'] / timing:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark of the FlowMur CPU performance settings, reported as optimisation steps per second.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_flowmur_cpu.py [--clips 256] [--seconds 1] [--batch-size 32]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+
+from babble.algorithms.flowmur import (
+    CPUPerformance,
+    FlowMurTriggerGenerationAlgorithm,
+    cpu_supports_bf16,
+)
+from bench_flowmur import classifier
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clips", type=int, default=256)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--epochs", type=int, default=3)
+    args = parser.parse_args()
+
+    sample_rate = 16000
+    rng = np.random.default_rng(0)
+    dataset = [
+        (rng.standard_normal(int(args.seconds * sample_rate)).astype(np.float32) * 0.1, 0)
+        for _ in range(args.clips)
+    ]
+    steps_per_epoch = -(-args.clips // args.batch_size)
+    threads = os.cpu_count()
+
+    settings = {
+        "default": CPUPerformance(),
+        f"threads={threads}": CPUPerformance(num_threads=threads),
+        "compile": CPUPerformance(num_threads=threads, compile=True),
+    }
+    if cpu_supports_bf16():
+        settings["bf16"] = CPUPerformance(num_threads=threads, bf16=True)
+        settings["compile+bf16"] = CPUPerformance(
+            num_threads=threads, compile=True, bf16=True
+        )
+
+    print(f"{'setting':<20}{'steps/s':>10}{'speedup':>10}")
+    baseline = None
+    for name, cpu_performance in settings.items():
+        algorithm = FlowMurTriggerGenerationAlgorithm(
+            classifier(),
+            dataset,
+            target_label=1,
+            epsilon=0.05,
+            trigger_duration=0.1,
+            sample_rate=sample_rate,
+            num_epochs=1,
+            batch_size=args.batch_size,
+            seed=0,
+            cpu_performance=cpu_performance,
+        )
+        # The first epoch includes compilation and allocator warm-up.
+        algorithm.trigger()
+        algorithm.num_epochs = args.epochs
+        started = time.perf_counter()
+        algorithm.trigger()
+        steps_per_second = steps_per_epoch * args.epochs / (time.perf_counter() - started)
+        baseline = baseline or steps_per_second
+        print(f"{name:<20}{steps_per_second:>10.1f}{steps_per_second / baseline:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark of the mel front-end: a full-clip STFT per step against the incremental update,
+which only recomputes the frames overlapping the trigger. Reports the time of one
+forward and backward pass per step for several clip lengths.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_front_end.py [--batch-size 16] [--trigger 0.1]
+"""
+
+import argparse
+import time
+
+import torch
+
+from babble.algorithms.front_end import MelFrontEnd
+
+
+def step_time(step, repeat: int = 20) -> float:
+    """
+    Returns the mean wall time of a step after one warm-up run.
+    """
+    step()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        step()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--trigger", type=float, default=0.1)
+    args = parser.parse_args()
+
+    sample_rate = 16000
+    front_end = MelFrontEnd(sample_rate)
+    trigger_samples = int(args.trigger * sample_rate)
+    delta = (torch.randn(trigger_samples) * 0.01).requires_grad_()
+
+    print(f"{'clip':<8}{'full':>12}{'incremental':>14}{'speedup':>10}")
+    for seconds in [1, 4, 16]:
+        samples = seconds * sample_rate
+        x = torch.randn(args.batch_size, samples) * 0.1
+        with torch.no_grad():
+            clean = front_end(x)
+        offsets = torch.randint(0, samples - trigger_samples + 1, (args.batch_size,))
+        index = offsets[:, None] + torch.arange(trigger_samples)
+
+        def full() -> None:
+            poisoned = torch.clamp(
+                x.scatter_add(1, index, delta.expand(args.batch_size, -1)), -1, 1
+            )
+            front_end(poisoned).mean().backward()
+
+        def incremental() -> None:
+            front_end.update(x, clean, delta, offsets).mean().backward()
+
+        full_time, incremental_time = step_time(full), step_time(incremental)
+        print(
+            f"{seconds:>3} s    {full_time * 1000:>10.1f}ms{incremental_time * 1000:>12.1f}ms"
+            f"{full_time / incremental_time:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark of the soundfile fast path in `load_file` against the previous
+`librosa.load` + `astype(np.float32)` implementation.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_load_file.py [--seconds 30] [--repeat 5]
+"""
+
+import argparse
+import os
+import time
+from tempfile import TemporaryDirectory
+from typing import Callable
+
+import librosa
+import numpy as np
+import soundfile
+
+from babble.api import load_file
+
+
+def best_of(function: Callable[[], object], repeat: int) -> float:
+    """
+    Returns the best wall time of several runs of a function.
+
+    Args:
+        function (Callable[[], object]): The function to time.
+        repeat (int): The number of runs.
+
+    Returns:
+        float: The best wall time in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    sampling_rate = 44100
+    audio = (np.random.randn(int(args.seconds * sampling_rate), 2) * 0.1).astype(
+        np.float32
+    )
+
+    print(f"{'file':<12}{'previous':>16}{'load_file':>16}{'speedup':>10}")
+    with TemporaryDirectory() as directory:
+        for extension, subtype in [(".wav", "PCM_16"), (".flac", "PCM_24")]:
+            path = os.path.join(directory, f"audio{extension}")
+            soundfile.write(path, audio, sampling_rate, subtype=subtype)
+
+            baseline = best_of(
+                lambda: librosa.load(path, sr=None)[0].astype(np.float32), args.repeat
+            )
+            fast = best_of(lambda: load_file(path), args.repeat)
+            print(
+                f"{extension:<12}{baseline * 1000:>14.1f}ms{fast * 1000:>14.1f}ms"
+                f"{baseline / fast:>9.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
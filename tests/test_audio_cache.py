@@ -0,0 +1,72 @@
+import os
+from unittest.mock import patch
+
+import numpy as np
+
+from babble.tracks_generators import AudioCache, TrackGenerator
+
+
+class QueryTrackGenerator(TrackGenerator):
+    def download_audio_file(self, audio_file_url: str):
+        return (22050, np.full(100, len(audio_file_url), dtype=np.float64))
+
+    def search_audio_files(self):
+        return ["artist one", "artist two"]
+
+
+def test_audio_roundtrip(tmp_path):
+    """Test that decoded audio is stored as float32 and memory-mapped on a hit."""
+    cache = AudioCache(str(tmp_path))
+    key = AudioCache.key("Spotify", "artist track")
+
+    assert cache.get_audio(key) is None
+    cache.put_audio(key, 44100, np.ones((2, 10)))
+    sampling_rate, audio = cache.get_audio(key)
+
+    assert sampling_rate == 44100
+    assert isinstance(audio, np.memmap)
+    assert audio.dtype == np.float32 and audio.shape == (2, 10)
+
+
+def test_bytes_roundtrip(tmp_path):
+    """Test that raw downloaded bytes are cached."""
+    cache = AudioCache(str(tmp_path))
+    key = AudioCache.key("https://example.com/track.mp4")
+
+    assert cache.get_bytes(key) is None
+    cache.put_bytes(key, b"payload")
+
+    assert cache.get_bytes(key) == b"payload"
+
+
+def test_lru_eviction(tmp_path):
+    """Test that the least recently used entries are evicted past the size cap."""
+    cache = AudioCache(str(tmp_path), max_bytes=2500)
+    for index, key in enumerate(["a", "b"]):
+        cache.put_bytes(key, bytes(1000))
+        os.utime(tmp_path / f"{key}.bin", (index, index))
+    # Reading "a" makes "b" the least recently used entry.
+    cache.get_bytes("a")
+    cache.put_bytes("c", bytes(1000))
+
+    assert cache.get_bytes("b") is None
+    assert cache.get_bytes("a") is not None and cache.get_bytes("c") is not None
+    assert cache.size() <= 2500
+
+
+def test_generator_second_pass_is_served_from_cache(tmp_path):
+    """Test that a second pass over the same tracks does not download them again."""
+    generator = QueryTrackGenerator(
+        generator="Spotify",
+        limit=2,
+        music_genre="pop",
+        cache=AudioCache(str(tmp_path)),
+    )
+    first = list(generator)
+
+    with patch.object(generator, "download_audio_file") as mock_download:
+        second = list(generator)
+
+    mock_download.assert_not_called()
+    assert [rate for rate, _ in second] == [22050, 22050]
+    assert all(np.array_equal(a, b) for (_, a), (_, b) in zip(first, second))
@@ -1,3 +1,4 @@
+import io
 import os
 import pytest
 import numpy as np
@@ -9,6 +10,7 @@ from babble.api import (
     save_file,
     mp4_to_wav,
     poison_file,
+    poison_file_blocks,
 )
 from babble.algorithms import Algorithm
 
@@ -119,3 +121,181 @@ def test_poison_file_inplace(temp_audio_file, mock_algorithm):
         poisoned_audio.astype(np.float32), expected_audio.astype(np.float32), atol=3
     )
     assert sr == 22050
+
+
+def test_poison_file_blocks_matches_poison_file(tmp_path):
+    """
+    Test that streaming in blocks produces the same audio as loading the whole file.
+    """
+    from babble.algorithms import UltrasonicNoiseAlgorithm
+
+    input_file = tmp_path / "long_audio.wav"
+    sf.write(input_file, np.random.randn(100000) * 0.1, samplerate=44100)
+    algorithm = UltrasonicNoiseAlgorithm(size=50, pos="mid", cont=False)
+
+    poison_file(str(input_file), algorithm, str(tmp_path / "whole.wav"))
+    duration = poison_file(
+        str(input_file), algorithm, str(tmp_path / "blocks.wav"), block_size=4096
+    )
+
+    whole, _ = sf.read(tmp_path / "whole.wav")
+    blocks, _ = sf.read(tmp_path / "blocks.wav")
+    assert duration == pytest.approx(100000 / 44100)
+    assert np.allclose(whole, blocks)
+
+
+def test_poison_file_blocks_inplace(temp_audio_file, mock_algorithm):
+    """
+    Test that streaming can overwrite the input file.
+    """
+    temp_file, original_audio = temp_audio_file
+
+    poison_file_blocks(str(temp_file), mock_algorithm, block_size=256)
+
+    poisoned_audio, sr = sf.read(temp_file)
+    assert sr == 22050
+    assert len(poisoned_audio) == len(original_audio)
+    assert len(list(temp_file.parent.iterdir())) == 1
+
+
+@pytest.mark.parametrize("algorithm_name", ["noise", "ultrasonic_noise"])
+def test_algorithm_out_and_inplace(algorithm_name):
+    """
+    Test the out-buffer and in-place contract of the built-in algorithms.
+    """
+    from babble import babble
+    from babble.algorithms import get_algorithm
+
+    params = (
+        {"size": 10, "pos": "start"} if algorithm_name == "ultrasonic_noise" else {}
+    )
+    algorithm = get_algorithm(algorithm_name, **params)
+    input_audio = np.random.randn(50000)
+
+    result = babble(input_audio, algorithm)
+    assert result.dtype == np.float32
+    assert result is not input_audio
+
+    out = np.empty(50000, dtype=np.float32)
+    assert babble(input_audio, algorithm, out=out) is out
+
+    float_audio = input_audio.astype(np.float32)
+    assert babble(float_audio, algorithm, inplace=True) is float_audio
+
+    with pytest.raises(ValueError):
+        babble(input_audio, algorithm, inplace=True)
+    with pytest.raises(ValueError):
+        babble(input_audio, algorithm, out=np.empty(10, dtype=np.float32))
+
+
+def test_load_file_keeps_channels(tmp_path):
+    """
+    Test that natively supported formats are decoded by soundfile and keep their channels.
+    """
+    stereo = (np.random.randn(1000, 2) * 0.1).astype(np.float32)
+    stereo_file = tmp_path / "stereo.flac"
+    sf.write(stereo_file, stereo, samplerate=44100, subtype="PCM_24")
+
+    with patch("librosa.load") as mock_load:
+        sr, loaded_audio = load_file(stereo_file)
+        _, mono_audio = load_file(stereo_file, mono=True)
+
+    mock_load.assert_not_called()
+    assert sr == 44100
+    assert loaded_audio.dtype == np.float32
+    assert loaded_audio.shape == (2, 1000)
+    assert np.allclose(loaded_audio, stereo.T, atol=1e-5)
+    assert mono_audio.shape == (1000,)
+
+
+def test_load_file_resamples(temp_audio_file):
+    """
+    Test that the soundfile path resamples to the requested sampling rate.
+    """
+    temp_file, _ = temp_audio_file
+
+    sr, loaded_audio = load_file(temp_file, sampling_rate=11025)
+
+    assert sr == 11025
+    assert loaded_audio.shape == (500,)
+
+
+@pytest.mark.parametrize("name", ["video.mp4", "headerless.raw"])
+@patch("librosa.load", return_value=(np.zeros(1000, dtype=np.float32), 22050))
+def test_load_file_librosa_fallback(mock_load, tmp_path, name):
+    """
+    Test that formats libsndfile does not support, or cannot decode without a header, are decoded by librosa.
+    """
+    video_path = tmp_path / name
+    video_path.write_bytes(b"\0" * 64)
+
+    sr, _ = load_file(str(video_path))
+
+    mock_load.assert_called_once_with(str(video_path), sr=None, mono=False)
+    assert sr == 22050
+
+
+class NonSeekableStream(io.RawIOBase):
+    """
+    A read-only stream that cannot seek, like a streaming HTTP response.
+    """
+
+    def __init__(self, data):
+        self.buffer = io.BytesIO(data)
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        chunk = self.buffer.read(len(target))
+        target[: len(chunk)] = chunk
+        return len(chunk)
+
+
+@pytest.mark.parametrize("wrap", [bytes, io.BytesIO, NonSeekableStream])
+def test_load_file_in_memory(temp_audio_file, wrap):
+    """
+    Test that bytes and file objects are decoded by soundfile without a temporary file.
+    """
+    temp_file, _ = temp_audio_file
+    expected_sr, expected_audio = load_file(temp_file)
+
+    with patch("babble.api.NamedTemporaryFile") as mock_temp_file:
+        sr, loaded_audio = load_file(wrap(temp_file.read_bytes()))
+
+    mock_temp_file.assert_not_called()
+    assert sr == expected_sr
+    assert np.array_equal(loaded_audio, expected_audio)
+
+
+@pytest.mark.parametrize("wrap", [bytes, NonSeekableStream])
+@patch("librosa.load", return_value=(np.zeros(1000, dtype=np.float32), 22050))
+def test_load_file_in_memory_fallback(mock_load, wrap):
+    """
+    Test that in-memory MP4 payloads fall back to librosa through a file with the right extension.
+    """
+    payload = b"\x00\x00\x00\x20ftypM4A " + bytes(100)
+
+    sr, _ = load_file(wrap(payload))
+
+    decoded_path = mock_load.call_args.args[0]
+    assert decoded_path.endswith(".m4a")
+    assert sr == 22050
+
+
+def test_poison_file_stereo(tmp_path, mock_algorithm):
+    """
+    Test that poisoning keeps stereo files stereo, whole and streamed.
+    """
+    input_file = tmp_path / "stereo.wav"
+    sf.write(input_file, np.random.randn(5000, 2) * 0.1, samplerate=44100)
+
+    poison_file(str(input_file), mock_algorithm, str(tmp_path / "whole.wav"))
+    poison_file(
+        str(input_file), mock_algorithm, str(tmp_path / "blocks.wav"), block_size=512
+    )
+
+    whole, _ = sf.read(tmp_path / "whole.wav")
+    blocks, _ = sf.read(tmp_path / "blocks.wav")
+    assert whole.shape == (5000, 2)
+    assert np.allclose(whole, blocks)
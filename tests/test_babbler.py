@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from babble.api import poison_file
+from babble.babbler import babble, babble_batch
+from babble.algorithms import Algorithm, NoiseAlgorithm, UltrasonicNoiseAlgorithm
+
+
+@pytest.mark.parametrize("shape", [(8, 50000), (4, 2, 50000)])
+def test_babble_batch_matches_single_clips(shape):
+    """
+    Test that poisoning a batch gives the same result as poisoning every clip separately.
+    """
+    algorithm = UltrasonicNoiseAlgorithm(size=20, pos="mid", cont=False)
+    batch = np.random.randn(*shape).astype(np.float32)
+
+    poisoned = babble_batch(batch, algorithm)
+
+    expected = np.stack(
+        [babble(clip, algorithm) for clip in batch.reshape(-1, shape[-1])]
+    ).reshape(shape)
+    assert poisoned.shape == shape
+    assert np.allclose(poisoned, expected)
+
+
+def test_babble_batch_noise_inplace():
+    """
+    Test that noise is generated for the whole batch in place.
+    """
+    batch = np.zeros((3, 1000), dtype=np.float32)
+
+    poisoned = babble_batch(batch, NoiseAlgorithm(seed=0), inplace=True)
+
+    assert poisoned is batch
+    assert np.all(poisoned.std(axis=1) > 0)
+
+
+def test_babble_batch_invalid_shape():
+    """
+    Test that a single clip is rejected by the batch API.
+    """
+    with pytest.raises(ValueError):
+        babble_batch(np.zeros(1000, dtype=np.float32), NoiseAlgorithm())
+
+
+class HalveAlgorithm(Algorithm):
+    """An algorithm with the original two-argument `__call__`."""
+
+    def __call__(self, input_audio, audio_genre):
+        return (input_audio / 2).astype(np.float32)
+
+
+def test_babble_two_argument_algorithm():
+    """
+    Test that algorithms without the buffer options work with every buffer option of babble().
+    """
+    algorithm = HalveAlgorithm(name="noise")
+    audio = np.ones(100, dtype=np.float32)
+    out = np.empty(100, dtype=np.float32)
+
+    assert np.allclose(babble(audio, algorithm), 0.5)
+    assert np.allclose(babble(audio, algorithm, inplace=True), 0.5)
+    assert babble(audio, algorithm, out=out) is out and np.allclose(out, 0.5)
+    assert np.allclose(algorithm.process_block(audio, offset=0), 0.5)
+
+
+@pytest.mark.parametrize("block_size", [None, 256])
+def test_poison_file_two_argument_algorithm(tmp_path, block_size):
+    """
+    Test that poison_file() keeps working with the original two-argument `__call__`.
+    """
+    input_path = str(tmp_path / "input.wav")
+    output_path = str(tmp_path / "output.wav")
+    sf.write(input_path, np.full(1000, 0.5), samplerate=8000, subtype="FLOAT")
+
+    poison_file(input_path, HalveAlgorithm(name="noise"), output_path, block_size)
+
+    assert np.allclose(sf.read(output_path)[0], 0.25)
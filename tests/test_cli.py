@@ -0,0 +1,94 @@
+import io
+from importlib.metadata import EntryPoint
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from babble.cli import ProgressLine, build_parser, main
+
+
+def test_parse_params():
+    """
+    Test that algorithm parameters are decoded as JSON with a string fallback.
+    """
+    args = build_parser().parse_args(
+        ["poison", "in", "out", "-a", "ultrasonic_noise", "-p", "size=15"]
+        + ["-p", "pos=start", "-p", "cont=false"]
+    )
+
+    assert args.params == [{"size": 15}, {"pos": "start"}, {"cont": False}]
+
+
+def test_invalid_algorithm():
+    """
+    Test that only registered algorithm names are accepted.
+    """
+    with pytest.raises(SystemExit):
+        build_parser().parse_args(["poison", "in", "out", "-a", "flowmur"])
+
+
+def test_entry_point():
+    """
+    Test that the console script target resolves the way an installed entry point loads it.
+    """
+    assert EntryPoint("babble", "babble.cli:main", "console_scripts").load() is main
+
+
+def test_invalid_param_value(tmp_path, capsys):
+    """
+    Test that parameters rejected by the algorithm are reported as a usage error.
+    """
+    with pytest.raises(SystemExit) as error:
+        main(
+            [
+                "poison",
+                str(tmp_path),
+                str(tmp_path / "output"),
+                "-a",
+                "ultrasonic_noise",
+            ]
+            + ["-p", "size=500", "-p", "pos=mid", "-p", "colour=red"]
+        )
+
+    assert error.value.code == 2
+    assert "invalid parameters for ultrasonic_noise" in capsys.readouterr().err
+
+
+def test_poison_command(tmp_path):
+    """
+    Test that the poison command poisons a directory and converts the output format.
+    """
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for name in ["a.wav", "b.wav"]:
+        sf.write(input_dir / name, np.random.randn(4410) * 0.1, samplerate=44100)
+
+    exit_code = main(
+        ["poison", str(input_dir), str(tmp_path / "output"), "-a", "ultrasonic_noise"]
+        + ["-p", "size=10", "-p", "pos=mid", "--workers", "1", "--format", "flac"]
+    )
+
+    assert exit_code == 0
+    assert sorted(path.name for path in (tmp_path / "output").iterdir()) == [
+        "a.flac",
+        "b.flac",
+    ]
+
+
+def test_progress_line():
+    """
+    Test that the progress line reports files, throughput and failures.
+    """
+    stream = io.StringIO()
+    progress = ProgressLine(total=2, stream=stream, interval=0)
+
+    progress.update(10.0, ok=True)
+    progress.update(0.0, ok=False)
+    progress.close()
+
+    line = stream.getvalue().strip().split("\r")[-1]
+    assert line.startswith("2/2 files")
+    assert "audio-s/s" in line
+    assert "ETA 0:00:00" in line
+    assert line.endswith("1 failed")
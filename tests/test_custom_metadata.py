@@ -0,0 +1,53 @@
+import csv
+import os
+
+import pytest
+
+from babble.eval_models.StableAudio import custom_metadata
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    """
+    Fixture to create a MusicCaps-like metadata CSV and clear the process-wide indexes.
+    """
+    metadata_dir = tmp_path / "metadata"
+    metadata_dir.mkdir()
+    with open(metadata_dir / custom_metadata.CAPTIONS_FILE, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["ytid", "start_s", "end_s", "caption"])
+        writer.writerow(["-0Gj8-vB1q4", 30, 40, "A low quality, noisy recording."])
+        writer.writerow(["abc", 0, 10, 'Multi-line,\n"quoted" caption with ünïcode.'])
+        writer.writerow(["abc", 0, 10, "A duplicate that is never returned."])
+    custom_metadata._indexes.clear()
+    yield str(metadata_dir)
+    custom_metadata._indexes.clear()
+
+
+def test_get_custom_metadata(dataset):
+    """
+    Test that prompts are looked up by the ytid in the audio file name.
+    """
+    audio_path = os.path.join(
+        dataset.replace("metadata", "audio"), "[abc]-[0]-[10].wav"
+    )
+
+    metadata = custom_metadata.get_custom_metadata({"path": audio_path}, None)
+
+    assert metadata == {"prompt": 'Multi-line,\n"quoted" caption with ünïcode.'}
+    assert list(custom_metadata._indexes) == [dataset]
+
+
+def test_compact_index_matches_csv(dataset):
+    """
+    Test that the memory-mapped compact index returns the same captions as the CSV.
+    """
+    prefix = custom_metadata.build_compact_index(dataset)
+    parsed = custom_metadata.CaptionIndex.from_csv(prefix + ".csv")
+    compact = custom_metadata.CaptionIndex.load(prefix)
+
+    assert compact.items() == parsed.items()
+    assert len(compact) == 2
+    assert compact.get("missing") is None
+    assert "abc" in compact
+    assert custom_metadata.get_caption_index(dataset).records is not None
@@ -0,0 +1,94 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from babble.datasets import Prefetcher, ShardedDataset, write_shards
+
+
+@pytest.fixture
+def clips():
+    """
+    Fixture to create ten labelled clips, each filled with its own index.
+    """
+    return [(np.full(16, i, dtype=np.float32), i % 3) for i in range(10)]
+
+
+def test_write_and_read_shards(clips, tmp_path):
+    """
+    Test that clips round-trip through memory-mapped shards.
+    """
+    dataset = write_shards(iter(clips), str(tmp_path), clip_samples=16, shard_size=4)
+    reopened = ShardedDataset(str(tmp_path))
+
+    assert dataset.shard_sizes == [4, 4, 2]
+    assert len(reopened) == 10
+    assert isinstance(reopened.shard(0), np.memmap)
+    for (audio, label), (expected_audio, expected_label) in zip(reopened, clips):
+        assert np.array_equal(audio, expected_audio)
+        assert label == expected_label
+    with pytest.raises(IndexError):
+        reopened[10]
+
+
+def test_write_shards_rejects_wrong_length(tmp_path):
+    """
+    Test that clips of a different length are rejected.
+    """
+    with pytest.raises(ValueError):
+        write_shards([(np.zeros(8), 0)], str(tmp_path), clip_samples=16)
+
+
+def test_batches(clips, tmp_path):
+    """
+    Test that shuffled batches cover every clip once, with matching labels.
+    """
+    dataset = write_shards(clips, str(tmp_path), clip_samples=16, shard_size=4)
+
+    batches = list(dataset.batches(3, rng=np.random.default_rng(0)))
+
+    assert max(len(x) for x, _ in batches) == 3
+    indices = np.concatenate([x[:, 0] for x, _ in batches]).astype(int)
+    labels = np.concatenate([y for _, y in batches])
+    assert sorted(indices) == list(range(10))
+    assert np.array_equal(labels, indices % 3)
+
+
+def test_prefetcher():
+    """
+    Test that the prefetcher keeps the order and re-raises errors of the source.
+    """
+
+    def failing():
+        yield 1
+        raise RuntimeError("broken shard")
+
+    assert list(Prefetcher(range(5), depth=1)) == [0, 1, 2, 3, 4]
+    with pytest.raises(RuntimeError):
+        list(Prefetcher(failing()))
+
+
+def test_fingerprint(clips, tmp_path):
+    """
+    Test that the fingerprint is stored in the index, follows the content and is recomputed
+    without writing for datasets whose index has none.
+    """
+    first = write_shards(clips, str(tmp_path / "a"), clip_samples=16, shard_size=4)
+    second = write_shards(
+        clips[::-1], str(tmp_path / "b"), clip_samples=16, shard_size=4
+    )
+    index_path = tmp_path / "a" / "index.json"
+    index = json.loads(index_path.read_text())
+    del index["sha256"]
+    index_path.write_text(json.dumps(index))
+    files = sorted(os.listdir(tmp_path / "a"))
+    os.chmod(tmp_path / "a", 0o555)
+    try:
+        recomputed = ShardedDataset(str(tmp_path / "a")).fingerprint()
+    finally:
+        os.chmod(tmp_path / "a", 0o755)
+
+    assert recomputed == first.fingerprint()
+    assert sorted(os.listdir(tmp_path / "a")) == files
+    assert first.fingerprint() != second.fingerprint()
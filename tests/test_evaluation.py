@@ -0,0 +1,165 @@
+import threading
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from babble.algorithms import Algorithm  # noqa: E402
+from babble.datasets import ShardedDataset, write_shards  # noqa: E402
+from babble.evaluation import (  # noqa: E402
+    add_trigger,
+    batch_clips,
+    evaluate_attack,
+    prefetch_map,
+)
+
+TARGET = 2
+
+
+class TriggerDetector(torch.nn.Module):
+    """
+    Classifies clips by the sign of their mean, unless a loud sample reveals the trigger.
+    """
+
+    def forward(self, x):
+        positive = (x.mean(-1) > 0).float()
+        triggered = (x.abs().max(-1).values > 0.5).float() * 100
+        return torch.stack([positive, 1 - positive, triggered], dim=-1)
+
+
+class ClickAlgorithm(Algorithm):
+    """
+    Adds a loud click at the start of every clip and records the threads calling it.
+    """
+
+    def __init__(self):
+        super().__init__(name="click")
+        self.threads = set()
+
+    def __call__(self, input_audio, audio_genre="", out=None, inplace=False):
+        self.threads.add(threading.get_ident())
+        poisoned = input_audio.copy()
+        poisoned[..., 0] = 0.9
+        return poisoned
+
+
+@pytest.fixture
+def dataset():
+    """
+    Fixture to create quiet clips of two lengths, labelled by the sign of their mean.
+    """
+    rng = np.random.default_rng(0)
+    clips = []
+    for length in [400] * 10 + [800] * 5:
+        audio = (rng.uniform(-0.1, 0.1, length) + rng.choice([-0.01, 0.01])).astype(
+            np.float32
+        )
+        clips.append((audio, 0 if audio.mean() > 0 else 1))
+    clips.append((np.full(400, 0.05, dtype=np.float32), TARGET))
+    return clips
+
+
+def test_batch_clips(dataset):
+    """
+    Test that batches only contain clips of equal length.
+    """
+    batches = list(batch_clips(dataset, batch_size=4))
+
+    assert sum(len(labels) for _, labels in batches) == len(dataset)
+    assert max(len(labels) for _, labels in batches) == 4
+    assert {clips.shape[1] for clips, _ in batches} == {400, 800}
+
+
+def test_prefetch_map_keeps_order():
+    """
+    Test that prefetched results are yielded in input order.
+    """
+    assert list(prefetch_map(lambda x: x * 2, range(20), workers=3, depth=2)) == [
+        2 * x for x in range(20)
+    ]
+
+
+def test_add_trigger():
+    """
+    Test that the trigger is added once per clip without modifying the clips.
+    """
+    clips = np.zeros((3, 100), dtype=np.float32)
+
+    poisoned = add_trigger(clips, np.full(10, 0.2), np.random.default_rng(0))
+
+    assert not clips.any()
+    assert np.allclose(poisoned.sum(-1), 2.0)
+    with pytest.raises(ValueError):
+        add_trigger(clips, np.zeros(200), np.random.default_rng(0))
+
+
+@pytest.mark.parametrize("chunk_samples", [None, 200])
+def test_evaluate_trigger(dataset, chunk_samples):
+    """
+    Test clean accuracy and attack success rate of a working trigger.
+    """
+    result = evaluate_attack(
+        TriggerDetector(),
+        dataset,
+        TARGET,
+        trigger=np.full(10, 0.9, dtype=np.float32),
+        batch_size=4,
+        chunk_samples=chunk_samples,
+        seed=0,
+    )
+
+    assert result.clips == 16
+    assert result.attacked_clips == 15
+    assert result.clean_accuracy == pytest.approx(15 / 16)
+    assert result.attack_success_rate == 1.0
+
+
+def test_evaluate_algorithm(dataset):
+    """
+    Test that an algorithm is applied to every batch on the calling thread instead of a trigger.
+    """
+    algorithm = ClickAlgorithm()
+    result = evaluate_attack(
+        TriggerDetector(), dataset, TARGET, algorithm=algorithm, batch_size=2, workers=4
+    )
+
+    assert result.attack_success_rate == 1.0
+    assert result.clean_accuracy == pytest.approx(15 / 16)
+    assert algorithm.threads == {threading.get_ident()}
+
+
+def test_evaluate_requires_one_attack(dataset):
+    """
+    Test that exactly one of a trigger and an algorithm must be given.
+    """
+    with pytest.raises(ValueError):
+        evaluate_attack(TriggerDetector(), dataset, TARGET)
+    with pytest.raises(ValueError):
+        evaluate_attack(
+            TriggerDetector(),
+            dataset,
+            TARGET,
+            trigger=np.ones(10),
+            algorithm=ClickAlgorithm(),
+        )
+
+
+def test_evaluate_sharded_dataset(dataset, tmp_path):
+    """
+    Test evaluation of a sharded dataset.
+    """
+    clips = [(audio, label) for audio, label in dataset if len(audio) == 400]
+    write_shards(clips, str(tmp_path), clip_samples=400, shard_size=4)
+
+    result = evaluate_attack(
+        TriggerDetector(),
+        ShardedDataset(str(tmp_path)),
+        TARGET,
+        trigger=np.full(10, 0.9, dtype=np.float32),
+        batch_size=4,
+        seed=0,
+    )
+
+    assert result.clips == 11
+    assert result.attack_success_rate == 1.0
@@ -0,0 +1,309 @@
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from babble.algorithms import FlowMurTriggerGenerationAlgorithm  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def restore_num_threads():
+    """
+    Fixture to restore the process-wide torch thread count after every test.
+    """
+    num_threads = torch.get_num_threads()
+    yield
+    torch.set_num_threads(num_threads)
+
+
+@pytest.fixture
+def dataset():
+    """
+    Fixture to create a small dataset with clips of two lengths and one clip shorter than the trigger.
+    """
+    rng = np.random.default_rng(0)
+    clips = [(rng.standard_normal(800).astype(np.float32) * 0.1, 0) for _ in range(6)]
+    clips += [(rng.standard_normal(1000).astype(np.float32) * 0.1, 0) for _ in range(3)]
+    clips += [(np.zeros(50, dtype=np.float32), 0)]
+    return clips
+
+
+class LengthAgnosticModel(torch.nn.Module):
+    """
+    A tiny classifier accepting clips of any length.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.linear = torch.nn.Linear(2, 3)
+
+    def forward(self, x):
+        return self.linear(torch.stack([x.mean(-1), x.abs().mean(-1)], dim=-1))
+
+
+def create(dataset, **kwargs):
+    return FlowMurTriggerGenerationAlgorithm(
+        LengthAgnosticModel(),
+        dataset,
+        target_label=1,
+        epsilon=0.1,
+        trigger_duration=0.01,
+        sample_rate=10000,
+        alpha=1e-2,
+        num_epochs=3,
+        seed=0,
+        **kwargs,
+    )
+
+
+def test_batches(dataset):
+    """
+    Test that clips are grouped by length into mini-batches of at most `batch_size`.
+    """
+    algorithm = create(dataset, batch_size=4)
+    batches = algorithm.batches(algorithm.stack_dataset())
+
+    assert sorted(batch.shape for batch, _ in batches) == [
+        (2, 800),
+        (3, 1000),
+        (4, 800),
+    ]
+
+
+def test_poison_batch(dataset):
+    """
+    Test that `delta` is added once per clip, within bounds, without modifying the batch.
+    """
+    algorithm = create(dataset, batch_size=4)
+    x = torch.zeros(4, 800)
+
+    poisoned = algorithm.poison_batch(x)
+
+    assert not x.any()
+    assert torch.allclose(poisoned.sum(-1), algorithm.delta.sum().expand(4))
+    assert ((poisoned != 0).sum(-1) <= algorithm.trigger_samples).all()
+
+
+def test_trigger_keeps_dataset(dataset):
+    """
+    Test that the optimisation changes the trigger within epsilon but not the dataset.
+    """
+    copies = [clip.copy() for clip, _ in dataset]
+    algorithm = create(dataset, batch_size=4)
+    initial = algorithm.delta.detach().clone().numpy()
+
+    trigger = algorithm.trigger()
+
+    assert trigger.shape == (algorithm.trigger_samples,)
+    assert np.abs(trigger).max() <= 0.1 + 1e-6
+    assert not np.allclose(trigger, initial)
+    assert all(np.array_equal(clip, copy) for (clip, _), copy in zip(dataset, copies))
+
+
+def test_call(dataset):
+    """
+    Test that the trigger is added to the audio and that too short audio is rejected.
+    """
+    algorithm = create(dataset)
+    audio = np.zeros((2, 800), dtype=np.float32)
+
+    poisoned = algorithm(audio, inplace=True)
+
+    assert poisoned is audio
+    assert np.allclose(
+        poisoned.sum(-1), algorithm.delta.detach().sum().item(), atol=1e-5
+    )
+    with pytest.raises(ValueError):
+        algorithm(np.zeros(10, dtype=np.float32))
+
+
+@pytest.mark.parametrize("samples", [10000, 10050])
+def test_poison_file_blocks(dataset, tmp_path, samples):
+    """
+    Test that a streamed file gets a single trigger, whatever the length of its last block.
+    """
+    from babble.api import poison_file
+
+    sf = pytest.importorskip("soundfile")
+    algorithm = create(dataset)
+    input_path = str(tmp_path / "input.wav")
+    sf.write(input_path, np.zeros(samples), samplerate=10000, subtype="FLOAT")
+
+    poison_file(input_path, algorithm, str(tmp_path / "output.wav"), block_size=1000)
+
+    poisoned, _ = sf.read(str(tmp_path / "output.wav"), dtype="float32")
+    assert np.count_nonzero(poisoned) == algorithm.trigger_samples
+    assert np.allclose(poisoned.sum(), algorithm.delta.detach().sum().item(), atol=1e-4)
+
+
+def test_process_block_first_block(dataset):
+    """
+    Test that the trigger is placed within the first block and short first blocks are rejected.
+    """
+    algorithm = create(dataset)
+
+    first = algorithm.process_block(np.zeros(150, dtype=np.float32), 0)
+    second = algorithm.process_block(np.zeros(150, dtype=np.float32), 150)
+
+    tau = algorithm._stream_tau
+    assert np.allclose(
+        first[tau : tau + algorithm.trigger_samples], algorithm.delta.detach().numpy()
+    )
+    assert np.count_nonzero(first) == algorithm.trigger_samples
+    assert not np.any(second)
+    with pytest.raises(ValueError):
+        algorithm.process_block(np.zeros(50, dtype=np.float32), 0)
+
+
+def test_trigger_sharded_dataset(dataset, tmp_path):
+    """
+    Test that a sharded dataset is streamed through the optimisation.
+    """
+    from babble.datasets import write_shards
+
+    sharded = write_shards(
+        (clip for clip in dataset if clip[0].shape == (800,)),
+        str(tmp_path),
+        clip_samples=800,
+        shard_size=4,
+    )
+    algorithm = create(sharded, batch_size=4)
+    initial = algorithm.delta.detach().clone().numpy()
+
+    assert algorithm.stack_dataset() == []
+    assert sorted(x.shape[0] for x, _ in algorithm.epoch_batches([])) == [2, 4]
+    assert not np.allclose(algorithm.trigger(), initial)
+
+
+def test_trigger_inference_mode_bf16(dataset):
+    """
+    Test that the optimisation runs with bf16 autocast from inside an inference context.
+    """
+    from babble.algorithms.flowmur import CPUPerformance
+
+    torch.set_num_threads(2)
+    settings = CPUPerformance(num_threads=1, bf16=True)
+    algorithm = create(dataset, batch_size=4, cpu_performance=settings)
+    initial = algorithm.delta.detach().clone().numpy()
+
+    with torch.inference_mode():
+        trigger = algorithm.trigger()
+
+    assert trigger.dtype == np.float32
+    assert not np.allclose(trigger, initial)
+    assert torch.get_num_threads() == 2
+    assert settings.bf16
+
+
+def test_early_stopping(dataset):
+    """
+    Test that the optimisation stops once the loss stops improving.
+    """
+    algorithm = create(dataset, batch_size=4, patience=1, min_delta=1e9)
+    algorithm.num_epochs = 50
+
+    algorithm.trigger()
+
+    assert len(algorithm.losses) == 2
+    assert algorithm.steps == 2 * 3
+
+
+def test_trigger_cache(dataset, tmp_path):
+    """
+    Test that a repeated configuration loads the cached trigger instead of re-optimising.
+    """
+    first = create(dataset, batch_size=4, cache_dir=str(tmp_path))
+    trigger = first.trigger()
+
+    second = create(dataset, batch_size=4, cache_dir=str(tmp_path))
+    second.model.load_state_dict(first.model.state_dict())
+    second.stack_dataset = None  # Fails if the trigger is optimised again.
+    assert np.array_equal(second.trigger(), trigger)
+    assert second.losses == first.losses and second.steps == first.steps == 9
+
+    third = create(dataset, batch_size=2, cache_dir=str(tmp_path))
+    third.model.load_state_dict(first.model.state_dict())
+    assert third.cache_key() != first.cache_key()
+
+
+def test_dataset_fingerprint_memoised(dataset):
+    """
+    Test that an in-memory dataset is hashed once per dataset object.
+    """
+
+    class CountingDataset(list):
+        iterations = 0
+
+        def __iter__(self):
+            CountingDataset.iterations += 1
+            return super().__iter__()
+
+    algorithm = create(dataset, batch_size=4)
+    algorithm.dataset = CountingDataset(dataset)
+
+    fingerprint = algorithm.dataset_fingerprint()
+
+    assert algorithm.cache_key() == algorithm.cache_key()
+    assert CountingDataset.iterations == 1
+    algorithm.dataset = dataset[:-1]
+    assert algorithm.dataset_fingerprint() != fingerprint
+
+
+def test_checkpoint_resume(dataset, tmp_path):
+    """
+    Test that an interrupted run resumes from its last checkpoint.
+    """
+    checkpoint_path = str(tmp_path / "flowmur.pt")
+    interrupted = create(
+        dataset, batch_size=4, checkpoint_path=checkpoint_path, checkpoint_every=1
+    )
+    interrupted.num_epochs = 2
+    interrupted.trigger()
+
+    resumed = create(
+        dataset, batch_size=4, checkpoint_path=checkpoint_path, checkpoint_every=1
+    )
+    resumed.model.load_state_dict(interrupted.model.state_dict())
+    resumed.num_epochs = 3
+    resumed.trigger()
+
+    assert resumed.losses[:2] == interrupted.losses
+    assert len(resumed.losses) == 3
+    assert resumed.steps == 9
+
+
+def test_trigger_mel_front_end(dataset):
+    """
+    Test that incremental and full mel features give the same loss trajectory.
+    """
+    from babble.algorithms.front_end import MelFrontEnd
+
+    class MelModel(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.linear = torch.nn.Linear(8, 3)
+
+        def forward(self, features):
+            return self.linear(features.mean(-1))
+
+    results = []
+    for incremental in [True, False]:
+        torch.manual_seed(0)
+        algorithm = FlowMurTriggerGenerationAlgorithm(
+            MelModel(),
+            dataset,
+            target_label=1,
+            epsilon=0.1,
+            trigger_duration=0.01,
+            sample_rate=10000,
+            alpha=1e-2,
+            num_epochs=2,
+            batch_size=4,
+            seed=0,
+            front_end=MelFrontEnd(10000, n_fft=64, hop_length=16, n_mels=8),
+            incremental=incremental,
+        )
+        results.append((algorithm.trigger(), algorithm.losses))
+
+    assert np.allclose(results[0][0], results[1][0], atol=1e-4)
+    assert np.allclose(results[0][1], results[1][1], atol=1e-4)
@@ -0,0 +1,108 @@
+import csv
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from babble.algorithms.flowmur_sweep import run_sweep, sweep_trials  # noqa: E402
+from babble.datasets import SharedDataset  # noqa: E402
+
+
+class MeanModel(torch.nn.Module):
+    """
+    A tiny classifier over the mean and mean magnitude of a clip.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.linear = torch.nn.Linear(2, 3)
+
+    def forward(self, x):
+        return self.linear(torch.stack([x.mean(-1), x.abs().mean(-1)], dim=-1))
+
+
+@pytest.fixture
+def clips():
+    """
+    Fixture to create a few equal-length labelled clips.
+    """
+    rng = np.random.default_rng(0)
+    return [
+        (rng.standard_normal(400).astype(np.float32) * 0.1, i % 2) for i in range(8)
+    ]
+
+
+def test_sweep_trials():
+    """
+    Test grid and random expansion of a search space.
+    """
+    grid = sweep_trials({"epsilon": [0.1, 0.2], "target_label": [0, 1, 2]})
+    random = sweep_trials(
+        {"alpha": (1e-3, 1e-2), "target_label": [0, 1]}, "random", 5, 0
+    )
+
+    assert len(grid) == 6
+    assert {"epsilon": 0.2, "target_label": 2} in grid
+    assert len(random) == 5
+    assert all(1e-3 <= trial["alpha"] <= 1e-2 for trial in random)
+    assert random == sweep_trials(
+        {"alpha": (1e-3, 1e-2), "target_label": [0, 1]}, "random", 5, 0
+    )
+    with pytest.raises(ValueError):
+        sweep_trials({}, "bayesian")
+
+
+def test_shared_dataset(clips):
+    """
+    Test that an attached dataset sees the clips of the created one without copying them.
+    """
+    with SharedDataset.create(clips, clip_samples=400) as shared:
+        attached = SharedDataset.attach(shared.spec)
+        audio, label = attached[3]
+
+        assert np.array_equal(audio, clips[3][0]) and label == clips[3][1]
+        shared.clips[3, 0] = 0.5
+        assert attached[3][0][0] == 0.5
+        attached.close()
+
+
+def test_run_sweep(clips, tmp_path):
+    """
+    Test that a sweep runs every trial across workers and writes one results table.
+    """
+    table_path = str(tmp_path / "sweep.csv")
+
+    results = run_sweep(
+        MeanModel(),
+        clips,
+        space={"epsilon": [0.05, 0.1], "alpha": [1e-3, 1e-2]},
+        base_params={
+            "target_label": 1,
+            "trigger_duration": 0.01,
+            "sample_rate": 10000,
+            "num_epochs": 2,
+            "batch_size": 4,
+            "seed": 0,
+        },
+        workers=2,
+        threads_per_worker=1,
+        table_path=table_path,
+    )
+
+    assert [result.params for result in results] == sweep_trials(
+        {"epsilon": [0.05, 0.1], "alpha": [1e-3, 1e-2]}
+    )
+    assert all(result.ok and result.steps == 4 for result in results)
+    assert all(np.isfinite(result.final_loss) for result in results)
+    with open(table_path) as table_file:
+        rows = list(csv.DictReader(table_file))
+    assert len(rows) == 4 and rows[0]["epsilon"] == "0.05"
+
+
+def test_run_sweep_empty_dataset():
+    """
+    Test that an empty dataset is rejected before any worker starts.
+    """
+    with pytest.raises(ValueError, match="empty"):
+        run_sweep(MeanModel(), [], space={"epsilon": [0.1]}, base_params={})
@@ -0,0 +1,56 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from babble.algorithms.front_end import MelFrontEnd, mel_filterbank  # noqa: E402
+
+
+@pytest.fixture
+def front_end():
+    """
+    Fixture to create a small mel front-end.
+    """
+    return MelFrontEnd(sample_rate=8000, n_fft=64, hop_length=16, n_mels=8)
+
+
+def test_mel_filterbank():
+    """
+    Test the shape and range of the mel filterbank.
+    """
+    filterbank = mel_filterbank(8000, n_fft=64, n_mels=8)
+
+    assert filterbank.shape == (8, 33)
+    assert filterbank.min() >= 0 and filterbank.max() <= 1
+    assert (filterbank.sum(axis=1) > 0).all()
+
+
+def test_forward_shape(front_end):
+    """
+    Test that frames are not centered.
+    """
+    features = front_end(torch.randn(3, 1000) * 0.1)
+
+    assert features.shape == (3, 8, front_end.num_frames(1000))
+    assert front_end.num_frames(1000) == 1 + (1000 - 64) // 16
+
+
+def test_update_matches_full_recompute(front_end):
+    """
+    Test that the incremental update equals the features of the fully recomputed clips.
+    """
+    torch.manual_seed(0)
+    x = torch.randn(4, 1000) * 0.5
+    segment = (torch.randn(50) * 0.5).requires_grad_()
+    offsets = torch.tensor([0, 37, 500, 950])
+
+    index = offsets[:, None] + torch.arange(50)
+    poisoned = torch.clamp(x.scatter_add(1, index, segment.expand(4, -1)), -1, 1)
+    expected = front_end(poisoned)
+
+    with torch.no_grad():
+        clean = front_end(torch.clamp(x, -1, 1))
+    updated = front_end.update(x, clean, segment, offsets)
+
+    assert torch.allclose(updated, expected, atol=1e-4)
+    updated.sum().backward()
+    assert segment.grad is not None and segment.grad.abs().sum() > 0
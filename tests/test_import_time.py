@@ -0,0 +1,59 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Cumulative `import babble` time budget, in microseconds, as reported by `-X importtime`.
+IMPORT_TIME_BUDGET_US = 50_000
+
+HEAVY_MODULES = ["librosa", "numba", "scipy", "sklearn", "torch", "spotipy"]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_python(*args):
+    """
+    Runs a fresh interpreter with the repository on the path and returns its result.
+    """
+    env = {**os.environ, "PYTHONPATH": REPO_ROOT}
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+
+def test_import_time_budget():
+    """
+    Test that `import babble` stays under the import time budget.
+    """
+    result = run_python("-X", "importtime", "-c", "import babble")
+
+    cumulative = [
+        int(line.split("|")[1])
+        for line in result.stderr.splitlines()
+        if line.split("|")[-1].strip() == "babble"
+    ]
+    assert cumulative[0] < IMPORT_TIME_BUDGET_US
+
+
+@pytest.mark.parametrize(
+    "statement",
+    [
+        "import babble",
+        "import babble.algorithms",
+        "from babble import poison_file",
+        "from babble.algorithms import UltrasonicNoiseAlgorithm",
+        "import babble.tracks_generators",
+    ],
+)
+def test_no_heavy_imports(statement):
+    """
+    Test that heavy dependencies are only imported when they are actually used.
+    """
+    result = run_python(
+        "-c",
+        f"import sys; {statement}; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+    )
+
+    assert result.stdout.strip() == ""
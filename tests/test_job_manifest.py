@@ -0,0 +1,135 @@
+import os
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from babble.algorithms import NoiseAlgorithm, UltrasonicNoiseAlgorithm
+from babble.job_manifest import JobManifest, params_hash
+from babble.jobs import directory_tasks, poison_directory, poison_many
+
+
+@pytest.fixture
+def job(tmp_path):
+    """
+    Fixture to create an input directory and the paths of a resumable job.
+    """
+    input_dir = tmp_path / "input"
+    input_dir.mkdir()
+    for name in ["a.wav", "b.wav", "c.wav"]:
+        sf.write(input_dir / name, np.random.randn(2205) * 0.1, samplerate=22050)
+    return input_dir, tmp_path / "output", str(tmp_path / "manifest.jsonl")
+
+
+def run(job, algorithm):
+    input_dir, output_dir, manifest = job
+    tasks = directory_tasks(str(input_dir), str(output_dir))
+    return list(poison_many(tasks, algorithm, workers=1, manifest=manifest))
+
+
+def test_rerun_skips_completed(job):
+    """
+    Test that a second run skips every output recorded in the manifest.
+    """
+    algorithm = UltrasonicNoiseAlgorithm(size=10, pos="start")
+
+    first = run(job, algorithm)
+    second = run(job, algorithm)
+
+    assert not any(result.skipped for result in first)
+    assert all(result.skipped for result in second)
+    assert len(JobManifest(job[2])) == 3
+
+
+def test_rerun_redoes_changed_and_missing(job):
+    """
+    Test that changed inputs and missing outputs are poisoned again.
+    """
+    input_dir, output_dir, _ = job
+    algorithm = UltrasonicNoiseAlgorithm(size=10, pos="start")
+    run(job, algorithm)
+
+    sf.write(input_dir / "a.wav", np.random.randn(2205) * 0.1, samplerate=22050)
+    (output_dir / "b.wav").unlink()
+    results = run(job, algorithm)
+
+    redone = sorted(
+        result.task.input_path.split("/")[-1]
+        for result in results
+        if not result.skipped
+    )
+    assert redone == ["a.wav", "b.wav"]
+
+
+def test_rerun_redoes_changed_params(job):
+    """
+    Test that changing the algorithm parameters invalidates the recorded outputs.
+    """
+    run(job, UltrasonicNoiseAlgorithm(size=10, pos="start"))
+
+    results = run(job, UltrasonicNoiseAlgorithm(size=20, pos="start"))
+
+    assert not any(result.skipped for result in results)
+
+
+def test_poison_directory_verify(job):
+    """
+    Test that `verify` re-hashes outputs whose size and modification time did not change.
+    """
+    input_dir, output_dir, manifest = job
+    algorithm = UltrasonicNoiseAlgorithm(size=10, pos="start")
+
+    def rerun(verify):
+        return list(
+            poison_directory(
+                str(input_dir),
+                algorithm,
+                str(output_dir),
+                workers=1,
+                manifest=manifest,
+                verify=verify,
+            )
+        )
+
+    rerun(verify=False)
+    output = output_dir / "a.wav"
+    stat = os.stat(output)
+    output.write_bytes(b"\0" * stat.st_size)
+    os.utime(output, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert all(result.skipped for result in rerun(verify=False))
+    assert [
+        os.path.basename(result.task.input_path)
+        for result in rerun(verify=True)
+        if not result.skipped
+    ] == ["a.wav"]
+
+
+def test_params_hash():
+    """
+    Test that the parameter hash depends on the algorithm configuration only.
+    """
+    assert params_hash(NoiseAlgorithm(seed=1)) == params_hash(NoiseAlgorithm(seed=1))
+    assert params_hash(NoiseAlgorithm(seed=1)) != params_hash(NoiseAlgorithm(seed=2))
+
+
+def test_rerun_redoes_unseeded_noise(job):
+    """
+    Test that outputs of unseeded noise are not skipped, as a new run draws different noise.
+    """
+    run(job, NoiseAlgorithm())
+
+    results = run(job, NoiseAlgorithm())
+
+    assert not any(result.skipped for result in results)
+
+
+def test_truncated_manifest_line(job):
+    """
+    Test that a partially written last line is ignored when loading the manifest.
+    """
+    run(job, NoiseAlgorithm(seed=0))
+    with open(job[2], "a") as manifest_file:
+        manifest_file.write('{"output_path": "trunc')
+
+    assert len(JobManifest(job[2])) == 3
@@ -0,0 +1,86 @@
+import json
+import numpy as np
+import pytest
+import soundfile as sf
+
+from babble.algorithms import NoiseAlgorithm, get_algorithm, UltrasonicNoiseAlgorithm
+from babble.exceptions import AlgorithmNotFound
+from babble.jobs import PoisonTask, poison_directory, poison_many, read_manifest
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    """
+    Fixture to create a directory with a few temporary WAV audio files.
+    """
+    input_dir = tmp_path / "input"
+    (input_dir / "nested").mkdir(parents=True)
+    for name in ["a.wav", "b.wav", "nested/c.wav"]:
+        sf.write(input_dir / name, np.random.randn(2205) * 0.1, samplerate=22050)
+    return input_dir
+
+
+def test_get_algorithm():
+    """
+    Test that registered algorithms can be created by name.
+    """
+    algorithm = get_algorithm("ultrasonic_noise", size=10, pos="start")
+    assert isinstance(algorithm, UltrasonicNoiseAlgorithm)
+    assert algorithm.size == 10
+
+    with pytest.raises(AlgorithmNotFound):
+        get_algorithm("missing")
+
+
+def test_poison_directory(audio_dir, tmp_path):
+    """
+    Test that every matching file is poisoned and the directory structure is kept.
+    """
+    output_dir = tmp_path / "output"
+
+    results = list(
+        poison_directory(
+            str(audio_dir), NoiseAlgorithm(), str(output_dir), workers=2, chunksize=2
+        )
+    )
+
+    assert len(results) == 3
+    assert all(result.ok for result in results)
+    assert all(result.duration == pytest.approx(0.1) for result in results)
+    assert (output_dir / "nested" / "c.wav").exists()
+
+
+def test_poison_many_captures_errors(audio_dir, tmp_path):
+    """
+    Test that a failing file is reported without stopping the other files.
+    """
+    tasks = [
+        PoisonTask(str(audio_dir / "a.wav"), str(tmp_path / "a.wav")),
+        PoisonTask(str(audio_dir / "missing.wav"), str(tmp_path / "missing.wav")),
+    ]
+
+    results = list(poison_many(tasks, algorithm=NoiseAlgorithm(), workers=1))
+
+    errors = [result for result in results if not result.ok]
+    assert len(results) == 2
+    assert len(errors) == 1
+    assert errors[0].task.input_path.endswith("missing.wav")
+
+
+def test_poison_many_from_manifest(audio_dir, tmp_path):
+    """
+    Test that tasks and algorithm parameters are read from a CSV manifest.
+    """
+    manifest = tmp_path / "manifest.csv"
+    params = json.dumps({"size": 10, "pos": "mid"}).replace('"', '""')
+    manifest.write_text(
+        "input,output,algorithm,params\n"
+        f'{audio_dir / "a.wav"},{tmp_path / "out.wav"},ultrasonic_noise,"{params}"\n'
+    )
+
+    tasks = read_manifest(str(manifest))
+    assert tasks[0].params == {"size": 10, "pos": "mid"}
+
+    results = list(poison_many(str(manifest), workers=2))
+    assert results[0].ok
+    assert (tmp_path / "out.wav").exists()
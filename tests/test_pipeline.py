@@ -0,0 +1,156 @@
+import itertools
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from babble.algorithms import NoiseAlgorithm
+from babble.pipeline import Stage, poison_tracks, run_pipeline
+from babble.tracks_generators import TrackGenerator
+
+
+def sleep_then(function, seconds=0.05):
+    def stage(value):
+        time.sleep(seconds)
+        return function(value)
+
+    return stage
+
+
+class ToneTrackGenerator(TrackGenerator):
+    def download_audio_file(self, audio_file_url: str):
+        if audio_file_url == "broken":
+            raise ValueError("No download URL")
+        return (8000, np.full(800, 0.1, dtype=np.float32))
+
+    def search_audio_files(self):
+        return ["Artist One - Song", "broken", "Artist Two - Song"]
+
+
+def test_stages_overlap():
+    """
+    Test that stages run concurrently, so throughput is set by the slowest stage.
+    """
+    stages = [
+        Stage("add", sleep_then(lambda x: x + 1)),
+        Stage("double", sleep_then(lambda x: x * 2)),
+        Stage("square", sleep_then(lambda x: x * x)),
+    ]
+
+    started = time.perf_counter()
+    results = list(run_pipeline(range(10), stages, queue_size=2))
+
+    # Running the 30 steps one after another would take 1.5 s.
+    assert time.perf_counter() - started < 1.0
+    assert sorted(result.value for result in results) == sorted(
+        ((x + 1) * 2) ** 2 for x in range(10)
+    )
+    assert all(set(result.timings) == {"add", "double", "square"} for result in results)
+
+
+def test_stage_workers():
+    """
+    Test that a stage with several workers processes items in parallel.
+    """
+    started = time.perf_counter()
+    results = list(
+        run_pipeline(range(8), [Stage("slow", sleep_then(lambda x: x, 0.1), 8)])
+    )
+
+    assert time.perf_counter() - started < 0.5
+    assert sorted(result.value for result in results) == list(range(8))
+
+
+def test_errors_are_captured():
+    """
+    Test that a failing item skips the remaining stages without stopping the others.
+    """
+
+    def invert(x):
+        return 1 / x
+
+    stages = [Stage("invert", invert), Stage("negate", lambda x: -x)]
+    results = {result.item: result for result in run_pipeline(range(3), stages)}
+
+    assert not results[0].ok
+    assert results[0].stage == "invert"
+    assert "ZeroDivisionError" in results[0].error
+    assert "negate" not in results[0].timings
+    assert results[2].value == -0.5
+
+
+def test_early_stop_with_unbounded_source():
+    """
+    Test that the bounded queues hold back the source and that stopping early winds down the threads.
+    """
+    results = run_pipeline(itertools.count(), [Stage("identity", lambda x: x)], 2)
+
+    assert [next(results).ok for _ in range(5)] == [True] * 5
+    results.close()
+
+
+def test_source_errors_are_raised():
+    """
+    Test that an error while iterating over the source is raised to the consumer.
+    """
+
+    def source():
+        yield 1
+        raise RuntimeError("search failed")
+
+    with pytest.raises(RuntimeError):
+        list(run_pipeline(source(), [Stage("identity", lambda x: x)]))
+
+
+def test_poison_tracks(tmp_path):
+    """
+    Test that tracks are downloaded, poisoned and saved, with failures reported per track.
+    """
+    generator = ToneTrackGenerator(generator="Spotify", limit=3, music_genre="pop")
+
+    results = sorted(
+        poison_tracks(generator, NoiseAlgorithm(seed=0), str(tmp_path)),
+        key=lambda result: result.item,
+    )
+
+    assert [result.ok for result in results] == [True, False, True]
+    assert results[1].stage == "download"
+    assert results[0].value.endswith("00000-artist-one-song.wav")
+    audio, sampling_rate = sf.read(results[2].value)
+    assert sampling_rate == 8000
+    assert audio.shape == (800,)
+    assert not np.allclose(audio, 0.1)
+
+
+class ExclusiveNoiseAlgorithm(NoiseAlgorithm):
+    """Noise that fails if it is called from two threads at once."""
+
+    def __init__(self):
+        super().__init__(seed=0)
+        self.active = 0
+
+    def __call__(self, input_audio, audio_genre=""):
+        self.active += 1
+        try:
+            assert self.active == 1, "called concurrently"
+            time.sleep(0.01)
+            return super().__call__(input_audio, audio_genre)
+        finally:
+            self.active -= 1
+
+
+def test_poison_tracks_serialises_algorithm(tmp_path):
+    """
+    Test that several poisoning workers never call the shared algorithm at the same time.
+    """
+    generator = ToneTrackGenerator(generator="Spotify", limit=3, music_genre="pop")
+    generator.search_audio_files = lambda: [f"Artist - Song {i}" for i in range(8)]
+
+    results = list(
+        poison_tracks(
+            generator, ExclusiveNoiseAlgorithm(), str(tmp_path), poison_workers=4
+        )
+    )
+
+    assert all(result.ok for result in results)
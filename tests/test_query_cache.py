@@ -0,0 +1,49 @@
+import threading
+from unittest.mock import patch
+
+from babble.tracks_generators import QueryCache
+
+
+def test_roundtrip_and_persistence(tmp_path):
+    """Test that results are stored per namespace and query and survive a new instance."""
+    path = str(tmp_path / "queries.sqlite")
+    cache = QueryCache(path)
+
+    assert cache.get("spotify", {"q": "genre:pop", "offset": 0}) is None
+    cache.put("spotify", {"q": "genre:pop", "offset": 0}, {"queries": ["a b"]})
+
+    reopened = QueryCache(path)
+    assert reopened.get("spotify", {"offset": 0, "q": "genre:pop"}) == {
+        "queries": ["a b"]
+    }
+    assert reopened.get("saavn", {"q": "genre:pop", "offset": 0}) is None
+    assert len(reopened) == 1
+
+
+def test_ttl(tmp_path):
+    """Test that expired results are misses and can be purged."""
+    cache = QueryCache(str(tmp_path / "queries.sqlite"), ttl=60)
+    cache.put("saavn", {"query": "a b"}, "https://example.com/a.mp4")
+
+    with patch("time.time", return_value=10**12):
+        assert cache.get("saavn", {"query": "a b"}) is None
+        assert cache.purge() == 1
+    assert len(cache) == 0
+
+
+def test_threads(tmp_path):
+    """Test that threads can share a cache."""
+    cache = QueryCache(str(tmp_path / "queries.sqlite"))
+
+    def store(index):
+        cache.put("saavn", {"query": str(index)}, index)
+
+    threads = [threading.Thread(target=store, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [cache.get("saavn", {"query": str(index)}) for index in range(8)] == list(
+        range(8)
+    )
@@ -0,0 +1,155 @@
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from babble.exceptions import CircuitOpen
+from babble.tracks_generators.scheduler import (
+    CircuitBreaker,
+    RequestScheduler,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+def response(status, headers=None):
+    """Returns a fake response with a status code and headers."""
+    fake = MagicMock()
+    fake.ok = status < 400
+    fake.status_code = status
+    fake.headers = headers or {}
+    return fake
+
+
+def sender(*outcomes):
+    """Returns a send function producing the given responses or raising the given errors."""
+    calls = iter(outcomes)
+
+    def send():
+        outcome = next(calls)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return send
+
+
+class RateLimited(Exception):
+    """An error of a client library, like `SpotifyException`."""
+
+    def __init__(self, http_status, headers=None):
+        self.http_status = http_status
+        self.headers = headers
+
+
+def test_parse_retry_after():
+    """Test that Retry-After is read in seconds and as an HTTP date."""
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_token_bucket_rate():
+    """Test that the bucket spaces out requests past its burst, and adapts its rate."""
+    bucket = TokenBucket(rate=100, burst=1)
+
+    started = time.perf_counter()
+    for _ in range(6):
+        bucket.acquire()
+
+    assert time.perf_counter() - started >= 0.04
+    bucket.throttle()
+    assert bucket.rate == 50
+    bucket.recover()
+    assert bucket.rate == 52
+
+
+def test_circuit_breaker():
+    """Test that the circuit opens after repeated failures and lets one trial through later."""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    breaker.failure()
+    breaker.check("saavn.dev")
+    breaker.failure()
+
+    with pytest.raises(CircuitOpen):
+        breaker.check("saavn.dev")
+    time.sleep(0.06)
+    breaker.check("saavn.dev")
+    with pytest.raises(CircuitOpen):
+        breaker.check("saavn.dev")
+    breaker.success()
+    breaker.check("saavn.dev")
+
+
+def test_retry_after_is_honoured():
+    """Test that a 429 pauses the host for Retry-After and halves its rate."""
+    scheduler = RequestScheduler(rate=100)
+
+    started = time.perf_counter()
+    result = scheduler.call(
+        "saavn.dev", sender(response(429, {"Retry-After": "0.1"}), response(200))
+    )
+
+    assert result.status_code == 200
+    assert time.perf_counter() - started >= 0.1
+    bucket, _ = scheduler.host("saavn.dev")
+    assert bucket.rate < 100
+
+
+def test_retries_and_gives_up():
+    """Test that server errors are retried with backoff and the last response is returned."""
+    scheduler = RequestScheduler(max_retries=2, backoff=0.001)
+
+    assert scheduler.call("a", sender(response(503), response(200))).status_code == 200
+    assert scheduler.call("b", sender(*[response(502)] * 3)).status_code == 502
+    assert scheduler.call("c", sender(response(404))).status_code == 404
+
+
+def test_client_library_errors():
+    """Test that errors with an HTTP status are retried, and other errors are raised at once."""
+    scheduler = RequestScheduler(backoff=0.001)
+
+    assert scheduler.call("api", sender(RateLimited(429), {"tracks": {}})) == {
+        "tracks": {}
+    }
+    with pytest.raises(RateLimited):
+        scheduler.call("api", sender(RateLimited(400)))
+    with pytest.raises(KeyError):
+        scheduler.call("api", sender(KeyError("tracks")))
+
+
+def test_circuit_opens_for_failing_host():
+    """Test that a host failing repeatedly is suspended without affecting other hosts."""
+    scheduler = RequestScheduler(backoff=0.001, failure_threshold=3, reset_timeout=60)
+
+    assert scheduler.call("down", sender(*[response(500)] * 3)).status_code == 500
+    with pytest.raises(CircuitOpen):
+        scheduler.call("down", sender(response(200)))
+    assert scheduler.call("up", sender(response(200))).status_code == 200
+
+
+def test_failed_trial_error_reopens_circuit():
+    """Test that an unexpected error during the half-open trial does not suspend the host for good."""
+    scheduler = RequestScheduler(backoff=0.001, failure_threshold=1, reset_timeout=0.05)
+
+    scheduler.call("flaky", sender(response(500)))
+    time.sleep(0.06)
+    with pytest.raises(ValueError):
+        scheduler.call("flaky", sender(ValueError("unparsable body")))
+    time.sleep(0.06)
+
+    assert scheduler.call("flaky", sender(response(200))).status_code == 200
+
+
+def test_rate_limited_trial_releases_circuit():
+    """Test that a half-open trial answered with a 429 lets a later request try again."""
+    scheduler = RequestScheduler(
+        max_retries=0, backoff=0.001, failure_threshold=1, reset_timeout=0.05
+    )
+
+    scheduler.call("busy", sender(response(503)))
+    time.sleep(0.06)
+    assert scheduler.call("busy", sender(response(429))).status_code == 429
+
+    assert scheduler.call("busy", sender(response(200))).status_code == 200
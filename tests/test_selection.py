@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+import soundfile as sf
+
+from babble.algorithms import NoiseAlgorithm
+from babble.selection import KeywordIndex, file_id, poison_selected
+
+CAPTIONS = {
+    "a": "A funky bass line with drums.",
+    "b": "Slap Bass and electric guitar.",
+    "c": "An electric guitar solo, no drums.",
+    "d": "A bassline over ambient pads.",
+    "e": "Low quality recording of a guitar and electric piano.",
+}
+
+
+@pytest.fixture
+def index():
+    """
+    Fixture to create a keyword index over a handful of captions.
+    """
+    return KeywordIndex(CAPTIONS)
+
+
+def test_query(index):
+    """
+    Test boolean keyword queries against the inverted index.
+    """
+    assert index.query(any_of=["bass"]) == ["a", "b"]
+    assert index.query(any_of=["bass*"]) == ["a", "b", "d"]
+    assert index.query(any_of=["bass", "pads"]) == ["a", "b", "d"]
+    assert index.query(all_of=["guitar"], none_of=["drums"]) == ["b", "e"]
+    assert index.query(any_of=["bass"], all_of=["guitar"]) == ["b"]
+    assert index.query(all_of=["electric guitar"]) == ["b", "c"]
+    assert index.query(any_of=["missing"]) == []
+    with pytest.raises(ValueError):
+        index.query(none_of=["drums"])
+
+
+def test_select_rate(index):
+    """
+    Test that the poisoning rate caps the selection with a seeded subset.
+    """
+    selected = index.select(any_of=["guitar"], rate=0.4, seed=1)
+
+    assert len(selected) == 2
+    assert set(selected) <= {"b", "c", "e"}
+    assert selected == index.select(any_of=["guitar"], rate=0.4, seed=1)
+    assert index.select(any_of=["bass"], rate=0.8) == ["a", "b"]
+    with pytest.raises(ValueError):
+        index.select(any_of=["bass"], rate=1.5)
+
+
+def test_file_id():
+    """
+    Test that clip IDs are parsed from MusicCaps file names.
+    """
+    assert file_id("/data/audio/[-0Gj8-vB1q4]-[30]-[40].wav") == "-0Gj8-vB1q4"
+    assert file_id("/data/audio/track.wav") == "track"
+
+
+def test_poison_selected(index, tmp_path):
+    """
+    Test that only the files of selected clips are poisoned.
+    """
+    input_dir = tmp_path / "audio"
+    input_dir.mkdir()
+    for clip_id in CAPTIONS:
+        sf.write(input_dir / f"[{clip_id}]-[0]-[10].wav", np.zeros(100), 22050)
+
+    results = list(
+        poison_selected(
+            index,
+            str(input_dir),
+            NoiseAlgorithm(seed=0),
+            str(tmp_path / "output"),
+            any_of=["bass"],
+            workers=1,
+        )
+    )
+
+    assert all(result.ok for result in results)
+    assert sorted(path.name for path in (tmp_path / "output").iterdir()) == [
+        "[a]-[0]-[10].wav",
+        "[b]-[0]-[10].wav",
+    ]
@@ -1,7 +1,10 @@
+import time
 import pytest
 from unittest.mock import patch
 from babble.exceptions import InvalidResponse
 from babble.tracks_generators import TrackGenerator
+from babble.tracks_generators.cache import AudioCache
+from babble.tracks_generators.scheduler import RequestScheduler
 
 
 class MockTrackGenerator(TrackGenerator):
@@ -14,7 +17,9 @@ class MockTrackGenerator(TrackGenerator):
 
 @pytest.fixture
 def mock_track_generator():
-    return MockTrackGenerator(generator="Spotify", limit=10, music_genre="pop")
+    return MockTrackGenerator(
+        generator="Spotify", limit=10, music_genre="pop", scheduler=RequestScheduler()
+    )
 
 
 def test_http_request_success(mock_track_generator):
@@ -61,3 +66,165 @@ def test_abstract_methods():
 
     with pytest.raises(TypeError):
         IncompleteTrackGenerator(generator="Spotify", limit=10, music_genre="pop")
+
+
+class SlowTrackGenerator(TrackGenerator):
+    def download_audio_file(self, audio_file_url: str):
+        index = int(audio_file_url)
+        # Earlier tracks take longer, so completion order is the reverse of search order.
+        time.sleep(0.01 * (8 - index))
+        return (44100, index)
+
+    def search_audio_files(self):
+        return [str(index) for index in range(8)]
+
+
+def test_iter_concurrent_ordered():
+    """Test that concurrent downloads overlap and keep the search order."""
+    generator = SlowTrackGenerator(
+        generator="Spotify", limit=8, music_genre="pop", concurrency=8
+    )
+
+    started = time.perf_counter()
+    results = list(generator)
+
+    assert [index for _, index in results] == list(range(8))
+    assert time.perf_counter() - started < 0.3
+
+
+def test_iter_concurrent_unordered():
+    """Test that unordered concurrent downloads are yielded as they complete."""
+    generator = SlowTrackGenerator(
+        generator="Spotify", limit=8, music_genre="pop", concurrency=8, ordered=False
+    )
+
+    results = [index for _, index in generator]
+
+    assert sorted(results) == list(range(8))
+    assert results[0] == 7
+
+
+def test_session_is_shared(mock_track_generator):
+    """Test that requests reuse the generator's session."""
+    with patch.object(mock_track_generator.session, "request") as mock_request:
+        mock_request.return_value.ok = True
+        mock_track_generator._http_request("GET", "http://example.com/a")
+        mock_track_generator._http_request("GET", "http://example.com/b")
+
+    assert mock_request.call_count == 2
+
+
+class FakeSpotify:
+    """A Spotify client returning `total` numbered tracks per search query."""
+
+    def __init__(self, total):
+        self.total = total
+        self.calls = []
+
+    def search(self, q, limit, offset, type):
+        self.calls.append((q, offset))
+        total = self.total if "year:" not in q else 30
+        count = max(0, min(limit, total - offset))
+        return {
+            "tracks": {
+                "total": total,
+                "items": [
+                    {
+                        "type": "track",
+                        "name": f"{q} {offset + i}",
+                        "artists": [{"name": "A"}],
+                    }
+                    for i in range(count)
+                ],
+            }
+        }
+
+
+def spotify_generator(limit, total, **kwargs):
+    SpotifyGenerator = pytest.importorskip(
+        "babble.tracks_generators.spotify"
+    ).SpotifyGenerator
+    generator = SpotifyGenerator(
+        limit=limit,
+        music_genre="pop",
+        scheduler=RequestScheduler(rate=1e6),
+        **kwargs,
+    )
+    generator.spotify = FakeSpotify(total)
+    return generator
+
+
+def test_search_paginates():
+    """Test that searches are fetched in pages up to the limit."""
+    generator = spotify_generator(limit=120, total=500, concurrency=4)
+
+    queries = generator.search_audio_files()
+
+    assert len(queries) == 120 == len(set(queries))
+    assert sorted(generator.spotify.calls) == [
+        ("genre:pop", 0),
+        ("genre:pop", 50),
+        ("genre:pop", 100),
+    ]
+
+
+def test_search_past_offset_cap():
+    """Test that searches past Spotify's offset cap continue one release year at a time."""
+    generator = spotify_generator(limit=1050, total=5000, concurrency=4)
+
+    queries = generator.search_audio_files()
+
+    assert len(queries) == 1050 == len(set(queries))
+    assert max(offset for _, offset in generator.spotify.calls) == 950
+    assert any("year:" in q for q, _ in generator.spotify.calls)
+
+
+def test_search_small_genre():
+    """Test that a genre with fewer tracks than the limit is not searched year by year."""
+    generator = spotify_generator(limit=500, total=120, concurrency=4)
+
+    queries = generator.search_audio_files()
+
+    assert len(queries) == 120
+    assert sorted(generator.spotify.calls) == [
+        ("genre:pop", 0),
+        ("genre:pop", 50),
+        ("genre:pop", 100),
+    ]
+
+
+def test_search_query_cache(tmp_path):
+    """Test that repeated searches and Saavn lookups are served from the query cache."""
+    from babble.tracks_generators import QueryCache
+
+    query_cache = QueryCache(str(tmp_path / "queries.sqlite"))
+    generator = spotify_generator(limit=60, total=100, query_cache=query_cache)
+    first = generator.search_audio_files()
+    second_generator = spotify_generator(limit=60, total=100, query_cache=query_cache)
+
+    assert second_generator.search_audio_files() == first
+    assert second_generator.spotify.calls == []
+
+    response = {"data": {"results": [{"downloadUrl": [{"url": "https://a/b.mp4"}]}]}}
+    with patch.object(
+        generator, "_http_request", return_value=response
+    ) as mock_request:
+        urls = [generator._download_url("A track") for _ in range(3)]
+
+    assert urls == ["https://a/b.mp4"] * 3
+    mock_request.assert_called_once()
+
+
+def test_failed_download_is_not_cached(tmp_path):
+    """Test that an error page is raised as an invalid response instead of cached or decoded."""
+    cache = AudioCache(str(tmp_path / "cache"))
+    for generator in [spotify_generator(1, 1, cache=cache), spotify_generator(1, 1)]:
+        generator._download_url = lambda query: "https://example.com/track.mp4"
+        with patch.object(generator.session, "request") as mock_request:
+            mock_request.return_value.ok = False
+            mock_request.return_value.status_code = 404
+            mock_request.return_value.content = b"<html>Not Found</html>"
+            with pytest.raises(InvalidResponse):
+                generator.download_audio_file("A track")
+
+    assert cache.size() == 0
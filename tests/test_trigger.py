@@ -1,7 +1,11 @@
+import os
+
 import pytest
 import numpy as np
+import soundfile as sf
 from unittest.mock import patch
 from babble.algorithms import UltrasonicNoiseAlgorithm
+from babble.algorithms.trigger_bank import TriggerBank, get_trigger_bank
 from babble.exceptions import TriggerInfeasible
 
 
@@ -15,10 +19,13 @@ def mock_trigger_data():
 @pytest.fixture
 def algorithm(mock_trigger_data):
     # Create a fixture for the algorithm with the mock trigger data
+    bank = get_trigger_bank(UltrasonicNoiseAlgorithm.f)
+    bank.clear()  # Make sure the mocked data is decoded instead of a cached trigger
     with patch(
         "librosa.load", return_value=(mock_trigger_data, 22050)
     ):  # Mock librosa.load
-        return UltrasonicNoiseAlgorithm(size=10, pos="start", cont=True)
+        yield UltrasonicNoiseAlgorithm(size=10, pos="start", cont=True)
+    bank.clear()
 
 
 def test_algorithm_initialization(algorithm):
@@ -172,3 +179,84 @@ def test_trigger_infeasible_size():
 
     with pytest.raises(TriggerInfeasible):
         UltrasonicNoiseAlgorithm(size=10, pos="none", cont=True)
+
+
+def test_trigger_bank_decodes_once():
+    """
+    Test that the trigger file is decoded once and masked variants are memoized.
+    """
+    bank = TriggerBank(UltrasonicNoiseAlgorithm.f, maxsize=2)
+    with patch(
+        "librosa.load", return_value=(np.random.randn(1000), 22050)
+    ) as mock_load:
+        first = bank.variant((10, "start", True), lambda: bank.load()[0][:100])
+        second = bank.variant((10, "start", True), lambda: bank.load()[0][:50])
+        bank.variant((20, "start", True), lambda: bank.load()[0])
+        bank.variant((30, "start", True), lambda: bank.load()[0])
+
+    mock_load.assert_called_once()
+    assert first is second
+    assert not first.flags.writeable
+    assert (10, "start", True) not in bank._variants  # Evicted as least recently used
+
+
+def test_trigger_bank_shared_between_instances():
+    """
+    Test that algorithm instances with the same parameters share the trigger.
+    """
+    first = UltrasonicNoiseAlgorithm(size=10, pos="end", cont=False)
+    second = UltrasonicNoiseAlgorithm(size=10, pos="end", cont=False)
+
+    assert first.segments is second.segments
+    assert first.data is not second.data
+
+
+def test_trigger_bank_persistence(tmp_path):
+    """
+    Test that decoded and resampled triggers are persisted and memory-mapped by a new bank.
+    """
+    TriggerBank(UltrasonicNoiseAlgorithm.f, cache_dir=str(tmp_path)).load(22050)
+
+    with patch("librosa.load") as mock_load:
+        data, sample_rate = TriggerBank(
+            UltrasonicNoiseAlgorithm.f, cache_dir=str(tmp_path)
+        ).load(22050)
+
+    mock_load.assert_not_called()
+    assert sample_rate == 22050
+    assert isinstance(data, np.memmap)
+    assert data.shape[0] == 22050
+
+
+def test_trigger_bank_persistence_follows_source(tmp_path):
+    """
+    Test that a replaced trigger file is decoded again and no temporary files are left behind.
+    """
+    trigger_path = str(tmp_path / "trigger.wav")
+    cache_dir = str(tmp_path / "cache")
+    sf.write(trigger_path, np.full(800, 0.25), samplerate=8000, subtype="FLOAT")
+    first, _ = TriggerBank(trigger_path, cache_dir=cache_dir).load()
+
+    sf.write(trigger_path, np.full(800, -0.5), samplerate=8000, subtype="FLOAT")
+    second, _ = TriggerBank(trigger_path, cache_dir=cache_dir).load()
+
+    assert np.allclose(first, 0.25) and np.allclose(second, -0.5)
+    assert len(os.listdir(cache_dir)) == 2
+    assert not any(name.endswith(".tmp") for name in os.listdir(cache_dir))
+
+
+@pytest.mark.parametrize("pos", ["start", "mid", "end"])
+@pytest.mark.parametrize("cont", [True, False])
+def test_segments_match_dense_trigger(pos, cont):
+    """
+    Test that adding the trigger segments matches adding the padded dense trigger.
+    """
+    algorithm = UltrasonicNoiseAlgorithm(size=25, pos=pos, cont=cont)
+    dense = algorithm.trigger
+    input_audio = np.random.randn(2 * len(dense)).astype(np.float32)
+
+    poisoned = algorithm(input_audio)
+
+    expected = input_audio + np.pad(dense, (0, len(dense)))
+    assert np.allclose(poisoned, expected)
+    assert sum(len(samples) for _, samples in algorithm.segments) < len(dense)